@@ -0,0 +1,32 @@
+import os
+import sys
+
+import discord
+
+# Bot modules live in src/ and import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+
+class FakeClock:
+    """A clock for the modules that take one; tests move it forward by setting `now`"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def apply_click(user_id, name, guild_id, t=0):
+    """A recorded click on the Apply button, as replay.Replayer dispatches it"""
+    return {
+        "type": "interaction", "kind": discord.InteractionType.component.value, "t": t,
+        "user_id": user_id, "user_name": name, "guild_id": guild_id,
+        "channel_id": 70, "channel_name": "apply-here",
+        "data": {"custom_id": "apply_button", "component_type": 2},
+    }
+
+
+def dm(user_id, name, content, t=0):
+    """A recorded DM from an applicant"""
+    return {"type": "message", "user_id": user_id, "user_name": name, "content": content, "attachments": [], "t": t}
@@ -0,0 +1,131 @@
+"""
+Admission control for new application sessions.
+
+Session starts are limited by a global and a per-guild token bucket, and the
+number of active sessions is capped. Applicants over the limit wait in a FIFO
+queue; `drain()` admits them in order as tokens refill and sessions finish.
+An applicant whose guild is rate limited does not hold up applicants from
+other guilds behind them.
+
+Sessions that have been idle for `idle_timeout` seconds stop counting
+towards the cap, so abandoned applications cannot block the queue.
+Limits are per bot process.
+"""
+import time
+from collections import OrderedDict
+
+ADMITTED = 0
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `capacity`; a rate of 0 means unlimited"""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self):
+        if not self.rate:
+            return True
+        self._refill()
+        return self.tokens >= 1
+
+    def take(self):
+        if self.rate:
+            self.tokens -= 1
+
+
+class AdmissionController:
+    def __init__(self, rate=0, burst=10, guild_rate=0, guild_burst=5, max_active=0, max_waiting=500,
+                 idle_timeout=3600, clock=time.monotonic):
+        self.guild_rate = guild_rate
+        self.guild_burst = guild_burst
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.bucket = TokenBucket(rate, burst, clock)
+        self.guild_buckets = {}
+        self.active = {}  # user_id -> last activity
+        self.waiting = OrderedDict()  # user_id -> guild_id
+
+    def _guild_bucket(self, guild_id):
+        bucket = self.guild_buckets.get(guild_id)
+        if bucket is None:
+            bucket = self.guild_buckets[guild_id] = TokenBucket(self.guild_rate, self.guild_burst, self.clock)
+        return bucket
+
+    def _expire_idle(self):
+        cutoff = self.clock() - self.idle_timeout
+        for user_id in [user_id for user_id, seen in self.active.items() if seen < cutoff]:
+            del self.active[user_id]
+
+    def _has_capacity(self):
+        self._expire_idle()
+        return not self.max_active or len(self.active) < self.max_active
+
+    def _admissible(self, guild_id):
+        return self._has_capacity() and self.bucket.available() and self._guild_bucket(guild_id).available()
+
+    def _admit(self, user_id, guild_id):
+        self.bucket.take()
+        self._guild_bucket(guild_id).take()
+        self.active[user_id] = self.clock()
+
+    def request(self, user_id, guild_id):
+        """ADMITTED, the applicant's 1-based queue position, or None when the queue is full"""
+        if user_id in self.waiting:
+            return self.position(user_id)
+        # Applicants already waiting go first, unless their guild is out of tokens
+        queued_guilds = set(self.waiting.values())
+        waiting_ahead = guild_id in queued_guilds or any(
+            self._guild_bucket(queued).available() for queued in queued_guilds
+        )
+        if not waiting_ahead and self._admissible(guild_id):
+            self._admit(user_id, guild_id)
+            return ADMITTED
+        if len(self.waiting) >= self.max_waiting:
+            return None
+        self.waiting[user_id] = guild_id
+        return len(self.waiting)
+
+    def position(self, user_id):
+        """1-based position in the waiting queue, or None"""
+        for position, waiting_user in enumerate(self.waiting, 1):
+            if waiting_user == user_id:
+                return position
+        return None
+
+    def touch(self, user_id):
+        """Record activity on an admitted session"""
+        if user_id in self.active:
+            self.active[user_id] = self.clock()
+
+    def release(self, user_id):
+        """A session finished (or an applicant gave up waiting)"""
+        self.active.pop(user_id, None)
+        self.waiting.pop(user_id, None)
+
+    def drain(self):
+        """Admit waiting applicants in order while capacity allows; returns [(user_id, guild_id)]"""
+        admitted = []
+        blocked_guilds = set()
+        for user_id, guild_id in list(self.waiting.items()):
+            if not self._has_capacity() or not self.bucket.available():
+                break
+            if guild_id in blocked_guilds or not self._admissible(guild_id):
+                # Keep per-guild order, but let other guilds through
+                blocked_guilds.add(guild_id)
+                continue
+            del self.waiting[user_id]
+            self._admit(user_id, guild_id)
+            admitted.append((user_id, guild_id))
+        return admitted
@@ -0,0 +1,31 @@
+"""
+Application factory.
+
+    from app import create_app
+    bot = create_app()
+    bot.run(token)
+
+Importing this module is cheap and has no side effects. discord.py and the
+bot's handlers (bot.py) are only imported when `create_app()` is called, and
+the bot, its configuration and every subsystem are built then, from the
+settings passed in or read from the environment. See main.py for the
+command-line entry point and benchmark_startup.py for measuring start-up.
+
+There is one app per process: the handlers in bot.py share module-level
+state, so `create_app()` rebuilds that state for the new bot and the
+previous bot must not be used afterwards. Creating an app while an earlier
+one is running (logged in and not closed) raises RuntimeError.
+"""
+from settings import load_settings
+
+
+def create_app(settings=None, environ=None):
+    """Build the bot from `settings` (default: read from `environ`/os.environ); it connects on run()
+
+    Replaces any previously created app, which must not be running.
+    """
+    if settings is None:
+        settings = load_settings(environ)
+    # Deferred: this is where discord.py gets imported
+    import bot as handlers
+    return handlers.create_bot(settings)
@@ -0,0 +1,170 @@
+"""
+Relays files applicants attach to their DM answers into the application channel.
+
+Attachments are recorded per question while the applicant answers (only
+metadata: URL, name, size) and relayed when the application is submitted.
+Each file is streamed from Discord's CDN in chunks into memory up to
+`spool_bytes` and into a temporary file beyond that, so large files are never
+held in memory. Files that would go over the per-application budget or the
+guild upload limit, that fail to download, or whose upload Discord refuses,
+are posted as links instead.
+"""
+import io
+import logging
+import tempfile
+
+import aiohttp
+import discord
+
+logger = logging.getLogger(__name__)
+
+# Discord accepts at most 10 files per message
+MAX_FILES_PER_MESSAGE = 10
+
+
+class AttachmentTooLarge(Exception):
+    """The download went over the allowed number of bytes"""
+
+
+def attachment_record(attachment, question_index):
+    """Serializable description of a discord.Attachment sent while answering a question"""
+    return {
+        "url": attachment.url,
+        "filename": attachment.filename,
+        "size": attachment.size,
+        "content_type": attachment.content_type,
+        "question": question_index,
+    }
+
+
+def format_links(records):
+    """Markdown links to attachments posted without their files"""
+    return "\n".join(f"[{record['filename']}]({record['url']})" for record in records)
+
+
+def describe_attachments(records):
+    """Answer text for a message that only contains attachments"""
+    return "📎 " + ", ".join(record["filename"] for record in records)
+
+
+class AttachmentRelay:
+    def __init__(self, budget_bytes=25 * 1024 * 1024, chunk_size=64 * 1024, spool_bytes=1024 * 1024, timeout=60):
+        self.budget_bytes = budget_bytes
+        self.chunk_size = chunk_size
+        self.spool_bytes = spool_bytes
+        self.timeout = timeout
+        self._session = None
+
+    def _get_session(self):
+        # One pooled session for every relay; created lazily inside the running loop
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def download(self, url, max_bytes):
+        """Stream `url` into a file object; raises AttachmentTooLarge past `max_bytes`"""
+        # Not SpooledTemporaryFile: before Python 3.11 it isn't an io.IOBase, and discord.File
+        # would take it for a path
+        fp = io.BytesIO()
+        try:
+            async with self._get_session().get(url) as response:
+                response.raise_for_status()
+                received = 0
+                async for chunk in response.content.iter_chunked(self.chunk_size):
+                    received += len(chunk)
+                    if received > max_bytes:
+                        raise AttachmentTooLarge(f"{url} is larger than {max_bytes} bytes")
+                    if received > self.spool_bytes and isinstance(fp, io.BytesIO):
+                        spooled, fp = fp, tempfile.TemporaryFile()
+                        fp.write(spooled.getvalue())
+                        spooled.close()
+                    fp.write(chunk)
+        except BaseException:
+            fp.close()
+            raise
+        fp.seek(0)
+        return fp, received
+
+    async def relay(self, records, send, file_limit, on_question_sent=None, used=0):
+        """Post `records` grouped by question through `send(content, files)`.
+
+        `files` is a list of (filename, file object); the files are closed once
+        sent. If Discord refuses an upload (e.g. 413 Payload Too Large or
+        missing permissions), that message's files are posted as links. `used` is the number of bytes already uploaded for the
+        application, which count against the budget. `on_question_sent(question,
+        used)` is awaited after each question's files are posted so a retried
+        submission can skip them and resume with the same budget. Returns the
+        number of uploaded files and the number posted as links.
+        """
+        uploaded = linked = 0
+
+        async def post(question, sent, content=None):
+            nonlocal uploaded, linked, used
+            if await self._send_batch(send, question, sent, content):
+                uploaded += len(sent)
+            else:
+                # Refused uploads went out as links and don't count against the budget
+                linked += len(sent)
+                used -= sum(size for _, _, size in sent)
+
+        questions = []
+        for record in records:
+            if not questions or questions[-1][0] != record["question"]:
+                questions.append((record["question"], []))
+            questions[-1][1].append(record)
+
+        for question, group in questions:
+            batch, batch_bytes, links = [], 0, []
+            try:
+                for record in group:
+                    limit = min(file_limit, self.budget_bytes - used)
+                    fp = None
+                    if record["size"] <= limit:
+                        try:
+                            fp, size = await self.download(record["url"], limit)
+                        except (AttachmentTooLarge, aiohttp.ClientError, TimeoutError) as e:
+                            logger.warning(f"Could not relay attachment {record['filename']}: {e}")
+                    if fp is None:
+                        links.append(record)
+                        continue
+                    used += size
+                    # Discord also limits the size of a whole message, so split batches at the upload limit
+                    if batch and (len(batch) == MAX_FILES_PER_MESSAGE or batch_bytes + size > file_limit):
+                        sent, batch, batch_bytes = batch, [], 0
+                        await post(question, sent)
+                    batch.append((record, fp, size))
+                    batch_bytes += size
+                if batch or links:
+                    content = f"📎 Attachments for question {question + 1}"
+                    if links:
+                        content += "\n" + format_links(links)
+                        linked += len(links)
+                    sent, batch = batch, []
+                    await post(question, sent, content)
+            finally:
+                for _, fp, _ in batch:
+                    fp.close()
+            if on_question_sent:
+                await on_question_sent(question, used)
+        return uploaded, linked
+
+    async def _send_batch(self, send, question, batch, content=None):
+        """Post one message of (record, file, size); returns False if Discord refused the files and links were posted"""
+        content = content or f"📎 Attachments for question {question + 1}"
+        try:
+            await send(content, [(record["filename"], fp) for record, fp, _ in batch])
+            return True
+        except discord.HTTPException as e:
+            if not batch:
+                raise
+            logger.warning(f"Could not upload {len(batch)} attachment(s) for question {question + 1}, posting links instead: {e}")
+        finally:
+            for _, fp, _ in batch:
+                fp.close()
+        records = [record for record, _, _ in batch]
+        await send(f"{content}\n{format_links(records)}", [])
+        return False
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
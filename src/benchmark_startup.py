@@ -0,0 +1,137 @@
+"""
+Measures how long the bot takes to import and start, without connecting to Discord.
+
+    python src/benchmark_startup.py [--runs 5] [--output startup.jsonl] [--max-ms 1500] [--importtime 15]
+
+Every run is a fresh interpreter, like a process starting after a deploy,
+that times `import app`, `import bot` (which pulls in discord.py) and
+`create_app()` with a throwaway token and in-memory state. The median and
+worst run are printed; --output appends them as a JSON line so cold-start
+time can be tracked across deploys, and --max-ms exits with status 1 when
+the median start-up (process start to a built bot) is slower than that.
+--importtime lists the slowest modules imported by app.py and bot.py.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RUN = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported_app = time.perf_counter()
+discord_deferred = "discord" not in sys.modules
+import bot
+imported_bot = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import_app_ms": (imported_app - started) * 1000,
+    "import_bot_ms": (imported_bot - imported_app) * 1000,
+    "create_app_ms": (created - imported_bot) * 1000,
+    "modules": len(sys.modules),
+    "discord_deferred": discord_deferred,
+}))
+"""
+
+
+def benchmark_env():
+    """Environment for the runs: enough settings to build the bot, and nothing that starts I/O"""
+    env = dict(os.environ)
+    env.update({
+        "DISCORD_BOT_TOKEN": "benchmark",
+        "INTERVIEW_CATEGORY_ID": "1",
+        "STATE_BACKEND_URL": "memory://",
+        "PYTHONPATH": SRC_DIR,
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    for name in ("EVENT_LOG", "HEALTH_PORT", "CONFIG_FILE"):
+        env.pop(name, None)
+    return env
+
+
+def run_once():
+    """Timings of one fresh process, in milliseconds"""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", RUN], env=benchmark_env(), capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - started) * 1000
+    return result
+
+
+def measure(runs=5):
+    """Median and worst of each timing over `runs` fresh processes"""
+    results = [run_once() for _ in range(runs)]
+    timings = [name for name in results[0] if name.endswith("_ms")]
+    return {
+        "runs": runs,
+        "median": {name: round(statistics.median(r[name] for r in results), 2) for name in timings},
+        "max": {name: round(max(r[name] for r in results), 2) for name in timings},
+        "modules": results[-1]["modules"],
+        "discord_deferred": all(r["discord_deferred"] for r in results),
+    }
+
+
+def slowest_imports(limit=15):
+    """(cumulative microseconds, module) for the slowest modules imported by app.py and bot.py"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app; app.create_app()"],
+        env=benchmark_env(), capture_output=True, text=True, check=True,
+    ).stderr
+    imports = []
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        # Nesting is shown by indentation, and a module is listed after everything it imported
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative), module.strip()))
+        elif depth == 0:
+            if module.strip() in ("app", "bot"):
+                imports.extend(children)
+            children = []
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to time (default 5)")
+    parser.add_argument("--output", help="append the result as a JSON line to this file")
+    parser.add_argument("--max-ms", type=float, help="fail if the median process start-up is slower than this")
+    parser.add_argument("--importtime", type=int, metavar="N", help="also list the N slowest imports")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    for name, median in result["median"].items():
+        print(f"{name:16} median {median:9.2f} ms  max {result['max'][name]:9.2f} ms")
+    print(f"{result['modules']} modules loaded; discord.py {'deferred' if result['discord_deferred'] else 'imported'} by `import app`")
+
+    if args.importtime:
+        print("\nSlowest imports by app.py and bot.py (cumulative):")
+        for microseconds, module in slowest_imports(args.importtime):
+            print(f"{microseconds / 1000:9.2f} ms  {module}")
+
+    if args.output:
+        result["time"] = datetime.now(timezone.utc).isoformat()
+        result["python"] = sys.version.split()[0]
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+
+    if args.max_ms is not None and result["median"]["process_ms"] > args.max_ms:
+        print(f"❌ Median start-up {result['median']['process_ms']:.0f} ms is over the {args.max_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,123 @@
 import discord
 from discord.ext import commands
-import os
 import logging
 import asyncio
+import time
+import uuid
+import aiohttp
 from datetime import datetime, timedelta, timezone
-from dotenv import load_dotenv
+from admission import ADMITTED, AdmissionController
+from attachments import AttachmentRelay, attachment_record, describe_attachments
+from config import BotConfig, ConfigError, ConfigWatcher
+from cooldowns import CooldownIndex
+from digest import NotificationDigest
+from health import HealthServer, LoopLagWatchdog
+from lookup_cache import TTLCache
+from profiling import Profiler
+from recorder import EventRecorder
+from resilience import CircuitBreaker, retry_async
+from reviewers import ReviewerScheduler
+from state import APPLICANTS, DECISIONS, DELETIONS, DIGEST, REVIEWS, SESSIONS, SUBMISSIONS, LeaderLease, MemoryStateBackend, create_state_backend
+from warcraftlogs import WarcraftLogsClient, format_summary, parse_wcl_links
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+# Everything that depends on settings is built by create_bot() (see app.py),
+# so importing this module has no side effects and needs no environment.
+# The handlers use these module globals, so there is one app per process:
+# create_bot() rewires them to a new bot, which is only allowed once the
+# previous one has closed or if it never started.
+settings = None
+bot = None
+# Set once the bot has logged in (setup_hook)
+running = False
 
-# Required environment variables
-TOKEN = os.getenv("DISCORD_BOT_TOKEN")
-INTERVIEW_CATEGORY_ID = os.getenv("INTERVIEW_CATEGORY_ID")
+# Shared state so sessions, the deletion schedule and the applicant index
+# survive restarts and can be seen by every bot process
+state = None
+# Only the lease holder runs singleton jobs (deletion sweeper, submission worker)
+leader_lease = None
+background_tasks = set()
 
-# Optional environment variables with defaults
-OFFICER_ROLE_ID = os.getenv("OFFICER_ROLE_ID")
-ADMIN_ROLE_ID = os.getenv("ADMIN_ROLE_ID")
-APPLICATION_CHANNEL_PREFIX = os.getenv("APPLICATION_CHANNEL_PREFIX", "application")
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Detects anything blocking the event loop (see health.py)
+watchdog = None
 
-# Validate required environment variables
-if TOKEN is None or INTERVIEW_CATEGORY_ID is None:
-    raise RuntimeError(
-        "DISCORD_BOT_TOKEN and INTERVIEW_CATEGORY_ID must be set in the .env file"
+# Opt-in handler profiling (see profiling.py); handlers are wrapped at import, create_bot() applies the settings
+profiler = Profiler()
+
+# Applicant user objects keyed by user ID, so decisions can DM without fetch_user
+applicant_cache = None
+
+# Stops new submissions hitting Discord while it is failing; they are queued instead
+submission_breaker = None
+
+# Per-guild schedulers assigning each application to the least-loaded available officer (see reviewers.py)
+reviewer_schedulers = {}
+
+async def send_digest(items):
+    """Post one summary per guild of buffered new-submission notices; returns the notices that could not be sent"""
+    by_guild = {}
+    for item in items:
+        by_guild.setdefault(item["guild_id"], []).append(item)
+    unsent = []
+    for guild_id, guild_items in by_guild.items():
+        try:
+            await send_guild_digest(guild_id, guild_items)
+        except Exception as e:
+            logger.error(f"Error sending notification digest for guild {guild_id}, keeping {len(guild_items)} notice(s): {e}")
+            unsent.extend(guild_items)
+    return unsent
+
+async def send_guild_digest(guild_id, items):
+    """Post one summary of a guild's new-submission notices to its digest channel"""
+    config = get_guild_config(guild_id)
+    if not config.digest_channel_id:
+        logger.warning(f"Dropping {len(items)} digest notice(s) for guild {guild_id}: it no longer has a digest channel")
+        return
+    channel = bot.get_channel(config.digest_channel_id) or await bot.fetch_channel(config.digest_channel_id)
+    lines = []
+    for item in items:
+        line = f"• <#{item['channel_id']}> — {item['applicant']}"
+        if item.get("reviewer_id"):
+            line += f" (assigned to <@{item['reviewer_id']}>)"
+        lines.append(line)
+    description = "\n".join(lines)
+    if len(description) > 4000:
+        description = description[:3997] + "..."
+    embed = discord.Embed(
+        title=f"📋 {len(items)} New Application{'s' if len(items) != 1 else ''}",
+        description=description,
+        color=discord.Color.blue(),
+        timestamp=datetime.now(timezone.utc)
     )
+    # One ping per digest: the assigned reviewers, plus the configured roles for anything unassigned
+    mentions = sorted({f"<@{item['reviewer_id']}>" for item in items if item.get("reviewer_id")})
+    if any(not item.get("reviewer_id") for item in items) and role_mentions(config):
+        mentions.append(role_mentions(config))
+    await channel.send(content=" ".join(mentions), embed=embed)
+    logger.info(f"Sent notification digest with {len(items)} application(s) to guild {guild_id}")
+
+# Buffers officer notifications so a recruitment push doesn't ping on every submission
+notification_digest = None
+
+# Limits how fast application sessions start; applicants over the limit wait in line
+admission = None
+admission_wakeup = None
+
+# Streams applicant attachments into application channels at submission time
+attachment_relay = None
 
-# Configure logging level
-logging.getLogger().setLevel(getattr(logging, LOG_LEVEL.upper(), logging.INFO))
+# Recent decisions, checked by the Apply button without any I/O
+cooldown_index = None
 
-intents = discord.Intents.default()
+# Writes DM messages and interactions to EVENT_LOG so src/replay.py can reproduce them
+event_recorder = None
 
-bot = commands.Bot(command_prefix="!", intents=intents)
+# Looks up characters linked in answers and adds their rankings to the application embed
+wcl_client = None
+
+# Serves /healthz when HEALTH_PORT is set
+health_server = None
 
 questions = [
     "Which raid team are you applying to? Weekend (Fri/Sat), Floater/Casual, 10M Weasals Weekday Team, 10M Casual Weekday Team, TBC Team",
@@ -46,18 +130,105 @@ questions = [
     "Any additional comments/questions?",
 ]
 
+def env_role_id(name, value):
+    """Role IDs from the environment; invalid values are logged and ignored"""
+    if value and not value.isdigit():
+        logger.error(f"Invalid {name}: {value} (must be numeric)")
+        return None
+    return value
+
+# Configuration from the environment; CONFIG_FILE overrides it and is hot-reloaded
+env_config = None
+current_config = None
+config_watcher = None
+
+def apply_config(new_config):
+    """Atomically swap in a new configuration; running sessions keep their own version"""
+    global current_config
+    current_config = new_config
+    logger.info(f"Loaded configuration version {new_config.version} ({len(new_config.questions)} questions, {len(new_config.guild_overrides)} guild override(s))")
+
+def get_guild_config(guild_id):
+    """Current configuration for a guild (built on first use and cached until the next reload)"""
+    return current_config.for_guild(guild_id)
+
+def pinned_config(guild_id, version, session_questions):
+    """The configuration a session or submission started with"""
+    config = get_guild_config(guild_id)
+    if config.version != version or list(config.questions) != list(session_questions):
+        # Started before a reload (or by another process): keep the stored questions
+        config = config.with_questions(version, session_questions)
+    return config
+
 # Store ongoing applications
 ongoing_applications = {}
 
+async def forget_application(user_id):
+    """Remove an application session locally and from shared state"""
+    ongoing_applications.pop(user_id, None)
+    # Free the admission slot so the next applicant in line can start
+    admission.release(user_id)
+    admission_wakeup.set()
+    try:
+        await state.delete(SESSIONS, user_id)
+    except Exception as e:
+        logger.error(f"Error removing session for {user_id} from shared state: {e}")
+
 class ApplicationHandler:
-    def __init__(self, user, guild):
+    def __init__(self, user, guild, config=None):
         self.user = user
         self.guild = guild
+        # Pinned for the whole session so a config reload never changes questions mid-application
+        self.config = config or get_guild_config(guild.id if guild else None)
         self.answers = []
-        self.current_question = 0
+        # Questions asked so far, in order; branching means these are not always consecutive
+        self.asked = []
+        self.current_question = self.config.questionnaire.start
+        # Files sent while answering; only metadata is kept until submission
+        self.attachments = []
+    
+    def snapshot(self):
+        """Serializable session state for the shared state backend"""
+        data = {
+            "user_id": self.user.id,
+            "guild_id": self.guild.id if self.guild else None,
+            "answers": self.answers,
+            "current_question": self.current_question,
+            "asked": self.asked,
+            "attachments": self.attachments,
+            "config_version": self.config.version,
+            "questions": list(self.config.questions),
+        }
+        if hasattr(self, 'pending_long_answer'):
+            data["pending_long_answer"] = self.pending_long_answer
+            data["pending_attachments"] = self.pending_attachments
+        return data
+    
+    @classmethod
+    def from_snapshot(cls, data, user, guild):
+        """Rebuild a session started by this or another bot process"""
+        config = pinned_config(data.get("guild_id"), data.get("config_version"), data.get("questions", questions))
+        handler = cls(user, guild, config)
+        handler.answers = list(data.get("answers", []))
+        handler.current_question = data.get("current_question", 0)
+        # Sessions saved before branching questionnaires answered questions in order
+        handler.asked = list(data.get("asked", range(len(handler.answers))))
+        handler.attachments = list(data.get("attachments", []))
+        if "pending_long_answer" in data:
+            handler.pending_long_answer = data["pending_long_answer"]
+            handler.pending_attachments = data.get("pending_attachments", [])
+        return handler
+    
+    async def save_session(self):
+        """Persist the session so another process can pick it up"""
+        try:
+            await state.set(SESSIONS, self.user.id, self.snapshot())
+        except Exception as e:
+            logger.error(f"Error saving session for {self.user.display_name}: {e}")
         
     async def start_application(self):
         """Start the application process by sending the first question"""
+        applicant_cache.put(self.user.id, self.user)
         try:
             await self.send_current_question()
         except discord.Forbidden:
@@ -67,40 +238,76 @@ class ApplicationHandler:
     
     async def send_current_question(self):
         """Send the current question to the user"""
-        if self.current_question < len(questions):
-            question_num = self.current_question + 1
-            question = questions[self.current_question]
-            
-            embed = discord.Embed(
-                title=f"Guild Application - Question {question_num}/{len(questions)}",
-                description=question,
-                color=discord.Color.blue()
-            )
+        questionnaire = self.config.questionnaire
+        if self.current_question is None:
+            await self.complete_application()
+            return
+        
+        question = questionnaire[self.current_question]
+        question_num = len(self.asked) + 1
+        # Longest possible path from here, so the total can shrink as branches are taken
+        total = len(self.asked) + questionnaire.remaining[self.current_question]
+        
+        embed = discord.Embed(
+            title=f"Guild Application - Question {question_num}/{total}",
+            description=question.text,
+            color=discord.Color.blue()
+        )
+        if question.choices:
+            embed.set_footer(text="Pick an option below or type your answer. Type 'cancel' to cancel the application.")
+            await self.user.send(embed=embed, view=ChoiceView(question))
+        else:
             embed.set_footer(text="Please respond with your answer. Type 'cancel' to cancel the application.")
-            
             await self.user.send(embed=embed)
-        else:
-            await self.complete_application()
     
+    @profiler.profiled("ApplicationHandler.process_answer")
     async def process_answer(self, message):
         """Process the user's answer and move to next question"""
+        admission.touch(self.user.id)
         if message.content.lower() == 'cancel':
             await self.cancel_application()
             return
         
+        # Files are only kept once the answer they came with is accepted
+        attachments = [attachment_record(attachment, self.current_question) for attachment in message.attachments]
+        
+        question = self.config.questionnaire[self.current_question]
+        if question.choices:
+            choice = question.match_choice(message.content)
+            if choice is None:
+                embed = discord.Embed(
+                    title="⚠️ Invalid Choice",
+                    description="Please pick one of the options below:\n" + "\n".join(
+                        f"**{i}.** {option}" for i, option in enumerate(question.choices, 1)
+                    ),
+                    color=discord.Color.orange()
+                )
+                embed.set_footer(text="Use the menu, type an option or its number, or type 'cancel' to cancel the application.")
+                await self.user.send(embed=embed, view=ChoiceView(question))
+                return
+            await self.capture_attachments(attachments)
+            await self.record_answer(choice)
+            return
+        
         # Handle "proceed" command for long answers
         if message.content.lower() == 'proceed' and hasattr(self, 'pending_long_answer'):
             answer = self.validate_and_truncate_answer(self.pending_long_answer)
+            attachments = self.pending_attachments
             delattr(self, 'pending_long_answer')
+            delattr(self, 'pending_attachments')
         else:
             # Remove excessive whitespace
             clean_content = ' '.join(message.content.split())
+            # A message with only screenshots still answers the question
+            if not clean_content and attachments:
+                clean_content = describe_attachments(attachments)
             
             # Check if answer is too long
-            if len(clean_content) > 800:
+            max_length = self.config.max_answer_length
+            if len(clean_content) > max_length:
                 embed = discord.Embed(
                     title="⚠️ Answer Too Long",
-                    description=f"Your answer is **{len(clean_content)} characters** long, but the maximum is **800 characters**.",
+                    description=f"Your answer is **{len(clean_content)} characters** long, but the maximum is **{max_length} characters**.",
                     color=discord.Color.orange()
                 )
                 embed.add_field(
@@ -108,11 +315,13 @@ class ApplicationHandler:
                     value="• **Shorten your answer** and send it again\n• **Type 'proceed'** to automatically truncate your answer\n• **Type 'cancel'** to cancel the application",
                     inline=False
                 )
-                embed.set_footer(text="If you choose to proceed, your answer will be cut off at 800 characters.")
+                embed.set_footer(text=f"If you choose to proceed, your answer will be cut off at {max_length} characters.")
                 await self.user.send(embed=embed)
                 
-                # Store the long answer for potential truncation
+                # Store the long answer (and its files) for potential truncation
                 self.pending_long_answer = clean_content
+                self.pending_attachments = attachments
+                await self.save_session()
                 return
             
             answer = clean_content
@@ -128,11 +337,26 @@ class ApplicationHandler:
             await self.user.send(embed=embed)
             return
         
-        # Store the processed answer
+        await self.capture_attachments(attachments)
+        await self.record_answer(answer)
+    
+    async def capture_attachments(self, records):
+        """Keep the files sent with an accepted answer, up to the per-application limit"""
+        if not records:
+            return
+        room = max(0, settings.ATTACHMENT_MAX_FILES - len(self.attachments))
+        self.attachments.extend(records[:room])
+        if len(records) > room:
+            await self.user.send(f"⚠️ Only {settings.ATTACHMENT_MAX_FILES} attachments can be included with an application, so some of your files won't be posted.")
+    
+    async def record_answer(self, answer):
+        """Store the answer to the current question and move along the questionnaire"""
         self.answers.append(answer)
-        self.current_question += 1
+        self.asked.append(self.current_question)
+        self.current_question = self.config.questionnaire.next_index(self.current_question, answer)
         
-        if self.current_question < len(questions):
+        if self.current_question is not None:
+            await self.save_session()
             await self.send_current_question()
         else:
             await self.complete_application()
@@ -140,7 +364,7 @@ class ApplicationHandler:
     def validate_and_truncate_answer(self, content):
         """Validate and truncate answer to prevent Discord limits"""
         # Maximum characters per answer (leaving room for embed formatting and truncation message)
-        MAX_ANSWER_LENGTH = 800
+        MAX_ANSWER_LENGTH = self.config.max_answer_length
         TRUNCATION_MESSAGE = "... [Answer truncated due to length - {} characters total]"
         
         # Remove excessive whitespace
@@ -204,115 +428,42 @@ class ApplicationHandler:
         await self.user.send(embed=embed)
         
         # Remove from ongoing applications
-        if self.user.id in ongoing_applications:
-            del ongoing_applications[self.user.id]
+        await forget_application(self.user.id)
     
+    @profiler.profiled("ApplicationHandler.complete_application")
     async def complete_application(self):
-        """Complete the application and create the channel"""
+        """Complete the application and submit it for review"""
+        # The token makes every submission step idempotent across retries and restarts
+        submission = {
+            "token": uuid.uuid4().hex,
+            "user_id": self.user.id,
+            "guild_id": self.guild.id,
+            "answers": self.answers,
+            "asked": self.asked,
+            "attachments": self.attachments,
+            "relayed_questions": [],
+            "relayed_bytes": 0,
+            "wcl_links": parse_wcl_links(" ".join(self.answers), settings.WCL_MAX_LINKS),
+            "config_version": self.config.version,
+            "questions": list(self.config.questions),
+            "status": "pending",
+            "channel_id": None,
+            "message_id": None,
+            "post_attempted": False,
+            "notified": False,
+            "updated_at": time.time(),
+        }
+        applicant_cache.put(self.user.id, self.user)
         try:
-            # INTERVIEW_CATEGORY_ID is guaranteed to be non-None due to startup validation
-            category_id = int(INTERVIEW_CATEGORY_ID)  # type: ignore
-            category = self.guild.get_channel(category_id)
-            
-            if not category or not isinstance(category, discord.CategoryChannel):
-                await self.user.send("❌ Interview category not found. Please contact an officer.")
-                return
-            
-            # Create channel name
-            channel_name = f"{APPLICATION_CHANNEL_PREFIX}-{self.user.name.lower()}"
-            
-            # Set up permissions
-            overwrites = {
-                self.guild.default_role: discord.PermissionOverwrite(read_messages=False),
-                self.user: discord.PermissionOverwrite(read_messages=True, send_messages=True, read_message_history=True, create_public_threads=True, add_reactions=True, embed_links=True, attach_files=True, use_external_emojis=True, send_messages_in_threads=True, create_private_threads=True, manage_threads=True),
-            }
-            
-            # Add officer role access if configured
-            if OFFICER_ROLE_ID:
-                try:
-                    officer_role = self.guild.get_role(int(OFFICER_ROLE_ID))
-                    if officer_role:
-                        overwrites[officer_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True, read_message_history=True, create_public_threads=True, add_reactions=True, embed_links=True, attach_files=True, use_external_emojis=True, send_messages_in_threads=True, create_private_threads=True, manage_threads=True)
-                        logger.info(f"Added officer role {officer_role.name} to application channel permissions")
-                    else:
-                        logger.warning(f"Officer role with ID {OFFICER_ROLE_ID} not found in guild")
-                except ValueError:
-                    logger.error(f"Invalid OFFICER_ROLE_ID: {OFFICER_ROLE_ID} (must be numeric)")
-            
-            # Add admin role access if configured
-            if ADMIN_ROLE_ID:
-                try:
-                    admin_role = self.guild.get_role(int(ADMIN_ROLE_ID))
-                    if admin_role:
-                        overwrites[admin_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True, read_message_history=True, create_public_threads=True, add_reactions=True, embed_links=True, attach_files=True, use_external_emojis=True, send_messages_in_threads=True, create_private_threads=True, manage_threads=True)
-                        logger.info(f"Added admin role {admin_role.name} to application channel permissions")
-                    else:
-                        logger.warning(f"Admin role with ID {ADMIN_ROLE_ID} not found in guild")
-                except ValueError:
-                    logger.error(f"Invalid ADMIN_ROLE_ID: {ADMIN_ROLE_ID} (must be numeric)")
-            
-            # Create the channel
-            interview_channel = await self.guild.create_text_channel(
-                name=channel_name,
-                category=category,
-                overwrites=overwrites,
-            )
-            
-            # Create and send application embed with safety checks
-            embed = discord.Embed(
-                title=f"New Application from {self.user.display_name}",
-                color=discord.Color.blue(),
-            )
-            
-            # Add questions and answers with additional safety checks
-            total_embed_length = len(embed.title or "") + len(embed.description or "")
-            
-            for i, question in enumerate(questions):
-                # Ensure field name doesn't exceed Discord's 256 character limit
-                field_name = f"Q{i+1}: {question}"
-                if len(field_name) > 256:
-                    field_name = field_name[:253] + "..."
-                
-                # Ensure field value doesn't exceed Discord's 1024 character limit
-                field_value = self.answers[i]
-                if len(field_value) > 1024:
-                    field_value = field_value[:1021] + "..."
-                
-                # Check if adding this field would exceed the total embed limit (6000 chars)
-                field_length = len(field_name) + len(field_value)
-                if total_embed_length + field_length > 5500:  # Leave some buffer
-                    # Add a truncation notice instead
-                    embed.add_field(
-                        name="⚠️ Application Truncated",
-                        value="Some answers were too long and have been truncated. Full responses are available in the application logs.",
-                        inline=False
-                    )
-                    break
-                
-                embed.add_field(name=field_name, value=field_value, inline=False)
-                total_embed_length += field_length
-            
-            # Add Discord ID as a field for easy extraction
-            embed.add_field(name="Discord ID", value=str(self.user.id), inline=False)
-            
-            embed.set_footer(text=f"Application submitted by {self.user} ({self.user.id})")
-            
-            # Send the embed with mentions
-            await interview_channel.send(
-                content=f"{self.user.mention} <@&616354080704430130>",
-                embed=embed
-            )
-            
-            # Notify user of completion
-            completion_embed = discord.Embed(
-                title="✅ Application Submitted Successfully!",
-                description=f"Your guild application has been submitted and reviewed by our officers.\n\nYour application channel: {interview_channel.mention}",
-                color=discord.Color.green()
-            )
-            await self.user.send(embed=completion_embed)
-            
-            logger.info(f"Application completed for {self.user.display_name} ({self.user.id})")
-            
+            await save_submission(submission)
+            if submission_breaker.allow():
+                await submit_application(submission, self.guild, self.user)
+            else:
+                # Discord is degraded: keep the submission and let the worker retry it
+                await queue_submission(submission, self.user)
+        except SubmissionError as e:
+            await self.user.send(f"❌ {e}")
+            logger.error(f"Could not submit application for {self.user.display_name}: {e}")
         except discord.Forbidden:
             await self.user.send("❌ I don't have permission to create channels. Please contact an administrator.")
             logger.error(f"Permission denied when creating application channel for {self.user.display_name}")
@@ -321,33 +472,632 @@ class ApplicationHandler:
             logger.error(f"Error completing application for {self.user.display_name}: {e}")
         finally:
             # Remove from ongoing applications
-            if self.user.id in ongoing_applications:
-                del ongoing_applications[self.user.id]
+            await forget_application(self.user.id)
+
+def handles_events():
+    """Whether this process acts on messages and interactions.
+
+    Sharded processes each receive only their own shards' events. Unsharded
+    processes sharing a token all receive every event, so only the leader
+    handles them and the others stand by until they take over the lease.
+    """
+    return settings.BOT_SHARDED or isinstance(state, MemoryStateBackend) or leader_lease.is_leader
+
+async def resume_application(user):
+    """The user's application session, rehydrated from shared state if another process started it"""
+    application_handler = ongoing_applications.get(user.id)
+    if application_handler is None:
+        # The session may have been started by another (or a previous) bot process
+        snapshot = await state.get(SESSIONS, user.id)
+        if snapshot is not None:
+            guild = bot.get_guild(snapshot["guild_id"]) if snapshot.get("guild_id") else None
+            application_handler = ApplicationHandler.from_snapshot(snapshot, user, guild)
+            applicant_cache.put(user.id, user)
+            ongoing_applications[user.id] = application_handler
+            logger.info(f"Resumed application session for {user.display_name} from shared state")
+    return application_handler
+
+async def answer_choice(interaction, question_index, choice):
+    """Handle a pick from a multiple-choice select menu"""
+    application_handler = await resume_application(interaction.user)
+    # Menus from earlier questions stay clickable in the DM history
+    if application_handler is None or application_handler.current_question != question_index:
+        await interaction.response.send_message("❌ This question has already been answered.")
+        return
+    await interaction.response.edit_message(content=f"Your answer: **{choice}**", view=None)
+    await application_handler.record_answer(choice)
+
+class ChoiceSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"choice:(?P<index>[0-9]+)"):
+    """Select menu for a multiple-choice question.
+
+    The question index is in the custom_id and the class is registered with
+    the bot (create_bot), so the menu keeps working however long the
+    applicant takes and after a restart; it also lets recordings be replayed.
+    """
+    def __init__(self, question_index, choices):
+        super().__init__(discord.ui.Select(
+            placeholder="Choose an option",
+            options=[discord.SelectOption(label=choice) for choice in choices],
+            custom_id=f"choice:{question_index}",
+        ))
+        self.question_index = question_index
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(int(match["index"]), [option.label for option in item.options])
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        # A standby process leaves the pick to the leader
+        return handles_events()
+
+    async def callback(self, interaction: discord.Interaction):
+        await answer_choice(interaction, self.question_index, self.item.values[0])
+
+class ChoiceView(discord.ui.View):
+    """Select menu for a multiple-choice question; typing the answer works too"""
+    def __init__(self, question):
+        super().__init__(timeout=None)
+        self.add_item(ChoiceSelect(question.index, question.choices))
+
+class SubmissionError(Exception):
+    """Submission failure that retrying cannot fix; the message is shown to the applicant"""
+
+def is_transient_error(error):
+    """Whether a failed Discord call is worth retrying (5xx, timeouts, connection errors)"""
+    if isinstance(error, discord.DiscordServerError):
+        return True
+    if isinstance(error, discord.HTTPException):
+        return error.status == 429
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError, ConnectionError))
+
+def build_channel_overwrites(guild, user, config):
+    """Permission overwrites for a private application channel"""
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(read_messages=False),
+        user: discord.PermissionOverwrite(read_messages=True, send_messages=True, read_message_history=True, create_public_threads=True, add_reactions=True, embed_links=True, attach_files=True, use_external_emojis=True, send_messages_in_threads=True, create_private_threads=True, manage_threads=True),
+    }
+    
+    # Add officer role access if configured
+    if config.officer_role_id:
+        officer_role = guild.get_role(config.officer_role_id)
+        if officer_role:
+            overwrites[officer_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True, read_message_history=True, create_public_threads=True, add_reactions=True, embed_links=True, attach_files=True, use_external_emojis=True, send_messages_in_threads=True, create_private_threads=True, manage_threads=True)
+            logger.info(f"Added officer role {officer_role.name} to application channel permissions")
+        else:
+            logger.warning(f"Officer role with ID {config.officer_role_id} not found in guild")
+    
+    # Add admin role access if configured
+    if config.admin_role_id:
+        admin_role = guild.get_role(config.admin_role_id)
+        if admin_role:
+            overwrites[admin_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True, read_message_history=True, create_public_threads=True, add_reactions=True, embed_links=True, attach_files=True, use_external_emojis=True, send_messages_in_threads=True, create_private_threads=True, manage_threads=True)
+            logger.info(f"Added admin role {admin_role.name} to application channel permissions")
+        else:
+            logger.warning(f"Admin role with ID {config.admin_role_id} not found in guild")
+    
+    return overwrites
+
+def build_application_embed(user, config, answers, token, asked=None):
+    """Create the application embed with safety checks for Discord's size limits"""
+    embed = discord.Embed(
+        title=f"New Application from {user.display_name}",
+        color=discord.Color.blue(),
+    )
+    
+    # Add questions and answers with additional safety checks
+    total_embed_length = len(embed.title or "") + len(embed.description or "")
+    
+    # Submissions recorded before branching questionnaires answered every question in order
+    asked = asked if asked is not None else range(len(answers))
+    for index, field_value in zip(asked, answers):
+        # Field names are already truncated to Discord's 256 character limit by the questionnaire compiler
+        field_name = config.questionnaire[index].title
+        
+        # Ensure field value doesn't exceed Discord's 1024 character limit
+        if len(field_value) > 1024:
+            field_value = field_value[:1021] + "..."
+        
+        # Check if adding this field would exceed the total embed limit (6000 chars)
+        field_length = len(field_name) + len(field_value)
+        if total_embed_length + field_length > 5500:  # Leave some buffer
+            # Add a truncation notice instead
+            embed.add_field(
+                name="⚠️ Application Truncated",
+                value="Some answers were too long and have been truncated. Full responses are available in the application logs.",
+                inline=False
+            )
+            break
+        
+        embed.add_field(name=field_name, value=field_value, inline=False)
+        total_embed_length += field_length
+    
+    # Add Discord ID as a field for easy extraction
+    embed.add_field(name="Discord ID", value=str(user.id), inline=False)
+    
+    embed.set_footer(text=f"Application submitted by {user} ({user.id}) • Ref {token}")
+    return embed
+
+async def get_reviewer_scheduler(guild_id):
+    """The guild's reviewer scheduler, with its open reviews refreshed from shared state"""
+    reviewers = get_guild_config(guild_id).reviewers
+    scheduler = reviewer_schedulers.get(guild_id)
+    if scheduler is None or scheduler.windows != reviewers:
+        scheduler = ReviewerScheduler(reviewers, settings.REVIEW_STALE_HOURS * 3600)
+        reviewer_schedulers[guild_id] = scheduler
+    if reviewers:
+        # Other bot processes assign and close reviews too, so recount every reviewer's load
+        open_reviews = await state.items(REVIEWS)
+        scheduler.load({key: review for key, review in open_reviews.items() if review.get("guild_id") == guild_id})
+    return scheduler
+
+async def load_open_reviews():
+    """Build the reviewer scheduler of every guild with open reviews, so stale ones are rebalanced after a restart"""
+    guild_ids = set()
+    for channel_id, review in (await state.items(REVIEWS)).items():
+        if review.get("guild_id") is None:
+            # Assigned before reviews were kept per guild: find the guild through the channel and record it
+            channel = bot.get_channel(int(channel_id))
+            if channel is None:
+                logger.warning(f"Keeping open review {channel_id} without a guild: its channel is not cached")
+                continue
+            review = {**review, "guild_id": channel.guild.id}
+            await state.set(REVIEWS, channel_id, review)
+        guild_ids.add(review["guild_id"])
+    for guild_id in guild_ids:
+        await get_reviewer_scheduler(guild_id)
+    return guild_ids
+
+async def assign_reviewer(guild_id, channel_id):
+    """Assign a new application to a reviewer and persist the assignment"""
+    scheduler = await get_reviewer_scheduler(guild_id)
+    reviewer_id = scheduler.assign(channel_id)
+    if reviewer_id:
+        await state.set(REVIEWS, channel_id, {"guild_id": guild_id, "reviewer_id": reviewer_id, "assigned_at": time.time()})
+    return reviewer_id
+
+async def release_review(guild_id, channel_id):
+    """Close the review for an application channel after a decision"""
+    try:
+        scheduler = await get_reviewer_scheduler(guild_id)
+        reviewer_id = scheduler.complete(channel_id)
+        await state.delete(REVIEWS, channel_id)
+    except Exception as e:
+        logger.error(f"Error removing review assignment for {channel_id}: {e}")
+        return
+    if reviewer_id:
+        logger.info(f"Review {channel_id} closed; reviewer {reviewer_id} now has {scheduler.loads[reviewer_id]} open")
+
+async def application_blocker(user, guild):
+    """Return why `user` can't start an application right now, or None if they can"""
+    # Applicants who were recently approved or rejected have to wait before applying again
+    cooldown = cooldown_index.check(guild.id, user.id) if guild else None
+    if cooldown:
+        decision, until = cooldown
+        return f"⏳ Your last application was {decision} recently. You can apply again <t:{int(until)}:R>."
+    
+    # Check if user already has an application channel
+    if guild:
+        config = get_guild_config(guild.id)
+        channel_name = f"{config.channel_prefix}-{user.name.lower()}"
+        if config.application_mode == "thread":
+            existing_channel = discord.utils.get(guild.threads, name=channel_name, archived=False)
+        else:
+            existing_channel = discord.utils.get(guild.channels, name=channel_name)
+        if existing_channel:
+            return f"You already have an application channel: {existing_channel.mention}"
+    
+    # Check if user already has an ongoing application (here or in another bot process)
+    if user.id in ongoing_applications or await state.get(SESSIONS, user.id) is not None:
+        return "You already have an application in progress. Please check your DMs to continue, or type 'cancel' to start over."
+    
+    return None
+
+async def start_queued_application(user_id, guild_id):
+    """Start the application of an applicant admitted from the waiting queue"""
+    guild = bot.get_guild(guild_id) if guild_id else None
+    user = applicant_cache.get(user_id)
+    if user is None:
+        try:
+            user = await bot.fetch_user(user_id)
+        except discord.HTTPException as e:
+            logger.error(f"Could not fetch queued applicant {user_id}: {e}")
+            admission.release(user_id)
+            return
+    
+    # The applicant may have been decided on, or started elsewhere, while they waited
+    reason = await application_blocker(user, guild)
+    if reason:
+        logger.info(f"Not starting queued application for {user.display_name}: {reason}")
+        admission.release(user_id)
+        try:
+            await user.send(reason)
+        except discord.HTTPException:
+            pass
+        return
+    
+    application_handler = ApplicationHandler(user, guild)
+    ongoing_applications[user_id] = application_handler
+    if await application_handler.start_application():
+        await application_handler.save_session()
+        logger.info(f"Started queued application for {user.display_name}")
+    else:
+        await forget_application(user_id)
+
+async def admission_worker():
+    """Start queued applications as tokens refill and sessions finish"""
+    while True:
+        admission_wakeup.clear()
+        try:
+            for user_id, guild_id in admission.drain():
+                await start_queued_application(user_id, guild_id)
+        except Exception as e:
+            logger.error(f"Error starting queued applications: {e}")
+        try:
+            # Poll while people are waiting so refilled tokens are picked up
+            await asyncio.wait_for(admission_wakeup.wait(), timeout=1 if admission.waiting else None)
+        except asyncio.TimeoutError:
+            pass
+
+async def record_decision(guild_id, user_id, decision):
+    """Start the re-application cooldown for a decision; returns the stored entry or None"""
+    entry = cooldown_index.record(guild_id, user_id, decision)
+    try:
+        if entry:
+            await state.set(DECISIONS, CooldownIndex.key(guild_id, user_id), entry)
+        else:
+            await state.delete(DECISIONS, CooldownIndex.key(guild_id, user_id))
+    except Exception as e:
+        logger.error(f"Error saving {decision} decision for {user_id}: {e}")
+    return entry
+
+async def cooldown_compactor():
+    """Refresh the cooldown index from shared state and drop expired decisions (deletes on the leader only)"""
+    while True:
+        try:
+            items = await state.items(DECISIONS)
+            cooldown_index.load(items)
+            expired = cooldown_index.compact(items)
+            if expired and leader_lease.is_leader:
+                for key in expired:
+                    await state.delete(DECISIONS, key)
+                logger.info(f"Compacted {len(expired)} expired re-application cooldown(s)")
+        except Exception as e:
+            logger.error(f"Error refreshing re-application cooldowns: {e}")
+        await asyncio.sleep(settings.COOLDOWN_REFRESH_INTERVAL)
+
+async def review_rebalancer():
+    """Reassign reviews that have gone stale; only the leader does any work"""
+    while True:
+        await asyncio.sleep(settings.REVIEW_REBALANCE_INTERVAL)
+        if not leader_lease.is_leader:
+            continue
+        try:
+            # Include reviews opened by other processes in guilds this one hasn't seen
+            for guild_id in await load_open_reviews():
+                scheduler = reviewer_schedulers[guild_id]
+                for channel_id in scheduler.stale_reviews():
+                    previous = scheduler.open_reviews[channel_id][0]
+                    reviewer_id = scheduler.reassign(channel_id)
+                    if reviewer_id is None:
+                        continue
+                    await state.set(REVIEWS, channel_id, {"guild_id": guild_id, "reviewer_id": reviewer_id, "assigned_at": time.time()})
+                    channel = bot.get_channel(channel_id)
+                    if channel:
+                        await channel.send(f"<@{reviewer_id}> this application has been waiting for review and was reassigned to you from <@{previous}>.")
+                    logger.info(f"Reassigned stale review {channel_id} from {previous} to {reviewer_id}")
+        except Exception as e:
+            logger.error(f"Error rebalancing reviews: {e}")
+
+async def digest_recovery():
+    """Send digest notices left in shared state by processes that stopped before flushing; only the leader does any work"""
+    while True:
+        await asyncio.sleep(notification_digest.interval + 60)
+        if not leader_lease.is_leader:
+            continue
+        try:
+            # Older than a full interval plus slack: the process that buffered them would have flushed by now
+            await notification_digest.recover(older_than=notification_digest.interval + 60)
+        except Exception as e:
+            logger.error(f"Error recovering digest notices: {e}")
+
+async def save_submission(submission):
+    submission["updated_at"] = time.time()
+    await state.set(SUBMISSIONS, submission["token"], submission)
+
+async def ensure_application_channel(submission, guild, user):
+    """Step 1: create the application channel, or find the one a previous attempt created"""
+    if submission["channel_id"]:
+        channel = guild.get_channel_or_thread(submission["channel_id"])
+        if channel:
+            return channel
+    
+    config = get_guild_config(guild.id)
+    if config.application_mode == "thread":
+        return await ensure_application_thread(submission, guild, user, config)
+    
+    # The default interview category is guaranteed to be set due to startup validation
+    category = guild.get_channel(config.interview_category_id)
+    
+    if not category or not isinstance(category, discord.CategoryChannel):
+        raise SubmissionError("Interview category not found. Please contact an officer.")
+    
+    # A previous attempt may have created the channel before its response was lost
+    channel = discord.utils.find(lambda c: c.topic and submission["token"] in c.topic, category.text_channels)
+    if channel is None:
+        channel = await guild.create_text_channel(
+            name=f"{config.channel_prefix}-{user.name.lower()}",
+            category=category,
+            overwrites=build_channel_overwrites(guild, user, config),
+            topic=f"Application reference {submission['token']}",
+        )
+    submission["channel_id"] = channel.id
+    await save_submission(submission)
+    return channel
+
+def role_mentions(config):
+    """Mentions for the configured officer/admin roles"""
+    return " ".join(f"<@&{role_id}>" for role_id in (config.officer_role_id, config.admin_role_id) if role_id)
+
+async def ensure_application_thread(submission, guild, user, config):
+    """Thread mode step 1: open a private thread in the review channel instead of a new channel"""
+    review_channel = guild.get_channel(config.review_channel_id)
+    if not review_channel or not isinstance(review_channel, discord.TextChannel):
+        raise SubmissionError("Review channel not found. Please contact an officer.")
+    
+    thread_name = f"{config.channel_prefix}-{user.name.lower()}"
+    # A previous attempt may have created the thread before its response was lost
+    thread = discord.utils.find(
+        lambda t: t.name == thread_name and t.owner_id == guild.me.id and not t.archived,
+        review_channel.threads,
+    )
+    if thread is None:
+        thread = await review_channel.create_thread(
+            name=thread_name,
+            type=discord.ChannelType.private_thread,
+            invitable=False,
+            reason=f"Application reference {submission['token']}",
+        )
+    
+    # Private threads are joined by adding members; mentioning a role adds its members
+    await thread.add_user(user)
+    mentions = role_mentions(config)
+    if mentions:
+        # With reviewer assignment only the assignee should be notified, so grant access silently
+        await thread.send(f"{mentions} a new application is ready for review.", silent=bool(config.reviewers))
+    submission["channel_id"] = thread.id
+    await save_submission(submission)
+    return thread
+
+async def find_submission_message(channel, token):
+    """Find an application embed already posted for this submission"""
+    async for message in channel.history(limit=10):
+        if message.author == channel.guild.me and message.embeds:
+            footer = message.embeds[0].footer.text or ""
+            if token in footer:
+                return message
+    return None
+
+async def run_submission_steps(submission, guild, user):
+    """Run the remaining submission steps; each finished step is recorded so retries resume after it"""
+    interview_channel = await ensure_application_channel(submission, guild, user)
+    
+    # Step 2: post the application embed
+    if not submission["message_id"]:
+        message = None
+        if submission["post_attempted"]:
+            message = await find_submission_message(interview_channel, submission["token"])
+        if message is None:
+            if "reviewer_id" not in submission:
+                submission["reviewer_id"] = await assign_reviewer(guild.id, interview_channel.id)
+            submission["post_attempted"] = True
+            await save_submission(submission)
+            config = get_guild_config(guild.id)
+            # Only the assigned reviewer is pinged; without one, fall back to the officer/admin roles.
+            # In digest mode officers are notified by the next digest instead.
+            if config.digest_channel_id:
+                content = user.mention
+            elif submission["reviewer_id"]:
+                content = f"{user.mention} <@{submission['reviewer_id']}>"
+            elif isinstance(interview_channel, discord.Thread):
+                # The roles were already pinged when the thread was opened
+                content = user.mention
+            else:
+                # No reviewer available: the configured officer/admin roles, if there are any
+                content = " ".join(filter(None, (user.mention, role_mentions(config))))
+            # Send the embed with mentions
+            message = await interview_channel.send(
+                content=content,
+                embed=build_application_embed(
+                    user,
+                    pinned_config(guild.id, submission["config_version"], submission["questions"]),
+                    submission["answers"],
+                    submission["token"],
+                    submission.get("asked"),
+                )
+            )
+            if config.digest_channel_id:
+                await notification_digest.add({
+                    "guild_id": guild.id,
+                    "channel_id": interview_channel.id,
+                    "applicant": user.display_name,
+                    "reviewer_id": submission["reviewer_id"],
+                })
+        submission["message_id"] = message.id
+        await save_submission(submission)
+        
+        # Warcraft Logs summaries are edited in later; the submission never waits for them
+        if wcl_client and submission.get("wcl_links"):
+            start_background_task(enrich_application(message, submission["wcl_links"]))
+        
+        # Index the channel so decisions can find the applicant without scanning history
+        await state.set(APPLICANTS, interview_channel.id, user.id)
+    
+    # Step 3: relay files attached to the answers, one question at a time so retries skip finished ones
+    relayed = submission.setdefault("relayed_questions", [])
+    pending_attachments = [record for record in submission.get("attachments", []) if record["question"] not in relayed]
+    if pending_attachments:
+        async def send_files(content, files):
+            await interview_channel.send(content=content, files=[discord.File(fp, filename=name) for name, fp in files])
+        
+        async def question_relayed(question, used):
+            relayed.append(question)
+            # Bytes uploaded so far, so a retry doesn't get a fresh budget
+            submission["relayed_bytes"] = used
+            await save_submission(submission)
+        
+        try:
+            uploaded, linked = await attachment_relay.relay(
+                pending_attachments, send_files, guild.filesize_limit, question_relayed, used=submission.get("relayed_bytes", 0)
+            )
+            logger.info(f"Relayed {uploaded} attachment(s) for {user.display_name}, {linked} posted as links")
+        except discord.HTTPException as e:
+            if is_transient_error(e):
+                raise
+            # The application is already posted; missing files must not fail the submission
+            logger.error(f"Could not post attachments for {user.display_name}: {e}")
+    
+    # Step 4: notify user of completion
+    if not submission["notified"]:
+        completion_embed = discord.Embed(
+            title="✅ Application Submitted Successfully!",
+            description=f"Your guild application has been submitted and reviewed by our officers.\n\nYour application channel: {interview_channel.mention}",
+            color=discord.Color.green()
+        )
+        try:
+            await user.send(embed=completion_embed)
+        except discord.Forbidden:
+            logger.warning(f"Could not send submission confirmation to {user.display_name} - DMs may be disabled")
+        submission["notified"] = True
+        await save_submission(submission)
+    
+    logger.info(f"Application completed for {user.display_name} ({user.id})")
+
+async def enrich_application(message, links):
+    """Add Warcraft Logs summaries for the linked characters to a posted application embed"""
+    try:
+        summaries = await asyncio.gather(*(wcl_client.character_summary(link) for link in links))
+        value = "\n".join(format_summary(link, summary) for link, summary in zip(links, summaries))
+        if len(value) > 1024:
+            value = value[:1021] + "..."
+        embed = message.embeds[0]
+        if len(embed) + len(value) > 5900:
+            logger.warning(f"No room for Warcraft Logs summary in application message {message.id}")
+            return
+        embed.add_field(name="📊 Warcraft Logs", value=value, inline=False)
+        await message.edit(embed=embed)
+    except Exception as e:
+        logger.error(f"Error adding Warcraft Logs summary to application message {message.id}: {e}")
+
+async def submit_application(submission, guild, user):
+    """Run the submission steps with jittered retries, queueing the submission if Discord stays unavailable"""
+    submission["status"] = "pending"
+    try:
+        await retry_async(
+            lambda: run_submission_steps(submission, guild, user),
+            is_transient_error,
+            attempts=settings.SUBMISSION_RETRY_ATTEMPTS,
+        )
+    except Exception as e:
+        if is_transient_error(e):
+            submission_breaker.record_failure()
+            logger.error(f"Submission {submission['token']} failed after retries, queueing: {e}")
+            await queue_submission(submission, user)
+            return
+        # Discord answered, it just refused: the breaker should not stay half-open
+        submission_breaker.record_success()
+        await state.delete(SUBMISSIONS, submission["token"])
+        raise
+    submission_breaker.record_success()
+    await state.delete(SUBMISSIONS, submission["token"])
+
+async def queue_submission(submission, user):
+    """Keep a submission for the background worker and tell the applicant it is safe"""
+    submission["status"] = "queued"
+    notify = not submission.get("queued_notice_sent")
+    submission["queued_notice_sent"] = True
+    await save_submission(submission)
+    logger.warning(f"Queued submission {submission['token']} for {user.display_name}")
+    if notify:
+        embed = discord.Embed(
+            title="⏳ Application Received",
+            description="Discord is having trouble right now, so your application has been saved and will be submitted automatically as soon as possible. You don't need to apply again.",
+            color=discord.Color.orange()
+        )
+        try:
+            await user.send(embed=embed)
+        except Exception as e:
+            logger.warning(f"Could not tell {user.display_name} their submission was queued: {e}")
+
+async def submission_worker():
+    """Retry queued (and abandoned) submissions; only the leader does any work"""
+    while True:
+        await asyncio.sleep(settings.SUBMISSION_RETRY_INTERVAL)
+        if not leader_lease.is_leader:
+            continue
+        try:
+            now = time.time()
+            for token, submission in (await state.items(SUBMISSIONS)).items():
+                stale = submission["status"] == "pending" and now - submission["updated_at"] > settings.SUBMISSION_STALE_SECONDS
+                if submission["status"] != "queued" and not stale:
+                    continue
+                if not submission_breaker.allow():
+                    break
+                guild = bot.get_guild(submission["guild_id"])
+                if guild is None:
+                    logger.error(f"Dropping submission {token}: guild {submission['guild_id']} not available")
+                    await state.delete(SUBMISSIONS, token)
+                    continue
+                user = applicant_cache.get(submission["user_id"])
+                try:
+                    if user is None:
+                        user = await bot.fetch_user(submission["user_id"])
+                        applicant_cache.put(user.id, user)
+                    await submit_application(submission, guild, user)
+                except SubmissionError as e:
+                    logger.error(f"Queued submission {token} failed: {e}")
+                    if user is not None:
+                        try:
+                            await user.send(f"❌ {e}")
+                        except Exception:
+                            pass
+                except Exception as e:
+                    if is_transient_error(e):
+                        submission_breaker.record_failure()
+                    logger.error(f"Error retrying submission {token}: {e}")
+        except Exception as e:
+            logger.error(f"Error in submission worker: {e}")
 
 class ApplicationView(discord.ui.View):
     def __init__(self):
         super().__init__(timeout=None)
+    
+    async def interaction_check(self, interaction: discord.Interaction):
+        # A standby process leaves the click to the leader
+        return handles_events()
 
     @discord.ui.button(label="Apply to Guild", style=discord.ButtonStyle.primary, custom_id="apply_button")
+    @profiler.profiled("ApplicationView.apply")
     async def apply(self, interaction: discord.Interaction, button: discord.ui.Button):
         user = interaction.user
         guild = interaction.guild
         
-        # Check if user already has an application channel
-        if guild:
-            channel_name = f"{APPLICATION_CHANNEL_PREFIX}-{user.name.lower()}"
-            existing_channel = discord.utils.get(guild.channels, name=channel_name)
-            if existing_channel:
-                await interaction.response.send_message(
-                    f"You already have an application channel: {existing_channel.mention}",
-                    ephemeral=True
-                )
-                return
+        reason = await application_blocker(user, guild)
+        if reason:
+            await interaction.response.send_message(reason, ephemeral=True)
+            return
         
-        # Check if user already has an ongoing application
-        if user.id in ongoing_applications:
+        # During a surge, applicants over the limit wait in line instead of all starting at once
+        decision = admission.request(user.id, guild.id if guild else None)
+        if decision is None:
+            await interaction.response.send_message(
+                "⏳ We're receiving a lot of applications right now. Please try again in a few minutes.",
+                ephemeral=True
+            )
+            return
+        if decision != ADMITTED:
+            applicant_cache.put(user.id, user)
             await interaction.response.send_message(
-                "You already have an application in progress. Please check your DMs to continue, or type 'cancel' to start over.",
+                f"⏳ Lots of people are applying right now! You're **#{decision}** in line. I'll DM you the first question as soon as it's your turn, no need to click again.",
                 ephemeral=True
             )
             return
@@ -359,14 +1109,14 @@ class ApplicationView(discord.ui.View):
         success = await application_handler.start_application()
         
         if success:
+            await application_handler.save_session()
             await interaction.response.send_message(
                 "✅ Application started! Please check your DMs to continue with the questions.",
                 ephemeral=True
             )
         else:
             # Remove from ongoing applications if failed to start
-            if user.id in ongoing_applications:
-                del ongoing_applications[user.id]
+            await forget_application(user.id)
             await interaction.response.send_message(
                 "❌ I couldn't send you a DM. Please make sure your DMs are open and try again.",
                 ephemeral=True
@@ -414,19 +1164,57 @@ def format_time_duration(seconds):
         hours = seconds // 3600
         return f"{hours} hour{'s' if hours != 1 else ''}"
 
+def cleanup_action(channel):
+    """Application threads are archived rather than deleted"""
+    return "archived" if isinstance(channel, discord.Thread) else "deleted"
+
 async def schedule_channel_deletion(channel, delay_seconds):
-    """Schedule a channel for deletion after a specified delay in seconds"""
+    """Schedule a channel for deletion (or a thread for archiving) after a specified delay in seconds.
+    
+    The schedule is kept in shared state and carried out by the deletion
+    sweeper, so it survives restarts and runs on exactly one process.
+    """
+    await state.set(DELETIONS, channel.id, {"due": time.time() + delay_seconds, "name": channel.name})
+
+async def delete_scheduled_channel(channel_id, entry):
+    """Delete one channel (or archive one thread) whose scheduled time has passed"""
     try:
-        await asyncio.sleep(delay_seconds)
-        if channel:
+        channel = bot.get_channel(int(channel_id)) or await bot.fetch_channel(int(channel_id))
+        if isinstance(channel, discord.Thread):
+            await channel.edit(archived=True, locked=True, reason="Application processed - automatic cleanup")
+            logger.info(f"Archived application thread: {entry.get('name', channel_id)}")
+        else:
             await channel.delete(reason="Application processed - automatic cleanup")
-            logger.info(f"Deleted application channel: {channel.name}")
+            logger.info(f"Deleted application channel: {entry.get('name', channel_id)}")
     except discord.NotFound:
         logger.info(f"Channel was already deleted")
     except Exception as e:
         logger.error(f"Error deleting channel: {e}")
+        return
+    await state.delete(DELETIONS, channel_id)
+
+async def deletion_sweeper():
+    """Periodically delete due channels; only the lease holder does any work"""
+    while True:
+        await asyncio.sleep(settings.DELETION_SWEEP_INTERVAL)
+        if not leader_lease.is_leader:
+            continue
+        try:
+            now = time.time()
+            for channel_id, entry in (await state.items(DELETIONS)).items():
+                if entry.get("due", 0) <= now:
+                    await delete_scheduled_channel(channel_id, entry)
+        except Exception as e:
+            logger.error(f"Error in deletion sweeper: {e}")
+
+def start_background_task(coro):
+    """Start a task and keep a reference so it is not garbage collected"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
 
-@bot.tree.command(name="noxpost", description="Post the guild application button (Admin only)")
+@discord.app_commands.command(name="noxpost", description="Post the guild application button (Admin only)")
 @discord.app_commands.default_permissions(administrator=True)
 async def post_application(interaction: discord.Interaction):
     embed = discord.Embed(
@@ -437,7 +1225,7 @@ async def post_application(interaction: discord.Interaction):
     
     await interaction.response.send_message(embed=embed, view=ApplicationView())
 
-@bot.tree.command(name="noxsync", description="Force sync slash commands (Admin only)")
+@discord.app_commands.command(name="noxsync", description="Force sync slash commands (Admin only)")
 @discord.app_commands.default_permissions(administrator=True)
 async def sync_commands(interaction: discord.Interaction):
     try:
@@ -454,11 +1242,40 @@ async def sync_commands(interaction: discord.Interaction):
         )
         logger.error(f"Manual sync failed: {e}")
 
-@bot.tree.command(name="noxreject", description="Reject an application")
+@discord.app_commands.command(name="noxprofile", description="Start or stop handler profiling (Admin only)")
+@discord.app_commands.describe(action="start, stop (writes flamegraph files) or status")
+@discord.app_commands.default_permissions(administrator=True)
+async def profile_command(interaction: discord.Interaction, action: str = "status"):
+    action = action.lower().strip()
+    if action == "start":
+        profiler.start()
+        message = f"✅ Profiling started. Use `/noxprofile stop` to write results to `{settings.PROFILE_DIR}`."
+    elif action == "stop":
+        # Writing results may take a moment, so acknowledge first
+        await interaction.response.defer(ephemeral=True)
+        path = await profiler.stop()
+        if path is None:
+            await interaction.followup.send("Profiling is not running.", ephemeral=True)
+        else:
+            await interaction.followup.send(f"✅ Profiling stopped. Results written to `{path}`.", ephemeral=True)
+        logger.info(f"Profiling stopped by {interaction.user.display_name}")
+        return
+    elif action == "status":
+        lines = [f"**Profiling:** {'running' if profiler.enabled else 'stopped'}"]
+        for name, stats in profiler.summary().items():
+            lines.append(f"`{name}`: {stats['calls']} calls, avg {stats['wall_avg_ms']}ms, max {stats['wall_max_ms']}ms, CPU {stats['cpu_total_ms']}ms")
+        message = "\n".join(lines)
+    else:
+        message = "❌ Unknown action. Use `start`, `stop` or `status`."
+    await interaction.response.send_message(message, ephemeral=True)
+    logger.info(f"Profiling {action} requested by {interaction.user.display_name}")
+
+@discord.app_commands.command(name="noxreject", description="Reject an application")
 @discord.app_commands.describe(
     reason="Reason for rejection (optional)",
     delete_time="Time until channel deletion (e.g., '10m', '1h', '30m') - if not specified, channel stays"
 )
+@profiler.profiled("reject_application")
 async def reject_application(
     interaction: discord.Interaction,
     reason: str = "No reason provided",
@@ -481,14 +1298,15 @@ async def reject_application(
         return
     
     # Check if user has permission (officer or admin role)
+    config = get_guild_config(interaction.guild.id)
     user_roles = [role.id for role in interaction.user.roles]
     has_permission = False
     
     if interaction.user.guild_permissions.administrator:
         has_permission = True
-    elif OFFICER_ROLE_ID and int(OFFICER_ROLE_ID) in user_roles:
+    elif config.officer_role_id and config.officer_role_id in user_roles:
         has_permission = True
-    elif ADMIN_ROLE_ID and int(ADMIN_ROLE_ID) in user_roles:
+    elif config.admin_role_id and config.admin_role_id in user_roles:
         has_permission = True
     
     if not has_permission:
@@ -500,16 +1318,16 @@ async def reject_application(
     
     # Check if this is an application channel
     channel = interaction.channel
-    if not isinstance(channel, discord.TextChannel):
+    if not isinstance(channel, (discord.TextChannel, discord.Thread)):
         await interaction.response.send_message(
-            "❌ This command can only be used in text channels.",
+            "❌ This command can only be used in text channels or threads.",
             ephemeral=True
         )
         return
     
-    if not channel.name.startswith(APPLICATION_CHANNEL_PREFIX):
+    if not channel.name.startswith(config.channel_prefix):
         await interaction.response.send_message(
-            f"❌ This command can only be used in application channels (channels starting with '{APPLICATION_CHANNEL_PREFIX}').",
+            f"❌ This command can only be used in application channels (channels starting with '{config.channel_prefix}').",
             ephemeral=True
         )
         return
@@ -526,7 +1344,7 @@ async def reject_application(
             return
     
     # Extract applicant name from channel name
-    applicant_name = channel.name.replace(f"{APPLICATION_CHANNEL_PREFIX}-", "").replace("-", " ").title()
+    applicant_name = channel.name.replace(f"{config.channel_prefix}-", "").replace("-", " ").title()
     
     # Create rejection embed
     rejection_embed = discord.Embed(
@@ -541,7 +1359,7 @@ async def reject_application(
         time_duration = format_time_duration(delete_seconds)
         rejection_embed.add_field(
             name="Channel Deletion",
-            value=f"This channel will be automatically deleted in {time_duration} (<t:{int(deletion_time.timestamp())}:R>)",
+            value=f"This channel will be automatically {cleanup_action(channel)} in {time_duration} (<t:{int(deletion_time.timestamp())}:R>)",
             inline=False
         )
     else:
@@ -552,6 +1370,7 @@ async def reject_application(
         )
     
     await interaction.response.send_message(embed=rejection_embed)
+    await release_review(interaction.guild.id, channel.id)
     
     # Try to notify the applicant via DM
     dm_status = "❌ Failed to send DM"
@@ -560,45 +1379,53 @@ async def reject_application(
         applicant = None
         applicant_id = None
         
-        logger.info(f"Looking for application embed in channel {channel.name}")
-        
-        # Look for the application embed in the channel
-        async for message in channel.history(limit=50):
-            if message.embeds and message.author == interaction.guild.me:
-                embed = message.embeds[0]
-                logger.info(f"Found embed with title: {embed.title}")
-                if embed.title and "Application from" in embed.title:
-                    logger.info(f"Found application embed, checking for Discord ID field")
-                    # Look for Discord ID field in the embed
-                    for field in embed.fields:
-                        logger.info(f"Checking field: {field.name} = {field.value}")
-                        if field.name == "Discord ID" and field.value:
-                            try:
-                                applicant_id = int(field.value)
-                                logger.info(f"Extracted applicant ID: {applicant_id}")
-                                break
-                            except ValueError:
-                                logger.error(f"Could not parse Discord ID: {field.value}")
-                                continue
-                    if applicant_id:
-                        break
+        # Check the applicant index first, then fall back to scanning the channel
+        applicant_id = await state.get(APPLICANTS, channel.id)
+        if applicant_id:
+            logger.info(f"Found applicant ID {applicant_id} in applicant index")
+        else:
+            logger.info(f"Looking for application embed in channel {channel.name}")
+            
+            # Look for the application embed in the channel
+            async for message in channel.history(limit=50):
+                if message.embeds and message.author == interaction.guild.me:
+                    embed = message.embeds[0]
+                    logger.info(f"Found embed with title: {embed.title}")
+                    if embed.title and "Application from" in embed.title:
+                        logger.info(f"Found application embed, checking for Discord ID field")
+                        # Look for Discord ID field in the embed
+                        for field in embed.fields:
+                            logger.info(f"Checking field: {field.name} = {field.value}")
+                            if field.name == "Discord ID" and field.value:
+                                try:
+                                    applicant_id = int(field.value)
+                                    logger.info(f"Extracted applicant ID: {applicant_id}")
+                                    break
+                                except ValueError:
+                                    logger.error(f"Could not parse Discord ID: {field.value}")
+                                    continue
+                        if applicant_id:
+                            break
         
         if not applicant_id:
             logger.error(f"Could not find Discord ID in application embed for channel {channel.name}")
             dm_status = "❌ Could not find applicant Discord ID"
         else:
+            cooldown = await record_decision(interaction.guild.id, applicant_id, "rejected")
+            
             # Try to get the applicant user object using the ID
             applicant = None
             try:
-                # First try to get from guild cache
-                applicant = interaction.guild.get_member(applicant_id)
+                # First try the applicant cache, then the guild cache
+                applicant = applicant_cache.get(applicant_id) or interaction.guild.get_member(applicant_id)
                 if applicant:
-                    logger.info(f"Found applicant in guild cache: {applicant.display_name} ({applicant.id})")
+                    logger.info(f"Found applicant in cache: {applicant.display_name} ({applicant.id})")
                 else:
                     # If not in cache, fetch directly from Discord API
                     logger.info(f"Member not in cache, fetching from Discord API...")
                     applicant = await bot.fetch_user(applicant_id)
                     logger.info(f"Fetched applicant from API: {applicant.display_name} ({applicant.id})")
+                applicant_cache.put(applicant_id, applicant)
             except discord.NotFound:
                 logger.error(f"User with ID {applicant_id} not found on Discord")
                 dm_status = "❌ User not found on Discord"
@@ -618,7 +1445,7 @@ async def reject_application(
                 dm_embed.add_field(name="Reason", value=reason, inline=False)
                 dm_embed.add_field(
                     name="What's Next?",
-                    value="You're welcome to apply again in the future. Feel free to reach out to our officers if you have any questions.",
+                    value=(f"You're welcome to apply again from <t:{int(cooldown['until'])}:D>." if cooldown else "You're welcome to apply again in the future.") + " Feel free to reach out to our officers if you have any questions.",
                     inline=False
                 )
                 
@@ -644,17 +1471,18 @@ async def reject_application(
     
     # Schedule channel deletion if requested
     if delete_seconds is not None:
-        asyncio.create_task(schedule_channel_deletion(channel, delete_seconds))
+        await schedule_channel_deletion(channel, delete_seconds)
         time_duration = format_time_duration(delete_seconds)
-        logger.info(f"Application rejected by {interaction.user.display_name} in {channel.name}. Channel scheduled for deletion in {time_duration}.")
+        logger.info(f"Application rejected by {interaction.user.display_name} in {channel.name}. Channel scheduled to be {cleanup_action(channel)} in {time_duration}.")
     else:
         logger.info(f"Application rejected by {interaction.user.display_name} in {channel.name}. Channel will remain open.")
 
-@bot.tree.command(name="noxapprove", description="Approve an application")
+@discord.app_commands.command(name="noxapprove", description="Approve an application")
 @discord.app_commands.describe(
     welcome_message="Custom welcome message (optional)",
     delete_time="Time until channel deletion (e.g., '10m', '1h', '30m') - if not specified, channel stays"
 )
+@profiler.profiled("approve_application")
 async def approve_application(
     interaction: discord.Interaction,
     welcome_message: str = "Welcome to the guild! We're excited to have you join us.",
@@ -677,14 +1505,15 @@ async def approve_application(
         return
     
     # Check if user has permission (officer or admin role)
+    config = get_guild_config(interaction.guild.id)
     user_roles = [role.id for role in interaction.user.roles]
     has_permission = False
     
     if interaction.user.guild_permissions.administrator:
         has_permission = True
-    elif OFFICER_ROLE_ID and int(OFFICER_ROLE_ID) in user_roles:
+    elif config.officer_role_id and config.officer_role_id in user_roles:
         has_permission = True
-    elif ADMIN_ROLE_ID and int(ADMIN_ROLE_ID) in user_roles:
+    elif config.admin_role_id and config.admin_role_id in user_roles:
         has_permission = True
     
     if not has_permission:
@@ -696,16 +1525,16 @@ async def approve_application(
     
     # Check if this is an application channel
     channel = interaction.channel
-    if not isinstance(channel, discord.TextChannel):
+    if not isinstance(channel, (discord.TextChannel, discord.Thread)):
         await interaction.response.send_message(
-            "❌ This command can only be used in text channels.",
+            "❌ This command can only be used in text channels or threads.",
             ephemeral=True
         )
         return
     
-    if not channel.name.startswith(APPLICATION_CHANNEL_PREFIX):
+    if not channel.name.startswith(config.channel_prefix):
         await interaction.response.send_message(
-            f"❌ This command can only be used in application channels (channels starting with '{APPLICATION_CHANNEL_PREFIX}').",
+            f"❌ This command can only be used in application channels (channels starting with '{config.channel_prefix}').",
             ephemeral=True
         )
         return
@@ -722,7 +1551,7 @@ async def approve_application(
             return
     
     # Extract applicant name from channel name
-    applicant_name = channel.name.replace(f"{APPLICATION_CHANNEL_PREFIX}-", "").replace("-", " ").title()
+    applicant_name = channel.name.replace(f"{config.channel_prefix}-", "").replace("-", " ").title()
     
     # Create acceptance embed
     acceptance_embed = discord.Embed(
@@ -743,7 +1572,7 @@ async def approve_application(
         time_duration = format_time_duration(delete_seconds)
         acceptance_embed.add_field(
             name="Channel Deletion",
-            value=f"This channel will be automatically deleted in {time_duration} (<t:{int(deletion_time.timestamp())}:R>)",
+            value=f"This channel will be automatically {cleanup_action(channel)} in {time_duration} (<t:{int(deletion_time.timestamp())}:R>)",
             inline=False
         )
     else:
@@ -754,6 +1583,7 @@ async def approve_application(
         )
     
     await interaction.response.send_message(embed=acceptance_embed)
+    await release_review(interaction.guild.id, channel.id)
     
     # Try to notify the applicant via DM
     dm_status = "❌ Failed to send DM"
@@ -762,45 +1592,53 @@ async def approve_application(
         applicant = None
         applicant_id = None
         
-        logger.info(f"Looking for application embed in channel {channel.name}")
-        
-        # Look for the application embed in the channel
-        async for message in channel.history(limit=50):
-            if message.embeds and message.author == interaction.guild.me:
-                embed = message.embeds[0]
-                logger.info(f"Found embed with title: {embed.title}")
-                if embed.title and "Application from" in embed.title:
-                    logger.info(f"Found application embed, checking for Discord ID field")
-                    # Look for Discord ID field in the embed
-                    for field in embed.fields:
-                        logger.info(f"Checking field: {field.name} = {field.value}")
-                        if field.name == "Discord ID" and field.value:
-                            try:
-                                applicant_id = int(field.value)
-                                logger.info(f"Extracted applicant ID: {applicant_id}")
-                                break
-                            except ValueError:
-                                logger.error(f"Could not parse Discord ID: {field.value}")
-                                continue
-                    if applicant_id:
-                        break
+        # Check the applicant index first, then fall back to scanning the channel
+        applicant_id = await state.get(APPLICANTS, channel.id)
+        if applicant_id:
+            logger.info(f"Found applicant ID {applicant_id} in applicant index")
+        else:
+            logger.info(f"Looking for application embed in channel {channel.name}")
+            
+            # Look for the application embed in the channel
+            async for message in channel.history(limit=50):
+                if message.embeds and message.author == interaction.guild.me:
+                    embed = message.embeds[0]
+                    logger.info(f"Found embed with title: {embed.title}")
+                    if embed.title and "Application from" in embed.title:
+                        logger.info(f"Found application embed, checking for Discord ID field")
+                        # Look for Discord ID field in the embed
+                        for field in embed.fields:
+                            logger.info(f"Checking field: {field.name} = {field.value}")
+                            if field.name == "Discord ID" and field.value:
+                                try:
+                                    applicant_id = int(field.value)
+                                    logger.info(f"Extracted applicant ID: {applicant_id}")
+                                    break
+                                except ValueError:
+                                    logger.error(f"Could not parse Discord ID: {field.value}")
+                                    continue
+                        if applicant_id:
+                            break
         
         if not applicant_id:
             logger.error(f"Could not find Discord ID in application embed for channel {channel.name}")
             dm_status = "❌ Could not find applicant Discord ID"
         else:
+            await record_decision(interaction.guild.id, applicant_id, "approved")
+            
             # Try to get the applicant user object using the ID
             applicant = None
             try:
-                # First try to get from guild cache
-                applicant = interaction.guild.get_member(applicant_id)
+                # First try the applicant cache, then the guild cache
+                applicant = applicant_cache.get(applicant_id) or interaction.guild.get_member(applicant_id)
                 if applicant:
-                    logger.info(f"Found applicant in guild cache: {applicant.display_name} ({applicant.id})")
+                    logger.info(f"Found applicant in cache: {applicant.display_name} ({applicant.id})")
                 else:
                     # If not in cache, fetch directly from Discord API
                     logger.info(f"Member not in cache, fetching from Discord API...")
                     applicant = await bot.fetch_user(applicant_id)
                     logger.info(f"Fetched applicant from API: {applicant.display_name} ({applicant.id})")
+                applicant_cache.put(applicant_id, applicant)
             except discord.NotFound:
                 logger.error(f"User with ID {applicant_id} not found on Discord")
                 dm_status = "❌ User not found on Discord"
@@ -846,30 +1684,102 @@ async def approve_application(
     
     # Schedule channel deletion if requested
     if delete_seconds is not None:
-        asyncio.create_task(schedule_channel_deletion(channel, delete_seconds))
+        await schedule_channel_deletion(channel, delete_seconds)
         time_duration = format_time_duration(delete_seconds)
-        logger.info(f"Application approved by {interaction.user.display_name} in {channel.name}. Channel scheduled for deletion in {time_duration}.")
+        logger.info(f"Application approved by {interaction.user.display_name} in {channel.name}. Channel scheduled to be {cleanup_action(channel)} in {time_duration}.")
     else:
         logger.info(f"Application approved by {interaction.user.display_name} in {channel.name}. Channel will remain open.")
 
-@bot.event
 async def on_message(message):
-    # Ignore messages from bots
-    if message.author.bot:
+    # Ignore messages from bots, and everything on a standby process
+    if message.author.bot or not handles_events():
         return
     
     # Process DM messages for ongoing applications
     if isinstance(message.channel, discord.DMChannel):
-        user_id = message.author.id
-        if user_id in ongoing_applications:
-            application_handler = ongoing_applications[user_id]
+        if event_recorder:
+            event_recorder.record_message(message)
+        application_handler = await resume_application(message.author)
+        if application_handler is not None:
             await application_handler.process_answer(message)
             return
     
     # Process commands
     await bot.process_commands(message)
 
-@bot.event
+def heartbeat_age():
+    """Seconds since the last gateway heartbeat ACK (oldest across shards), or None if not connected"""
+    if isinstance(bot, commands.AutoShardedBot):
+        websockets = [shard._parent.ws for shard in bot.shards.values()]
+    else:
+        websockets = [bot.ws]
+    ages = []
+    for ws in websockets:
+        # discord.py does not expose the ACK time publicly
+        keep_alive = getattr(ws, "_keep_alive", None)
+        last_ack = getattr(keep_alive, "_last_ack", None)
+        if last_ack is not None:
+            ages.append(time.perf_counter() - last_ack)
+    return max(ages) if ages else None
+
+def health_report():
+    """Build the /healthz payload and decide whether the process is healthy"""
+    loop_lag = watchdog.current_lag()
+    last_heartbeat_age = heartbeat_age()
+    gateway_latency = bot.latency if bot.is_ready() else None
+    healthy = (
+        bot.is_ready()
+        and not bot.is_closed()
+        and loop_lag < watchdog.threshold * 4
+        and last_heartbeat_age is not None
+        and last_heartbeat_age < settings.HEARTBEAT_MAX_AGE
+    )
+    return healthy, {
+        "status": "ok" if healthy else "unhealthy",
+        "instance": settings.INSTANCE_ID,
+        "gateway_latency_ms": round(gateway_latency * 1000, 1) if gateway_latency is not None else None,
+        "loop_lag_ms": round(loop_lag * 1000, 1),
+        "max_loop_lag_ms": round(watchdog.max_lag * 1000, 1),
+        "last_heartbeat_age_s": round(last_heartbeat_age, 1) if last_heartbeat_age is not None else None,
+        "queues": {
+            "ongoing_applications": len(ongoing_applications),
+            "background_tasks": len(background_tasks),
+            "digest_buffered": len(notification_digest.items),
+            "admission_waiting": len(admission.waiting),
+            "admission_active": len(admission.active),
+        },
+        "leader": leader_lease.is_leader,
+        "applicant_cache": applicant_cache.stats(),
+        "submission_breaker": submission_breaker.state,
+        "wcl_cache": wcl_client.cache.stats() if wcl_client else None,
+        "open_reviews": sum(len(scheduler.open_reviews) for scheduler in reviewer_schedulers.values()),
+    }
+
+async def on_interaction(interaction):
+    if event_recorder:
+        event_recorder.record_interaction(interaction)
+
+async def setup_hook():
+    global health_server, running
+    running = True
+    # Background jobs start once per process, not on every reconnect
+    start_background_task(watchdog.run())
+    if config_watcher:
+        start_background_task(config_watcher.run())
+    start_background_task(leader_lease.run())
+    start_background_task(deletion_sweeper())
+    start_background_task(submission_worker())
+    start_background_task(review_rebalancer())
+    start_background_task(digest_recovery())
+    start_background_task(admission_worker())
+    start_background_task(cooldown_compactor())
+    if event_recorder:
+        start_background_task(event_recorder.run())
+    if settings.HEALTH_PORT:
+        health_server = HealthServer(health_report, settings.HEALTH_HOST, int(settings.HEALTH_PORT))
+        await health_server.start()
+    logger.info(f"Instance {settings.INSTANCE_ID} using state backend {settings.STATE_BACKEND_URL.split('://')[0]}")
+
 async def on_ready():
     if bot.user:
         logger.info(f'Bot logged in as {bot.user.name} (ID: {bot.user.id})')
@@ -886,7 +1796,146 @@ async def on_ready():
     # Add persistent view
     bot.add_view(ApplicationView())
     
+    # Restore open reviews so the rebalancer sees them; needs the guild cache for reviews saved without a guild
+    try:
+        guild_ids = await load_open_reviews()
+        logger.info(f"Loaded open reviews for {len(guild_ids)} guild(s)")
+    except Exception as e:
+        logger.error(f"Failed to load open reviews: {e}")
+    
     logger.info('Application bot is ready and listening for applications')
 
-bot.run(TOKEN)
+async def shutdown():
+    """Stop background work and release the subsystems' sessions, connections and files"""
+    # Cancelling the background tasks gives up leadership while the state backend is still open
+    tasks = list(background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    closers = [attachment_relay.close, state.close]
+    if wcl_client:
+        closers.insert(0, wcl_client.close)
+    if health_server:
+        closers.insert(0, health_server.stop)
+    for close in closers:
+        try:
+            await close()
+        except Exception as e:
+            logger.error(f"Error closing {type(close.__self__).__name__}: {e}")
+    if event_recorder:
+        event_recorder.close()
+    logger.info(f"Instance {settings.INSTANCE_ID} shut down")
+
+class ShutdownOnClose:
+    """Shuts the subsystems down when discord.py closes the bot (Ctrl+C, SIGTERM or bot.close())"""
+    
+    async def close(self):
+        if self.is_closed():
+            return
+        # Buffered digest notices go out while Discord is still reachable; unsent ones stay in shared state
+        await notification_digest.close()
+        await super().close()
+        await shutdown()
+
+class ApplicationCommandTree(discord.app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction):
+        # A standby process leaves slash commands to the leader
+        return handles_events()
+
+class ApplicationBot(ShutdownOnClose, commands.Bot):
+    pass
+
+class ShardedApplicationBot(ShutdownOnClose, commands.AutoShardedBot):
+    pass
+
+def create_bot(app_settings):
+    """Build the bot and its subsystems from settings; nothing connects to Discord until bot.run()"""
+    global settings, bot, state, leader_lease, watchdog, applicant_cache, submission_breaker, notification_digest
+    global admission, admission_wakeup, attachment_relay, cooldown_index, event_recorder, wcl_client
+    global env_config, current_config, config_watcher, health_server, running
+    if running and not bot.is_closed():
+        raise RuntimeError("Only one app can run per process: close the running bot before creating another")
+    settings = app_settings
+    health_server = None
+    running = False
+    ongoing_applications.clear()
+    reviewer_schedulers.clear()
+
+    intents = discord.Intents.default()
+
+    if settings.BOT_SHARDED:
+        # Each process can own a subset of shards, e.g. SHARD_COUNT=4 SHARD_IDS=0,1
+        bot = ShardedApplicationBot(
+            command_prefix="!",
+            intents=intents,
+            tree_cls=ApplicationCommandTree,
+            shard_count=int(settings.SHARD_COUNT) if settings.SHARD_COUNT else None,
+            shard_ids=[int(i) for i in settings.SHARD_IDS.split(",")] if settings.SHARD_IDS else None,
+        )
+    else:
+        bot = ApplicationBot(command_prefix="!", intents=intents, tree_cls=ApplicationCommandTree)
+
+    for command in (post_application, sync_commands, profile_command, reject_application, approve_application):
+        bot.tree.add_command(command)
+    for handler in (on_message, on_interaction, setup_hook, on_ready):
+        bot.event(handler)
+    bot.add_dynamic_items(ChoiceSelect)
+
+    state = create_state_backend(settings.STATE_BACKEND_URL)
+    leader_lease = LeaderLease(state, "leader", settings.INSTANCE_ID, settings.LEADER_LEASE_SECONDS)
+    watchdog = LoopLagWatchdog(threshold=settings.LOOP_LAG_THRESHOLD_MS / 1000)
+    profiler.output_dir = settings.PROFILE_DIR
+    profiler.sample_interval = settings.PROFILE_SAMPLE_INTERVAL_MS / 1000
+    applicant_cache = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_TTL)
+    submission_breaker = CircuitBreaker(settings.CIRCUIT_BREAKER_THRESHOLD, settings.CIRCUIT_BREAKER_RESET)
+    notification_digest = NotificationDigest(
+        send_digest,
+        settings.DIGEST_INTERVAL_MINUTES * 60,
+        settings.DIGEST_MAX_APPLICATIONS,
+        store=state,
+        namespace=DIGEST,
+        key=lambda item: item["channel_id"],
+    )
+    admission = AdmissionController(
+        rate=settings.APPLY_RATE_PER_MINUTE / 60,
+        burst=settings.APPLY_BURST,
+        guild_rate=settings.GUILD_APPLY_RATE_PER_MINUTE / 60,
+        guild_burst=settings.GUILD_APPLY_BURST,
+        max_active=settings.MAX_ACTIVE_APPLICATIONS,
+        max_waiting=settings.MAX_WAITING_APPLICANTS,
+        idle_timeout=settings.APPLICATION_IDLE_MINUTES * 60,
+    )
+    admission_wakeup = asyncio.Event()
+    attachment_relay = AttachmentRelay(budget_bytes=settings.ATTACHMENT_BUDGET_MB * 1024 * 1024)
+    cooldown_index = CooldownIndex({
+        "rejected": settings.REAPPLY_COOLDOWN_REJECTED_HOURS * 3600,
+        "approved": settings.REAPPLY_COOLDOWN_APPROVED_HOURS * 3600,
+    })
+    event_recorder = EventRecorder(settings.EVENT_LOG) if settings.EVENT_LOG else None
+    wcl_client = WarcraftLogsClient(settings.WCL_CLIENT_ID, settings.WCL_CLIENT_SECRET, settings.WCL_CACHE_SIZE, settings.WCL_CACHE_TTL, settings.WCL_TIMEOUT) if settings.WCL_CLIENT_ID and settings.WCL_CLIENT_SECRET else None
+
+    env_config = BotConfig(
+        "env",
+        questions,
+        officer_role_id=env_role_id("OFFICER_ROLE_ID", settings.OFFICER_ROLE_ID),
+        admin_role_id=env_role_id("ADMIN_ROLE_ID", settings.ADMIN_ROLE_ID),
+        channel_prefix=settings.APPLICATION_CHANNEL_PREFIX,
+        interview_category_id=settings.INTERVIEW_CATEGORY_ID,
+        application_mode=settings.APPLICATION_MODE,
+        review_channel_id=settings.REVIEW_CHANNEL_ID,
+        reviewers=settings.REVIEWERS,
+        digest_channel_id=settings.DIGEST_CHANNEL_ID,
+    )
+    current_config = env_config
+    config_watcher = ConfigWatcher(settings.CONFIG_FILE, env_config, apply_config, settings.CONFIG_RELOAD_INTERVAL) if settings.CONFIG_FILE else None
+    if config_watcher:
+        try:
+            apply_config(config_watcher.load_initial())
+        except (OSError, ConfigError) as e:
+            raise RuntimeError(f"Invalid configuration file {settings.CONFIG_FILE}: {e}")
+    return bot
 
+if __name__ == "__main__":
+    # `python src/bot.py` still starts the bot; main.py is the entry point
+    from main import main
+    main()
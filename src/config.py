@@ -0,0 +1,226 @@
+"""
+Hot-reloadable bot configuration.
+
+The questionnaire (see questionnaire.py), role IDs, channel settings and limits can be kept in a
+versioned JSON file, with optional per-guild overrides under "guilds". A
+watcher polls the file, validates it and compiles it into an immutable
+BotConfig, and swaps it in with a single reference assignment, so readers
+always see either the old or the new configuration, never a mix. An invalid
+file is rejected and the previous configuration stays active.
+
+Per-guild configurations are validated when the file is loaded but only
+built the first time a guild is seen, then cached on the root config (so a
+reload drops the cache along with the old config).
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+
+from questionnaire import QuestionnaireError, compile_questionnaire
+from reviewers import parse_reviewers
+
+logger = logging.getLogger(__name__)
+
+PREFIX_PATTERN = re.compile(r"^[a-z0-9_-]{1,50}$")
+
+# Settings that can be set at the top level of the file or per guild, with their defaults
+SETTINGS = {
+    "officer_role_id": None,
+    "admin_role_id": None,
+    "channel_prefix": "application",
+    "interview_category_id": None,
+    "application_mode": "channel",
+    "review_channel_id": None,
+    "digest_channel_id": None,
+    "max_answer_length": 800,
+    "reviewers": "",
+}
+
+# JSON keys that differ from the setting names
+FILE_KEYS = {"application_channel_prefix": "channel_prefix"}
+
+
+class ConfigError(ValueError):
+    """Raised when a configuration file fails validation"""
+
+
+class BotConfig:
+    """Compiled, read-only configuration snapshot"""
+
+    __slots__ = ("version", "questions", "questionnaire", "settings", "guild_overrides", "_guild_configs") + tuple(SETTINGS)
+
+    def __init__(self, version, questions, guild_overrides=None, **settings):
+        unknown = set(settings) - set(SETTINGS)
+        if unknown:
+            raise TypeError(f"Unknown settings: {', '.join(sorted(unknown))}")
+        settings = {**SETTINGS, **settings}
+
+        def set_(name, value):
+            object.__setattr__(self, name, value)
+
+        set_("version", str(version))
+        # Raw definitions are kept for session snapshots; the compiled graph drives the DM flow
+        set_("questions", tuple(questions))
+        set_("questionnaire", compile_questionnaire(questions))
+        set_("settings", settings)
+        set_("guild_overrides", dict(guild_overrides or {}))
+        set_("_guild_configs", {})
+        for name in ("officer_role_id", "admin_role_id", "interview_category_id", "review_channel_id", "digest_channel_id"):
+            set_(name, int(settings[name]) if settings[name] else None)
+        set_("channel_prefix", settings["channel_prefix"])
+        set_("application_mode", settings["application_mode"])
+        set_("max_answer_length", int(settings["max_answer_length"]))
+        set_("reviewers", parse_reviewers(settings["reviewers"]))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BotConfig is read-only")
+
+    def with_questions(self, version, questions):
+        """Copy of this configuration pinned to another questionnaire version"""
+        return BotConfig(version, questions, **self.settings)
+
+    def for_guild(self, guild_id):
+        """Configuration for one guild: the top-level config plus that guild's overrides"""
+        if guild_id is None:
+            return self
+        config = self._guild_configs.get(guild_id)
+        if config is None:
+            overrides = self.guild_overrides.get(str(guild_id))
+            if overrides is None:
+                config = self
+            else:
+                questions = overrides.get("questions", self.questions)
+                settings = {key: value for key, value in overrides.items() if key != "questions"}
+                config = BotConfig(self.version, questions, **{**self.settings, **settings})
+            self._guild_configs[guild_id] = config
+        return config
+
+
+def _id(section, key):
+    value = section.get(key)
+    if value in (None, ""):
+        return None
+    if not str(value).isdigit():
+        raise ConfigError(f"{key} must be a numeric Discord ID")
+    return str(value)
+
+
+def _validate_section(section, where):
+    """Validate one top-level or guild section; returns (questions or None, settings)"""
+    if not isinstance(section, dict):
+        raise ConfigError(f"{where} must be a JSON object")
+    questions = section.get("questions")
+    if questions is not None:
+        if not isinstance(questions, list):
+            raise ConfigError(f"{where}: questions must be a list")
+        try:
+            compile_questionnaire(questions)
+        except QuestionnaireError as e:
+            raise ConfigError(f"{where}: {e}") from e
+
+    settings = {}
+    for key, value in section.items():
+        name = FILE_KEYS.get(key, key)
+        if name in ("questions", "version", "guilds"):
+            continue
+        if name not in SETTINGS:
+            raise ConfigError(f"{where}: unknown setting {key}")
+        if name.endswith("_id"):
+            value = _id(section, key)
+        elif name == "channel_prefix" and (not isinstance(value, str) or not PREFIX_PATTERN.match(value)):
+            raise ConfigError(f"{where}: {key} must be 1-50 lowercase letters, digits, '-' or '_'")
+        elif name == "application_mode" and value not in ("channel", "thread"):
+            raise ConfigError(f"{where}: application_mode must be 'channel' or 'thread'")
+        elif name == "max_answer_length" and (not isinstance(value, int) or not 50 <= value <= 1024):
+            raise ConfigError(f"{where}: max_answer_length must be between 50 and 1024")
+        elif name == "reviewers":
+            try:
+                parse_reviewers(value)
+            except (ValueError, AttributeError):
+                raise ConfigError(f"{where}: reviewers must look like 'user_id@start-end,user_id'")
+        settings[name] = value
+    return questions, settings
+
+
+def _check_complete(settings, where):
+    if settings["application_mode"] == "thread" and not settings["review_channel_id"]:
+        raise ConfigError(f"{where}: review_channel_id is required in thread mode")
+
+
+def compile_config(data, defaults):
+    """Validate raw configuration data and compile it on top of `defaults`"""
+    if not isinstance(data, dict):
+        raise ConfigError("Configuration must be a JSON object")
+    if "version" not in data:
+        raise ConfigError("Configuration must have a version")
+    questions, settings = _validate_section(data, "configuration")
+    settings = {**defaults.settings, **settings}
+    _check_complete(settings, "configuration")
+
+    guilds = data.get("guilds", {})
+    if not isinstance(guilds, dict):
+        raise ConfigError("guilds must map guild IDs to settings")
+    overrides = {}
+    for guild_id, section in guilds.items():
+        if not str(guild_id).isdigit():
+            raise ConfigError(f"guilds: {guild_id} is not a numeric guild ID")
+        guild_questions, guild_settings = _validate_section(section, f"guild {guild_id}")
+        _check_complete({**settings, **guild_settings}, f"guild {guild_id}")
+        if guild_questions is not None:
+            guild_settings["questions"] = guild_questions
+        overrides[str(guild_id)] = guild_settings
+    return BotConfig(data["version"], questions or defaults.questions, overrides, **settings)
+
+
+def load_config_file(path, defaults):
+    with open(path, encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"Invalid JSON: {e}") from e
+    return compile_config(data, defaults)
+
+
+class ConfigWatcher:
+    """Polls a configuration file and calls `on_reload(config)` with each new valid version"""
+
+    def __init__(self, path, defaults, on_reload, interval=5):
+        self.path = path
+        self.defaults = defaults
+        self.on_reload = on_reload
+        self.interval = interval
+        self._mtime = None
+
+    def _changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        return True
+
+    def load_initial(self):
+        """Load the file synchronously at startup; errors are raised instead of logged"""
+        self._changed()
+        return load_config_file(self.path, self.defaults)
+
+    async def check(self):
+        """Reload the file if it changed; returns the new config or None"""
+        if not self._changed():
+            return None
+        try:
+            config = await asyncio.to_thread(load_config_file, self.path, self.defaults)
+        except (OSError, ConfigError) as e:
+            logger.error(f"Rejected configuration file {self.path}: {e}")
+            return None
+        self.on_reload(config)
+        return config
+
+    async def run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
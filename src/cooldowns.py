@@ -0,0 +1,59 @@
+"""
+Re-application cooldowns after an application is approved or rejected.
+
+Decisions are kept in memory as {(guild_id, user_id): (decision, until)} so
+the Apply button can check them with a single dict lookup, and persisted in
+the shared state backend so they survive restarts. Only decisions with a
+cooldown are stored, and expired entries are dropped both lazily on lookup
+and by periodic compaction.
+"""
+import time
+
+
+class CooldownIndex:
+    def __init__(self, cooldowns, clock=time.time):
+        self.cooldowns = dict(cooldowns)  # decision -> seconds
+        self.clock = clock
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(guild_id, user_id):
+        """Key used in the shared state backend"""
+        return f"{guild_id}:{user_id}"
+
+    def record(self, guild_id, user_id, decision):
+        """Start the cooldown for a decision; returns the state entry to persist, or None without a cooldown"""
+        seconds = self.cooldowns.get(decision, 0)
+        if seconds <= 0:
+            self._entries.pop((guild_id, user_id), None)
+            return None
+        until = self.clock() + seconds
+        self._entries[(guild_id, user_id)] = (decision, until)
+        return {"decision": decision, "until": until}
+
+    def check(self, guild_id, user_id):
+        """(decision, until) while the user is cooling down in this guild, otherwise None"""
+        entry = self._entries.get((guild_id, user_id))
+        if entry is None:
+            return None
+        if entry[1] <= self.clock():
+            del self._entries[(guild_id, user_id)]
+            return None
+        return entry
+
+    def load(self, items):
+        """Merge in the entries stored in the shared state backend (including other processes' decisions)"""
+        now = self.clock()
+        for key, value in items.items():
+            guild_id, _, user_id = key.partition(":")
+            if value["until"] > now:
+                self._entries[(int(guild_id), int(user_id))] = (value["decision"], value["until"])
+
+    def compact(self, items):
+        """Drop expired entries from memory; returns the expired keys of `items` to delete from state"""
+        now = self.clock()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[1] > now}
+        return [key for key, value in items.items() if value["until"] <= now]
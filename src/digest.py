@@ -0,0 +1,95 @@
+"""
+Buffers new-submission notices and flushes them as one summary message.
+
+A flush happens when `max_items` notices are buffered or `interval`
+seconds after the first buffered notice, whichever comes first.
+
+With a `store` (a shared state backend), every notice is also kept there
+under `key(item)` until it has been sent, so notices buffered by a process
+that stops before flushing are not lost: `recover()` adopts and sends
+notices that have been waiting for longer than any live process would
+keep them.
+"""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDigest:
+    def __init__(self, send_summary, interval=900, max_items=10, store=None, namespace="digest", key=None, clock=time.time):
+        # Async callable receiving a list of items; it may return the items it could not send
+        self.send_summary = send_summary
+        self.interval = interval
+        self.max_items = max_items
+        self.store = store
+        self.namespace = namespace
+        self.key = key
+        self.clock = clock
+        self.items = []
+        self._timer = None
+        self._lock = asyncio.Lock()
+
+    async def add(self, item):
+        self.items.append(item)
+        if self.store is not None:
+            try:
+                await self.store.set(self.namespace, self.key(item), {"item": item, "added_at": self.clock()})
+            except Exception as e:
+                logger.error(f"Error saving digest notice to shared state: {e}")
+        if len(self.items) >= self.max_items:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        async with self._lock:
+            if self._timer is not None and self._timer is not asyncio.current_task():
+                self._timer.cancel()
+            self._timer = None
+            items, self.items = self.items, []
+            if not items:
+                return
+            try:
+                unsent = await self.send_summary(items) or []
+            except Exception as e:
+                logger.error(f"Error sending notification digest, keeping {len(items)} notice(s) for next time: {e}")
+                unsent = items
+            if self.store is not None:
+                for item in items:
+                    if item not in unsent:
+                        try:
+                            await self.store.delete(self.namespace, self.key(item))
+                        except Exception as e:
+                            logger.error(f"Error removing sent digest notice from shared state: {e}")
+            if unsent:
+                self.items = unsent + self.items
+                if self._timer is None:
+                    self._timer = asyncio.create_task(self._flush_later())
+
+    async def close(self):
+        """Flush one last time and stop the timer; with a store, unsent notices stay there for recover()"""
+        await self.flush()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def recover(self, older_than):
+        """Send stored notices older than `older_than` seconds that no process is holding; returns how many"""
+        now = self.clock()
+        held = {str(self.key(item)) for item in self.items}
+        orphaned = [
+            entry["item"] for key, entry in (await self.store.items(self.namespace)).items()
+            if str(key) not in held and now - entry["added_at"] > older_than
+        ]
+        if orphaned:
+            logger.info(f"Recovered {len(orphaned)} unsent digest notice(s)")
+            self.items.extend(orphaned)
+            await self.flush()
+        return len(orphaned)
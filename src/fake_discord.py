@@ -0,0 +1,309 @@
+"""
+A small in-process stand-in for Discord, used to replay recorded events.
+
+It implements just the parts of guilds, channels, users and interactions
+that the application flow touches, and keeps everything the bot sends in
+`FakeDiscord.sent` for inspection. Objects that the bot checks with
+isinstance() report the matching discord.py class.
+"""
+import itertools
+
+import discord
+
+# Snowflake-sized IDs that can't collide with small IDs from recordings or config
+_ids = itertools.count(900000000000000000)
+
+
+class FakeMessage:
+    def __init__(self, author, channel, content=None, embeds=None, attachments=None, **kwargs):
+        self.id = next(_ids)
+        self.author = author
+        self.channel = channel
+        self.content = content or ""
+        self.embeds = list(embeds or [])
+        self.attachments = list(attachments or [])
+        self.extra = kwargs
+        # discord.py's connection state; the prefix-command lookup reads it but the fake has none
+        self._state = None
+
+    async def edit(self, **kwargs):
+        if "embed" in kwargs:
+            self.embeds = [kwargs["embed"]]
+        if "content" in kwargs:
+            self.content = kwargs["content"] or ""
+        return self
+
+
+class FakeAttachment:
+    def __init__(self, url, filename, size, content_type=None):
+        self.url = url
+        self.filename = filename
+        self.size = size
+        self.content_type = content_type
+
+
+class _Messageable:
+    def __init__(self, fake):
+        self.fake = fake
+        self.messages = []
+
+    async def send(self, content=None, *, embed=None, embeds=None, **kwargs):
+        message = FakeMessage(self.fake.bot_user, self, content, [embed] if embed else embeds, **kwargs)
+        self.messages.append(message)
+        self.fake.sent.append(message)
+        return message
+
+    async def history(self, limit=100):
+        for message in reversed(self.messages[-limit:]):
+            yield message
+
+
+class FakeUser(_Messageable):
+    def __init__(self, fake, id, name, bot=False):
+        super().__init__(fake)
+        self.id = id
+        self.name = name
+        self.display_name = name
+        self.global_name = name
+        self.bot = bot
+        self.mention = f"<@{id}>"
+        self.roles = []
+        self.guild_permissions = discord.Permissions.none()
+        self.dm_channel = FakeDMChannel(self)
+
+    def __str__(self):
+        return self.name
+
+    def __eq__(self, other):
+        return getattr(other, "id", None) == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class FakeMember(FakeUser):
+    """A guild member; replayed slash commands run as administrators"""
+
+    def __init__(self, fake, id, name):
+        super().__init__(fake, id, name)
+        self.guild_permissions = discord.Permissions.all()
+
+    @property
+    def __class__(self):
+        return discord.Member
+
+
+class FakeDMChannel:
+    """A user's DM channel with the bot; what the bot sends here goes to the user"""
+
+    def __init__(self, recipient):
+        self.id = next(_ids)
+        self.recipient = recipient
+
+    @property
+    def __class__(self):
+        return discord.DMChannel
+
+    async def send(self, *args, **kwargs):
+        return await self.recipient.send(*args, **kwargs)
+
+
+class FakeRole:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+        self.mention = f"<@&{id}>"
+
+
+class FakeTextChannel(_Messageable):
+    def __init__(self, fake, guild, name, category=None, topic=None, id=None):
+        super().__init__(fake)
+        self.id = id or next(_ids)
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.topic = topic
+        self.mention = f"<#{self.id}>"
+        self.threads = []
+        self.overwrites = {}
+
+    @property
+    def __class__(self):
+        return discord.TextChannel
+
+    async def create_thread(self, name, **kwargs):
+        thread = FakeThread(self.fake, self.guild, self, name)
+        self.threads.append(thread)
+        self.guild.threads.append(thread)
+        return thread
+
+    async def delete(self, reason=None):
+        self.guild.remove_channel(self)
+
+
+class FakeThread(_Messageable):
+    def __init__(self, fake, guild, parent, name):
+        super().__init__(fake)
+        self.id = next(_ids)
+        self.guild = guild
+        self.parent = parent
+        self.name = name
+        self.owner_id = guild.me.id
+        self.archived = False
+        self.locked = False
+        self.mention = f"<#{self.id}>"
+        self.members = []
+
+    @property
+    def __class__(self):
+        return discord.Thread
+
+    async def add_user(self, user):
+        self.members.append(user)
+
+    async def edit(self, archived=None, locked=None, **kwargs):
+        if archived is not None:
+            self.archived = archived
+        if locked is not None:
+            self.locked = locked
+        return self
+
+
+class FakeCategory:
+    def __init__(self, guild, id, name="Applications"):
+        self.id = id
+        self.guild = guild
+        self.name = name
+
+    @property
+    def __class__(self):
+        return discord.CategoryChannel
+
+    @property
+    def text_channels(self):
+        return [channel for channel in self.guild.channels if getattr(channel, "category", None) is self]
+
+
+class FakeGuild:
+    def __init__(self, fake, id, name="Replay Guild"):
+        self.fake = fake
+        self.id = id
+        self.name = name
+        self.me = fake.bot_user
+        self.default_role = FakeRole(id, "@everyone")
+        self.roles = {}
+        self.channels = []
+        self.threads = []
+        self.members = {}
+        self.filesize_limit = 10 * 1024 * 1024
+
+    def get_role(self, role_id):
+        return self.roles.setdefault(role_id, FakeRole(role_id, f"role-{role_id}"))
+
+    def get_channel(self, channel_id):
+        return discord.utils.get(self.channels, id=channel_id)
+
+    def get_channel_or_thread(self, channel_id):
+        return self.get_channel(channel_id) or discord.utils.get(self.threads, id=channel_id)
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+    def add_category(self, category_id):
+        category = FakeCategory(self, category_id)
+        self.channels.append(category)
+        return category
+
+    def add_text_channel(self, name, id=None, category=None):
+        channel = FakeTextChannel(self.fake, self, name, category, id=id)
+        self.channels.append(channel)
+        return channel
+
+    async def create_text_channel(self, name, category=None, overwrites=None, topic=None, **kwargs):
+        channel = FakeTextChannel(self.fake, self, name, category, topic)
+        channel.overwrites = overwrites or {}
+        self.channels.append(channel)
+        return channel
+
+    def remove_channel(self, channel):
+        if channel in self.channels:
+            self.channels.remove(channel)
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, content=None, *, embed=None, ephemeral=False, **kwargs):
+        self._done = True
+        return await self.interaction.reply_channel.send(content, embed=embed, ephemeral=ephemeral, **kwargs)
+
+    async def edit_message(self, **kwargs):
+        self._done = True
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, *, embed=None, ephemeral=False, **kwargs):
+        return await self.interaction.reply_channel.send(content, embed=embed, ephemeral=ephemeral, **kwargs)
+
+
+class FakeInteraction:
+    def __init__(self, user, guild=None, channel=None, data=None):
+        self.user = user
+        self.guild = guild
+        self.guild_id = guild.id if guild else None
+        self.channel = channel
+        self.channel_id = channel.id if channel else None
+        self.data = data or {}
+        # Interaction replies go to the channel, or the user's DMs for DM interactions
+        self.reply_channel = channel or user
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+
+class FakeDiscord:
+    """Registry of fake users, guilds and channels, created on first use"""
+
+    def __init__(self, bot_id=1):
+        self.sent = []
+        self.bot_user = FakeUser(self, bot_id, "NoxAppBot", bot=True)
+        self.users = {}
+        self.guilds = {}
+
+    def user(self, user_id, name=None, member=False):
+        user = self.users.get(user_id)
+        if user is None or (member and not isinstance(user, FakeMember)):
+            cls = FakeMember if member else FakeUser
+            user = self.users[user_id] = cls(self, user_id, name or f"user{user_id}")
+        return user
+
+    def guild(self, guild_id, category_ids=(), review_channel_ids=()):
+        guild = self.guilds.get(guild_id)
+        if guild is None:
+            guild = self.guilds[guild_id] = FakeGuild(self, guild_id)
+            for category_id in category_ids:
+                if category_id:
+                    guild.add_category(category_id)
+            for channel_id in review_channel_ids:
+                if channel_id:
+                    guild.add_text_channel("applications-review", id=channel_id)
+        return guild
+
+    def channel(self, guild, channel_id, name):
+        """The channel a recorded interaction happened in; matched by ID, then by name"""
+        channel = guild.get_channel_or_thread(channel_id)
+        if channel is None and name:
+            channel = discord.utils.get(guild.channels, name=name) or discord.utils.get(guild.threads, name=name)
+        if channel is None:
+            channel = guild.add_text_channel(name or f"channel-{channel_id}", id=channel_id)
+        return channel
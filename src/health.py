@@ -0,0 +1,140 @@
+"""
+Event-loop lag watchdog and a tiny HTTP health endpoint.
+
+The watchdog has two halves: a coroutine that ticks on the event loop and
+measures how late each tick is, and a daemon thread that notices when the
+ticks stop altogether. While the loop is blocked the thread dumps the stack
+of the blocking (loop) thread; once the loop recovers the coroutine dumps
+the stacks of every asyncio task.
+"""
+import asyncio
+import io
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagWatchdog:
+    def __init__(self, interval=0.5, threshold=0.25, dump_cooldown=60):
+        self.interval = interval
+        self.threshold = threshold
+        self.dump_cooldown = dump_cooldown
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.last_tick = time.monotonic()
+        self._loop = None
+        self._loop_thread_id = None
+        self._stall_reported = False
+        self._last_dump = 0.0
+        self._stopped = threading.Event()
+
+    async def run(self):
+        """Tick on the loop forever; must be started as a task on the watched loop"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopped.clear()
+        monitor = threading.Thread(target=self._monitor, name="loop-lag-monitor", daemon=True)
+        monitor.start()
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self.lag = max(0.0, now - expected)
+                self.max_lag = max(self.max_lag, self.lag)
+                self.last_tick = now
+                if self.lag > self.threshold:
+                    logger.warning(f"Event loop lag {self.lag * 1000:.0f}ms exceeds {self.threshold * 1000:.0f}ms")
+                    if self._should_dump():
+                        logger.warning("Asyncio task stacks after loop stall:\n" + self.format_task_stacks())
+                self._stall_reported = False
+        finally:
+            self._stopped.set()
+
+    def current_lag(self):
+        """Lag including an ongoing stall that has not produced a tick yet"""
+        overdue = time.monotonic() - self.last_tick - self.interval
+        return max(self.lag, overdue, 0.0)
+
+    def _should_dump(self):
+        now = time.monotonic()
+        if now - self._last_dump < self.dump_cooldown:
+            return False
+        self._last_dump = now
+        return True
+
+    def _monitor(self):
+        while not self._stopped.wait(self.interval):
+            overdue = time.monotonic() - self.last_tick - self.interval
+            if overdue > self.threshold and not self._stall_reported:
+                self._stall_reported = True
+                logger.warning(
+                    f"Event loop blocked for {overdue * 1000:.0f}ms; blocking thread stack:\n"
+                    + self.format_thread_stack(self._loop_thread_id)
+                )
+
+    @staticmethod
+    def format_thread_stack(thread_id):
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            return "<thread not found>"
+        return "".join(traceback.format_stack(frame))
+
+    def format_task_stacks(self):
+        out = io.StringIO()
+        for task in asyncio.all_tasks(self._loop):
+            out.write(f"--- {task.get_name()}: {task.get_coro()!r}\n")
+            task.print_stack(limit=10, file=out)
+        return out.getvalue()
+
+
+class HealthServer:
+    """Serves GET /healthz as JSON: 200 when healthy, 503 otherwise.
+
+    `report` is a callable returning (healthy, payload_dict).
+    """
+
+    def __init__(self, report, host="0.0.0.0", port=8080):
+        self.report = report
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Health endpoint listening on {self.host}:{self.port}/healthz")
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain headers
+            while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else ""
+            if path != "/healthz":
+                status, body = "404 Not Found", {"error": "not found"}
+            else:
+                healthy, body = self.report()
+                status = "200 OK" if healthy else "503 Service Unavailable"
+            data = json.dumps(body).encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+        except Exception as e:
+            logger.error(f"Error serving health request: {e}")
+        finally:
+            writer.close()
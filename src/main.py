@@ -0,0 +1,31 @@
+"""
+Command-line entry point: loads .env, sets up logging and runs the bot.
+
+    python src/main.py
+"""
+import logging
+import signal
+
+from dotenv import load_dotenv
+
+from app import create_app
+from settings import load_settings
+
+
+def stop(signum, frame):
+    # discord.py closes the bot on Ctrl+C; treat SIGTERM (docker stop, systemd) the same way
+    raise KeyboardInterrupt
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    load_dotenv()
+    settings = load_settings()
+    logging.getLogger().setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+    bot = create_app(settings)
+    signal.signal(signal.SIGTERM, stop)
+    bot.run(settings.TOKEN)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Opt-in profiling for application handlers.
+
+Handlers decorated with `Profiler.profiled` record wall-clock and CPU time
+while profiling is enabled. A sampler coroutine periodically walks the await
+chain of every task currently inside a profiled handler, so time spent
+waiting on Discord (channel history, user lookups, DMs) shows up as well as
+CPU work. Samples are written per handler in the collapsed-stack format read
+by flamegraph.pl, speedscope and inferno.
+
+CPU time is measured with time.thread_time(), so it includes any other
+tasks that ran on the event loop thread while the handler was suspended.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+class HandlerStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wall_total = 0.0
+        self.wall_max = 0.0
+        self.cpu_total = 0.0
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "wall_total_ms": round(self.wall_total * 1000, 2),
+            "wall_avg_ms": round(self.wall_total * 1000 / self.calls, 2) if self.calls else 0.0,
+            "wall_max_ms": round(self.wall_max * 1000, 2),
+            "cpu_total_ms": round(self.cpu_total * 1000, 2),
+        }
+
+
+def await_chain(coro):
+    """Frames of a suspended coroutine and everything it is awaiting, outermost first"""
+    names = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        code = frame.f_code
+        if code.co_filename != __file__:  # hide the profiling wrapper itself
+            names.append(f"{getattr(code, 'co_qualname', code.co_name)} "
+                         f"({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return names
+
+
+class Profiler:
+    def __init__(self, output_dir="profiles", sample_interval=0.01):
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.enabled = False
+        self.started_at = None
+        self.stats = defaultdict(HandlerStats)
+        self.samples = defaultdict(Counter)
+        self._active = {}  # task -> list of handler names currently running in it
+        self._sampler = None
+
+    def profiled(self, name):
+        """Decorator for async handlers; near zero overhead while profiling is off"""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return await func(*args, **kwargs)
+                task = asyncio.current_task()
+                handlers = self._active.setdefault(task, [])
+                handlers.append(name)
+                stats = self.stats[name]
+                wall_start = time.perf_counter()
+                cpu_start = time.thread_time()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    stats.errors += 1
+                    raise
+                finally:
+                    wall = time.perf_counter() - wall_start
+                    stats.calls += 1
+                    stats.wall_total += wall
+                    stats.wall_max = max(stats.wall_max, wall)
+                    stats.cpu_total += time.thread_time() - cpu_start
+                    handlers.pop()
+                    if not handlers:
+                        self._active.pop(task, None)
+            return wrapper
+        return decorator
+
+    def start(self):
+        if self.enabled:
+            return
+        self.stats.clear()
+        self.samples.clear()
+        self.enabled = True
+        self.started_at = time.time()
+        self._sampler = asyncio.create_task(self._sample_loop())
+        logger.info("Profiling enabled")
+
+    async def stop(self):
+        """Stop profiling and write the results; returns the output directory"""
+        if not self.enabled:
+            return None
+        self.enabled = False
+        if self._sampler:
+            self._sampler.cancel()
+            await asyncio.gather(self._sampler, return_exceptions=True)
+            self._sampler = None
+        self._active.clear()
+        path = await asyncio.to_thread(self.write_results)
+        logger.info(f"Profiling disabled, results written to {path}")
+        return path
+
+    async def _sample_loop(self):
+        while True:
+            await asyncio.sleep(self.sample_interval)
+            self.sample()
+
+    def sample(self):
+        """Record the current await chain of every task inside a profiled handler"""
+        for task, handlers in list(self._active.items()):
+            if task.done() or not handlers:
+                continue
+            stack = ";".join(await_chain(task.get_coro()))
+            if stack:
+                for handler in set(handlers):
+                    self.samples[handler][stack] += 1
+
+    def summary(self):
+        return {name: stats.as_dict() for name, stats in sorted(self.stats.items())}
+
+    def write_results(self):
+        run_dir = os.path.join(self.output_dir, time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at)))
+        os.makedirs(run_dir, exist_ok=True)
+        for handler, stacks in self.samples.items():
+            filename = re.sub(r"[^A-Za-z0-9_.-]", "_", handler) + ".folded"
+            with open(os.path.join(run_dir, filename), "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        with open(os.path.join(run_dir, "summary.json"), "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        return run_dir
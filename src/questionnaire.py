@@ -0,0 +1,164 @@
+"""
+Declarative, branching questionnaires.
+
+A questionnaire is a list of questions. A question is either a plain string
+or an object:
+
+    {
+        "id": "team",
+        "text": "Which raid team are you applying to?",
+        "choices": ["Weekend", "TBC Team"],
+        "next": {"TBC Team": "tbc_logs", "default": "schedule"}
+    }
+
+"choices" turns the question into a multiple-choice question (rendered as a
+select menu). "next" is either a question ID, null (end of the application)
+or a mapping from choice to question ID with an optional "default". Without
+"next", the following question in the list is asked.
+
+Questionnaires are compiled once when the configuration is loaded: IDs are
+resolved to indices, references and cycles are checked, and the longest
+remaining path from each question is precomputed for progress display.
+"""
+
+END = None
+
+# Discord select menu limits
+MAX_CHOICES = 25
+MAX_CHOICE_LENGTH = 100
+
+
+class QuestionnaireError(ValueError):
+    """Raised when a questionnaire definition is invalid"""
+
+
+class Question:
+    __slots__ = ("index", "id", "text", "title", "choices", "transitions", "default_next")
+
+    def __init__(self, index, id, text, choices, transitions, default_next):
+        self.index = index
+        self.id = id
+        self.text = text
+        # Embed field names are capped at 256 characters by Discord
+        title = f"Q{index + 1}: {text}"
+        self.title = title if len(title) <= 256 else title[:253] + "..."
+        self.choices = choices
+        self.transitions = transitions  # lower-cased choice -> index or END
+        self.default_next = default_next
+
+    def match_choice(self, answer):
+        """The choice an answer refers to (by label, case-insensitive, or by number), or None"""
+        answer = answer.strip()
+        for choice in self.choices:
+            if choice.lower() == answer.lower():
+                return choice
+        if answer.isdigit() and 1 <= int(answer) <= len(self.choices):
+            return self.choices[int(answer) - 1]
+        return None
+
+
+class Questionnaire:
+    def __init__(self, questions):
+        self.questions = tuple(questions)
+        self.start = 0
+        self.remaining = self._longest_paths()
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __getitem__(self, index):
+        return self.questions[index]
+
+    def next_index(self, index, answer):
+        """Index of the question after answering `index` with `answer`, or END"""
+        question = self.questions[index]
+        return question.transitions.get(answer.lower(), question.default_next)
+
+    def _successors(self, question):
+        targets = set(question.transitions.values())
+        targets.add(question.default_next)
+        targets.discard(END)
+        return targets
+
+    def _longest_paths(self):
+        """Questions left on the longest path from each question (including itself); rejects cycles"""
+        remaining = {}
+        visiting = set()
+
+        def visit(index):
+            if index in remaining:
+                return remaining[index]
+            if index in visiting:
+                raise QuestionnaireError(f"Question '{self.questions[index].id}' is part of a cycle")
+            visiting.add(index)
+            successors = self._successors(self.questions[index])
+            remaining[index] = 1 + max((visit(target) for target in successors), default=0)
+            visiting.discard(index)
+            return remaining[index]
+
+        for index in range(len(self.questions)):
+            visit(index)
+        return tuple(remaining[index] for index in range(len(self.questions)))
+
+
+def compile_questionnaire(definitions):
+    """Validate question definitions (strings or objects) and compile them"""
+    if not isinstance(definitions, (list, tuple)) or not definitions:
+        raise QuestionnaireError("questions must be a non-empty list")
+
+    raw = []
+    ids = {}
+    for index, definition in enumerate(definitions):
+        if isinstance(definition, str):
+            definition = {"text": definition}
+        if not isinstance(definition, dict):
+            raise QuestionnaireError("Every question must be a string or an object")
+        unknown = set(definition) - {"id", "text", "choices", "next"}
+        if unknown:
+            raise QuestionnaireError(f"Unknown question keys: {', '.join(sorted(unknown))}")
+        text = definition.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise QuestionnaireError("Every question must have non-empty text")
+        if len(text) > 4096:
+            raise QuestionnaireError("Questions must be at most 4096 characters")
+        question_id = str(definition.get("id", f"q{index + 1}"))
+        if question_id in ids:
+            raise QuestionnaireError(f"Duplicate question id '{question_id}'")
+        ids[question_id] = index
+        choices = definition.get("choices", [])
+        if not isinstance(choices, list) or len(choices) > MAX_CHOICES:
+            raise QuestionnaireError(f"Question '{question_id}': choices must be a list of at most {MAX_CHOICES} options")
+        for choice in choices:
+            if not isinstance(choice, str) or not choice.strip() or len(choice) > MAX_CHOICE_LENGTH:
+                raise QuestionnaireError(f"Question '{question_id}': choices must be 1-{MAX_CHOICE_LENGTH} characters")
+        if len({choice.lower() for choice in choices}) != len(choices):
+            raise QuestionnaireError(f"Question '{question_id}': duplicate choices")
+        raw.append((question_id, text, choices, definition))
+
+    def resolve(question_id, target):
+        if target is None:
+            return END
+        if str(target) not in ids:
+            raise QuestionnaireError(f"Question '{question_id}' refers to unknown question '{target}'")
+        return ids[str(target)]
+
+    questions = []
+    for index, (question_id, text, choices, definition) in enumerate(raw):
+        following = index + 1 if index + 1 < len(raw) else END
+        transitions = {}
+        next_spec = definition.get("next", following if following is END else raw[following][0])
+        if isinstance(next_spec, dict):
+            if not choices:
+                raise QuestionnaireError(f"Question '{question_id}': branching on the answer requires choices")
+            lowered = {choice.lower(): choice for choice in choices}
+            for choice, target in next_spec.items():
+                if choice == "default":
+                    continue
+                if choice.lower() not in lowered:
+                    raise QuestionnaireError(f"Question '{question_id}': '{choice}' is not one of its choices")
+                transitions[choice.lower()] = resolve(question_id, target)
+            default_next = resolve(question_id, next_spec["default"]) if "default" in next_spec else following
+        else:
+            default_next = resolve(question_id, next_spec)
+        questions.append(Question(index, question_id, text, tuple(choices), transitions, default_next))
+    return Questionnaire(questions)
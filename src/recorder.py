@@ -0,0 +1,88 @@
+"""
+Records the events that drive the application flow so they can be replayed.
+
+Each line of the log is a JSON object with `t`, the seconds since recording
+started, and the event: DM messages reaching `on_message` and every
+interaction (Apply button, select menus, slash commands) with Discord's raw
+interaction payload. The log is appended to, and every run of the bot starts
+with a `start` line and restarts `t` from 0. See replay.py for feeding a log
+back through the bot.
+
+Lines go through the file's write buffer and are flushed by `run()` every
+`flush_interval` seconds, so recording does not add a disk write per event.
+"""
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EventRecorder:
+    def __init__(self, path, flush_interval=1.0, clock=time.monotonic):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self.started_at = clock()
+        self.count = 0
+        self._file = open(path, "a", encoding="utf-8")
+        self._write({"type": "start", "time": time.time()})
+
+    def _write(self, event):
+        event["t"] = round(self.clock() - self.started_at, 4)
+        self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+        self.count += 1
+
+    def record_message(self, message):
+        """Record a DM message"""
+        self._write({
+            "type": "message",
+            "user_id": message.author.id,
+            "user_name": message.author.name,
+            "content": message.content,
+            "attachments": [
+                {"url": a.url, "filename": a.filename, "size": a.size, "content_type": a.content_type}
+                for a in message.attachments
+            ],
+        })
+
+    def record_interaction(self, interaction):
+        """Record an interaction with its raw payload"""
+        channel = interaction.channel
+        self._write({
+            "type": "interaction",
+            "kind": interaction.type.value,
+            "user_id": interaction.user.id,
+            "user_name": interaction.user.name,
+            "guild_id": interaction.guild_id,
+            "channel_id": interaction.channel_id,
+            "channel_name": getattr(channel, "name", None),
+            "data": interaction.data,
+        })
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    async def run(self):
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                self.flush()
+        finally:
+            self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            logger.info(f"Recorded {self.count} event(s) to {self.path}")
+
+
+def read_events(path):
+    """Events of a recording, in order"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -0,0 +1,173 @@
+"""
+Replays a recording made with EVENT_LOG through the bot's real handlers.
+
+    python src/replay.py events.jsonl [--speed 10]
+
+The bot is built with create_app() and an in-memory state backend but never
+connects to Discord, and every event is dispatched at its recorded
+offset (divided by --speed) against a local fake Discord (fake_discord.py).
+Events overlap as much as they did when recorded, so races between
+applicants can be reproduced. --speed 0 instead runs the events one after
+another as fast as possible, which is deterministic. Each event's handling
+time is measured and summarised at the end.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import discord
+from dotenv import load_dotenv
+
+from app import create_app
+from fake_discord import FakeAttachment, FakeDiscord, FakeInteraction, FakeMessage
+from recorder import read_events
+
+logger = logging.getLogger(__name__)
+
+
+def load_bot_module(environ=None):
+    """Build the bot from `environ` (default: os.environ) without recording or touching shared state"""
+    environ = dict(os.environ if environ is None else environ)
+    environ.setdefault("DISCORD_BOT_TOKEN", "replay")
+    environ.setdefault("INTERVIEW_CATEGORY_ID", "1")
+    environ["STATE_BACKEND_URL"] = "memory://"
+    environ.pop("EVENT_LOG", None)
+    environ.pop("HEALTH_PORT", None)
+    # The bot is never run, so it doesn't log in
+    create_app(environ=environ)
+    import bot
+    return bot
+
+
+def event_name(event):
+    """Short label for summaries, e.g. "message", "apply_button", "/noxapprove" """
+    if event["type"] == "message":
+        return "message"
+    data = event.get("data") or {}
+    if event["kind"] == discord.InteractionType.application_command.value:
+        return f"/{data.get('name')}"
+    return data.get("custom_id", "component").split(":")[0]
+
+
+class Replayer:
+    def __init__(self, app, fake=None):
+        self.app = app
+        self.fake = fake or FakeDiscord()
+        self.timings = []  # (event name, seconds)
+        # The bot never logs in; on_message compares authors with the bot's own user
+        self.app.bot._connection.user = self.fake.bot_user
+
+    def _guild(self, guild_id):
+        config = self.app.get_guild_config(guild_id)
+        return self.fake.guild(guild_id, [config.interview_category_id], [config.review_channel_id])
+
+    async def dispatch(self, event):
+        """Run one recorded event through the bot's handlers"""
+        if event["type"] == "message":
+            user = self.fake.user(event["user_id"], event["user_name"])
+            message = FakeMessage(
+                user,
+                user.dm_channel,
+                event["content"],
+                attachments=[FakeAttachment(**attachment) for attachment in event.get("attachments", [])],
+            )
+            await self.app.on_message(message)
+            return
+
+        guild = self._guild(event["guild_id"]) if event.get("guild_id") else None
+        user = self.fake.user(event["user_id"], event["user_name"], member=guild is not None)
+        if guild is not None:
+            guild.members[user.id] = user
+        channel = self.fake.channel(guild, event["channel_id"], event.get("channel_name")) if guild else None
+        data = event.get("data") or {}
+        interaction = FakeInteraction(user, guild, channel, data)
+
+        if event["kind"] == discord.InteractionType.application_command.value:
+            command = self.app.bot.tree.get_command(data["name"])
+            if command is None:
+                logger.warning(f"Skipping unknown command /{data['name']}")
+                return
+            options = {option["name"]: option["value"] for option in data.get("options", [])}
+            await command.callback(interaction, **options)
+        elif data.get("custom_id") == "apply_button":
+            view = self.app.ApplicationView()
+            await view.apply.callback(interaction)
+        elif data.get("custom_id", "").startswith("choice:"):
+            await self.app.answer_choice(interaction, int(data["custom_id"].split(":")[1]), data["values"][0])
+        else:
+            logger.warning(f"Skipping unsupported interaction {data.get('custom_id')}")
+
+    async def _timed(self, event):
+        started = time.perf_counter()
+        try:
+            await self.dispatch(event)
+        except Exception as e:
+            logger.error(f"Error replaying {event_name(event)} at t={event['t']}: {e!r}")
+        self.timings.append((event_name(event), time.perf_counter() - started))
+
+    async def replay(self, events, speed=1.0):
+        """Dispatch events at their recorded offsets (scaled by `speed`) and wait for all of them"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = []
+        # A log can hold several runs of the bot, each starting at t=0: later runs are
+        # replayed right after the previous run's last event
+        offset = last = 0
+        for event in events:
+            if event["type"] == "start":
+                offset = last
+                continue
+            last = offset + event["t"]
+            if not speed:
+                # As fast as possible means one event at a time, so the result is deterministic
+                await self._timed(event)
+                continue
+            delay = started + last / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Each event runs as its own task, like discord.py dispatches them
+            tasks.append(asyncio.create_task(self._timed(event)))
+        await asyncio.gather(*tasks)
+        # Let work started by the handlers (e.g. submissions) finish
+        pending = [task for task in self.app.background_tasks if not task.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=5)
+        return self.timings
+
+
+def summarize(timings):
+    """Per-event-type count, median, 95th percentile and maximum handling time in milliseconds"""
+    by_name = {}
+    for name, seconds in timings:
+        by_name.setdefault(name, []).append(seconds * 1000)
+    summary = {}
+    for name, values in sorted(by_name.items()):
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50_ms": round(values[len(values) // 2], 2),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+            "max_ms": round(values[-1], 2),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", help="JSONL file written by EVENT_LOG")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier; 0 = as fast as possible")
+    args = parser.parse_args()
+
+    load_dotenv()
+    app = load_bot_module()
+    replayer = Replayer(app)
+    timings = asyncio.run(replayer.replay(list(read_events(args.log)), args.speed))
+    for name, stats in summarize(timings).items():
+        print(f"{name:20} {stats['count']:5d} events  p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  max {stats['max_ms']:8.2f} ms")
+    print(f"{len(replayer.fake.sent)} message(s) sent to the fake Discord")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Retry and circuit-breaker helpers for calls to the Discord API.
+"""
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=30.0):
+    """Full-jitter exponential backoff: uniform between 0 and base * 2^attempt (capped)"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+async def retry_async(func, is_retryable, attempts=4, base_delay=1.0, max_delay=30.0):
+    """Call `func()` until it succeeds, retrying errors accepted by `is_retryable`.
+
+    The last error is re-raised once all attempts are used up.
+    """
+    for attempt in range(attempts):
+        try:
+            return await func()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            logger.warning(f"Transient error ({e}), retrying in {delay:.1f}s (attempt {attempt + 2}/{attempts})")
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """Stops sending work to a failing dependency for a while.
+
+    closed: calls allowed. After `failure_threshold` consecutive failures the
+    breaker opens and rejects calls for `reset_timeout` seconds, then lets a
+    single probe through (half-open); its outcome closes or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=60, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("Circuit breaker closed")
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit breaker opened after {self.failures} failure(s)")
+            self.opened_at = self.clock()
@@ -0,0 +1,141 @@
+"""
+Least-loaded reviewer assignment.
+
+Officers are kept in a min-heap keyed by (open reviews, last assignment
+time) so picking the next reviewer is O(log n). Heap entries are never
+updated in place: every load change pushes a fresh entry and bumps the
+reviewer's version, and stale entries are discarded when popped.
+"""
+import heapq
+import logging
+import time
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+
+def parse_reviewers(spec):
+    """Parse "id[@start-end],..." where start/end are UTC hours, e.g. "111@18-23,222,333@22-2"
+
+    Returns {reviewer_id: (start_hour, end_hour) or None}.
+    """
+    reviewers = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        reviewer, _, window = item.partition("@")
+        if window:
+            start, _, end = window.partition("-")
+            reviewers[int(reviewer)] = (int(start) % 24, int(end) % 24)
+        else:
+            reviewers[int(reviewer)] = None
+    return reviewers
+
+
+def is_available(window, now):
+    """Whether `now` (an aware datetime) falls inside a UTC hour window; windows may wrap midnight"""
+    if window is None:
+        return True
+    start, end = window
+    hour = now.astimezone(timezone.utc).hour
+    if start == end:
+        return True
+    if start < end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class ReviewerScheduler:
+    def __init__(self, reviewers, stale_after=48 * 3600):
+        self.windows = dict(reviewers)
+        self.stale_after = stale_after
+        self.loads = {reviewer: 0 for reviewer in self.windows}
+        self.last_assigned = {reviewer: 0.0 for reviewer in self.windows}
+        self.open_reviews = {}  # channel_id -> (reviewer_id, assigned_at)
+        self._versions = {reviewer: 0 for reviewer in self.windows}
+        self._heap = []
+        for reviewer in self.windows:
+            self._push(reviewer)
+
+    def _push(self, reviewer):
+        self._versions[reviewer] += 1
+        heapq.heappush(self._heap, (self.loads[reviewer], self.last_assigned[reviewer], reviewer, self._versions[reviewer]))
+
+    def load(self, open_reviews):
+        """Replace the open reviews ({channel_id: {"reviewer_id", "assigned_at"}}) with those in shared state
+
+        Other bot processes assign and close reviews too, so loads are recounted
+        from shared state rather than trusted from this process's own assignments.
+        """
+        self.open_reviews = {}
+        self.loads = {reviewer: 0 for reviewer in self.windows}
+        for channel_id, review in open_reviews.items():
+            reviewer = review["reviewer_id"]
+            if reviewer not in self.windows:
+                continue
+            self.open_reviews[int(channel_id)] = (reviewer, review["assigned_at"])
+            self.loads[reviewer] += 1
+            self.last_assigned[reviewer] = max(self.last_assigned[reviewer], review["assigned_at"])
+        self._heap = []
+        for reviewer in self.windows:
+            self._push(reviewer)
+
+    def pick(self, now=None, exclude=()):
+        """Return the available reviewer with the fewest open reviews, or None"""
+        now = now or datetime.now(timezone.utc)
+        skipped = []
+        chosen = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            reviewer, version = entry[2], entry[3]
+            if version != self._versions[reviewer]:
+                continue  # outdated entry
+            skipped.append(entry)
+            if reviewer not in exclude and is_available(self.windows[reviewer], now):
+                chosen = reviewer
+                break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return chosen
+
+    def _set_load(self, reviewer, delta, assigned_at=None):
+        self.loads[reviewer] = max(0, self.loads[reviewer] + delta)
+        if assigned_at is not None:
+            self.last_assigned[reviewer] = assigned_at
+        self._push(reviewer)
+
+    def assign(self, channel_id, now=None, exclude=()):
+        """Assign a review to the least-loaded available reviewer; returns the reviewer ID or None"""
+        reviewer = self.pick(now, exclude)
+        if reviewer is None:
+            return None
+        assigned_at = time.time()
+        self.open_reviews[channel_id] = (reviewer, assigned_at)
+        self._set_load(reviewer, 1, assigned_at)
+        logger.info(f"Assigned review {channel_id} to {reviewer} (load {self.loads[reviewer]})")
+        return reviewer
+
+    def complete(self, channel_id):
+        """Close a review on approve/reject; returns the reviewer it was assigned to"""
+        review = self.open_reviews.pop(channel_id, None)
+        if review is None:
+            return None
+        self._set_load(review[0], -1)
+        return review[0]
+
+    def stale_reviews(self, now_ts=None):
+        now_ts = now_ts or time.time()
+        return [channel_id for channel_id, (_, assigned_at) in self.open_reviews.items()
+                if now_ts - assigned_at > self.stale_after]
+
+    def reassign(self, channel_id, now=None):
+        """Move a stale review to another available reviewer; returns the new reviewer or None"""
+        review = self.open_reviews.get(channel_id)
+        if review is None:
+            return None
+        new_reviewer = self.pick(now, exclude=(review[0],))
+        if new_reviewer is None:
+            return None
+        self.complete(channel_id)
+        return self.assign(channel_id, now, exclude=(review[0],))
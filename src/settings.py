@@ -0,0 +1,144 @@
+"""
+Settings read from environment variables.
+
+Nothing is read when this module (or bot.py) is imported: `load_settings()`
+reads and validates the environment when the app is created (see app.py),
+so tests and tools can import the bot's modules without a configured
+environment. Settings keep their environment variable names as attributes,
+e.g. `settings.APPLY_BURST`; the only renamed one is DISCORD_BOT_TOKEN,
+available as `settings.TOKEN`.
+"""
+import os
+
+
+class SettingsError(RuntimeError):
+    """A required setting is missing or invalid"""
+
+
+class Settings:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def __repr__(self):
+        return f"Settings({len(self.__dict__)} values)"
+
+
+def load_settings(environ=None):
+    """Read and validate the bot's settings from `environ` (default: os.environ)"""
+    env = os.environ if environ is None else environ
+    # Imported here: state.py pulls in asyncio, which `import app` shouldn't pay for
+    from state import default_instance_id
+
+    def number(name, default, kind=int):
+        try:
+            return kind(env.get(name, default))
+        except ValueError:
+            raise SettingsError(f"{name} must be a number")
+
+    s = Settings(
+        # Required environment variables
+        TOKEN=env.get("DISCORD_BOT_TOKEN"),
+        INTERVIEW_CATEGORY_ID=env.get("INTERVIEW_CATEGORY_ID"),
+
+        # Optional environment variables with defaults
+        OFFICER_ROLE_ID=env.get("OFFICER_ROLE_ID"),
+        ADMIN_ROLE_ID=env.get("ADMIN_ROLE_ID"),
+        APPLICATION_CHANNEL_PREFIX=env.get("APPLICATION_CHANNEL_PREFIX", "application"),
+        # "channel" creates a private channel per application, "thread" a private thread in REVIEW_CHANNEL_ID
+        # (these and the role/prefix settings are defaults that CONFIG_FILE can override per guild)
+        APPLICATION_MODE=env.get("APPLICATION_MODE", "channel").lower(),
+        REVIEW_CHANNEL_ID=env.get("REVIEW_CHANNEL_ID"),
+        LOG_LEVEL=env.get("LOG_LEVEL", "INFO"),
+
+        # Optional JSON file with questions, role IDs and prefix; reloaded without restart when it changes
+        CONFIG_FILE=env.get("CONFIG_FILE"),
+        CONFIG_RELOAD_INTERVAL=number("CONFIG_RELOAD_INTERVAL", "5"),
+
+        # Scale-out configuration
+        STATE_BACKEND_URL=env.get("STATE_BACKEND_URL", "memory://"),
+        INSTANCE_ID=env.get("INSTANCE_ID") or default_instance_id(),
+        LEADER_LEASE_SECONDS=number("LEADER_LEASE_SECONDS", "30"),
+        DELETION_SWEEP_INTERVAL=number("DELETION_SWEEP_INTERVAL", "15"),
+        BOT_SHARDED=env.get("BOT_SHARDED", "false").lower() in ("1", "true", "yes"),
+        SHARD_COUNT=env.get("SHARD_COUNT"),
+        SHARD_IDS=env.get("SHARD_IDS"),
+
+        # Health monitoring configuration
+        HEALTH_PORT=env.get("HEALTH_PORT"),
+        HEALTH_HOST=env.get("HEALTH_HOST", "0.0.0.0"),
+        LOOP_LAG_THRESHOLD_MS=number("LOOP_LAG_THRESHOLD_MS", "250"),
+        HEARTBEAT_MAX_AGE=number("HEARTBEAT_MAX_AGE", "90"),
+
+        # Profiling configuration (profiling itself is switched on with /noxprofile)
+        PROFILE_DIR=env.get("PROFILE_DIR", "profiles"),
+        PROFILE_SAMPLE_INTERVAL_MS=number("PROFILE_SAMPLE_INTERVAL_MS", "10"),
+
+        # Applicant lookup cache configuration
+        USER_CACHE_SIZE=number("USER_CACHE_SIZE", "1000"),
+        USER_CACHE_TTL=number("USER_CACHE_TTL", "604800"),
+
+        # Submission retry configuration
+        SUBMISSION_RETRY_ATTEMPTS=number("SUBMISSION_RETRY_ATTEMPTS", "4"),
+        SUBMISSION_RETRY_INTERVAL=number("SUBMISSION_RETRY_INTERVAL", "30"),
+        SUBMISSION_STALE_SECONDS=number("SUBMISSION_STALE_SECONDS", "600"),
+        CIRCUIT_BREAKER_THRESHOLD=number("CIRCUIT_BREAKER_THRESHOLD", "3"),
+        CIRCUIT_BREAKER_RESET=number("CIRCUIT_BREAKER_RESET", "60"),
+
+        # Reviewer assignment configuration: "user_id[@start-end UTC hours],..."
+        REVIEWERS=env.get("REVIEWERS", ""),
+        REVIEW_STALE_HOURS=number("REVIEW_STALE_HOURS", "48"),
+        REVIEW_REBALANCE_INTERVAL=number("REVIEW_REBALANCE_INTERVAL", "600"),
+
+        # Officer notification digest configuration (disabled unless DIGEST_CHANNEL_ID is set;
+        # CONFIG_FILE can set digest_channel_id per guild)
+        DIGEST_CHANNEL_ID=env.get("DIGEST_CHANNEL_ID"),
+        DIGEST_INTERVAL_MINUTES=number("DIGEST_INTERVAL_MINUTES", "15"),
+        DIGEST_MAX_APPLICATIONS=number("DIGEST_MAX_APPLICATIONS", "10"),
+
+        # Admission control for the Apply button (0 disables a limit)
+        APPLY_RATE_PER_MINUTE=number("APPLY_RATE_PER_MINUTE", "0", float),
+        APPLY_BURST=number("APPLY_BURST", "10"),
+        GUILD_APPLY_RATE_PER_MINUTE=number("GUILD_APPLY_RATE_PER_MINUTE", "0", float),
+        GUILD_APPLY_BURST=number("GUILD_APPLY_BURST", "5"),
+        MAX_ACTIVE_APPLICATIONS=number("MAX_ACTIVE_APPLICATIONS", "0"),
+        MAX_WAITING_APPLICANTS=number("MAX_WAITING_APPLICANTS", "500"),
+        APPLICATION_IDLE_MINUTES=number("APPLICATION_IDLE_MINUTES", "60"),
+
+        # Attachments sent with answers are relayed into the application channel
+        ATTACHMENT_BUDGET_MB=number("ATTACHMENT_BUDGET_MB", "25"),
+        ATTACHMENT_MAX_FILES=number("ATTACHMENT_MAX_FILES", "20"),
+
+        # Re-application cooldowns after a decision (0 disables; both are off unless set)
+        REAPPLY_COOLDOWN_REJECTED_HOURS=number("REAPPLY_COOLDOWN_REJECTED_HOURS", "0", float),
+        REAPPLY_COOLDOWN_APPROVED_HOURS=number("REAPPLY_COOLDOWN_APPROVED_HOURS", "0", float),
+        COOLDOWN_REFRESH_INTERVAL=number("COOLDOWN_REFRESH_INTERVAL", "300"),
+
+        # Event recording for offline replay (disabled unless EVENT_LOG is set)
+        EVENT_LOG=env.get("EVENT_LOG"),
+
+        # Warcraft Logs enrichment (disabled unless API client credentials are set)
+        WCL_CLIENT_ID=env.get("WCL_CLIENT_ID"),
+        WCL_CLIENT_SECRET=env.get("WCL_CLIENT_SECRET"),
+        WCL_MAX_LINKS=number("WCL_MAX_LINKS", "3"),
+        WCL_CACHE_TTL=number("WCL_CACHE_TTL", "3600"),
+        WCL_CACHE_SIZE=number("WCL_CACHE_SIZE", "500"),
+        WCL_TIMEOUT=number("WCL_TIMEOUT", "10"),
+    )
+
+    # Validate required environment variables
+    if s.TOKEN is None or s.INTERVIEW_CATEGORY_ID is None:
+        raise SettingsError(
+            "DISCORD_BOT_TOKEN and INTERVIEW_CATEGORY_ID must be set in the .env file"
+        )
+
+    if not s.INTERVIEW_CATEGORY_ID.isdigit():
+        raise SettingsError("INTERVIEW_CATEGORY_ID must be numeric")
+    if s.APPLICATION_MODE not in ("channel", "thread"):
+        raise SettingsError("APPLICATION_MODE must be 'channel' or 'thread'")
+    if s.APPLICATION_MODE == "thread" and not s.REVIEW_CHANNEL_ID:
+        raise SettingsError("REVIEW_CHANNEL_ID must be set when APPLICATION_MODE is 'thread'")
+    if s.REVIEW_CHANNEL_ID and not s.REVIEW_CHANNEL_ID.isdigit():
+        raise SettingsError("REVIEW_CHANNEL_ID must be numeric")
+    if s.DIGEST_CHANNEL_ID and not s.DIGEST_CHANNEL_ID.isdigit():
+        raise SettingsError("DIGEST_CHANNEL_ID must be numeric")
+    return s
@@ -0,0 +1,375 @@
+"""
+Shared state backends so several bot processes can cooperate.
+
+Everything the bot needs to survive a restart or hand over to a standby
+process lives behind a small async key/value interface split into
+namespaces (in-flight sessions, pending submissions, the channel deletion
+schedule, the channel -> applicant index and re-application cooldowns).
+Leases provide leader election so that only one process runs singleton
+jobs such as the deletion sweeper.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Namespaces used by the bot
+SESSIONS = "sessions"
+DELETIONS = "deletions"
+APPLICANTS = "applicants"
+SUBMISSIONS = "submissions"
+REVIEWS = "reviews"
+DECISIONS = "decisions"
+DIGEST = "digest"
+
+
+class StateBackend:
+    """Interface implemented by every backend. Values must be JSON-serializable."""
+
+    async def get(self, namespace, key):
+        raise NotImplementedError
+
+    async def set(self, namespace, key, value):
+        raise NotImplementedError
+
+    async def delete(self, namespace, key):
+        raise NotImplementedError
+
+    async def items(self, namespace):
+        """Return every key/value pair of a namespace as a dict"""
+        raise NotImplementedError
+
+    async def acquire_lease(self, name, owner, ttl_seconds):
+        """Acquire or renew the lease `name` for `owner`. Returns True when held."""
+        raise NotImplementedError
+
+    async def release_lease(self, name, owner):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryStateBackend(StateBackend):
+    """Process-local backend (the original single-process behaviour)"""
+
+    def __init__(self):
+        self._data = {}
+        self._leases = {}
+
+    async def get(self, namespace, key):
+        return self._data.get(namespace, {}).get(str(key))
+
+    async def set(self, namespace, key, value):
+        self._data.setdefault(namespace, {})[str(key)] = value
+
+    async def delete(self, namespace, key):
+        self._data.get(namespace, {}).pop(str(key), None)
+
+    async def items(self, namespace):
+        return dict(self._data.get(namespace, {}))
+
+    async def acquire_lease(self, name, owner, ttl_seconds):
+        now = time.time()
+        current = self._leases.get(name)
+        if current and current[0] != owner and current[1] > now:
+            return False
+        self._leases[name] = (owner, now + ttl_seconds)
+        return True
+
+    async def release_lease(self, name, owner):
+        current = self._leases.get(name)
+        if current and current[0] == owner:
+            del self._leases[name]
+
+
+class SQLiteStateBackend(StateBackend):
+    """Backend stored in a SQLite file, shared by processes on the same host.
+
+    Queries run in a worker thread so disk I/O never blocks the event loop.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def _run(self, func, *args):
+        with self._lock:
+            return func(*args)
+
+    async def _call(self, func, *args):
+        return await asyncio.to_thread(self._run, func, *args)
+
+    def _get(self, namespace, key):
+        row = self._conn.execute(
+            "SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, str(key))
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set(self, namespace, key, value):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)",
+            (namespace, str(key), json.dumps(value)),
+        )
+
+    def _delete(self, namespace, key):
+        self._conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, str(key)))
+
+    def _items(self, namespace):
+        rows = self._conn.execute("SELECT key, value FROM kv WHERE namespace = ?", (namespace,))
+        return {key: json.loads(value) for key, value in rows}
+
+    def _acquire_lease(self, name, owner, ttl_seconds):
+        now = time.time()
+        # BEGIN IMMEDIATE takes the write lock so check-and-set is atomic across processes
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            if row and row[0] != owner and row[1] > now:
+                self._conn.execute("COMMIT")
+                return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                (name, owner, now + ttl_seconds),
+            )
+            self._conn.execute("COMMIT")
+            return True
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _release_lease(self, name, owner):
+        self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+
+    async def get(self, namespace, key):
+        return await self._call(self._get, namespace, key)
+
+    async def set(self, namespace, key, value):
+        await self._call(self._set, namespace, key, value)
+
+    async def delete(self, namespace, key):
+        await self._call(self._delete, namespace, key)
+
+    async def items(self, namespace):
+        return await self._call(self._items, namespace)
+
+    async def acquire_lease(self, name, owner, ttl_seconds):
+        return await self._call(self._acquire_lease, name, owner, ttl_seconds)
+
+    async def release_lease(self, name, owner):
+        await self._call(self._release_lease, name, owner)
+
+    async def close(self):
+        await self._call(self._conn.close)
+
+
+class RedisError(Exception):
+    """Error reply returned by a Redis-protocol server"""
+
+
+class RedisStateBackend(StateBackend):
+    """Backend speaking the Redis wire protocol (RESP2) over asyncio streams.
+
+    Only a handful of commands are used (HGET/HSET/HDEL/HGETALL for
+    namespaces, SET NX PX and EVAL of the two scripts below for leases), so
+    any Redis-compatible server works, including a small local stand-in for
+    tests.
+    """
+
+    # Renewing or releasing must check the owner and act in one step: with a
+    # separate GET, the lease could expire and be taken over in between, and
+    # this process would then extend or delete the new owner's lease.
+    RENEW_SCRIPT = (
+        "if redis.call('GET', KEYS[1]) == ARGV[1] then "
+        "return redis.call('PEXPIRE', KEYS[1], ARGV[2]) else return 0 end"
+    )
+    RELEASE_SCRIPT = (
+        "if redis.call('GET', KEYS[1]) == ARGV[1] then "
+        "return redis.call('DEL', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, host="localhost", port=6379, db=0, password=None, prefix="noxappbot"):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.prefix = prefix
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    def _key(self, name):
+        return f"{self.prefix}:{name}"
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._command("AUTH", self.password)
+        if self.db:
+            await self._command("SELECT", self.db)
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RedisError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2].decode()
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply type: {line!r}")
+
+    async def _roundtrip(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _command(self, *args):
+        try:
+            return await self._roundtrip(*args)
+        except RedisError:
+            # An error reply was read in full, so the connection is still in step
+            raise
+        except BaseException:
+            # Interrupted (cancelled, timed out or disconnected) between the command and
+            # its reply: the next command would read this reply, so start over on a new connection
+            self._disconnect()
+            raise
+
+    def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def execute(self, *args):
+        """Send one command and return its decoded reply, reconnecting once if needed"""
+        async with self._lock:
+            if self._writer is None:
+                await self._connect()
+            try:
+                return await self._command(*args)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                logger.warning("Redis connection lost, reconnecting")
+                await self._connect()
+                return await self._command(*args)
+
+    async def get(self, namespace, key):
+        value = await self.execute("HGET", self._key(namespace), key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, namespace, key, value):
+        await self.execute("HSET", self._key(namespace), key, json.dumps(value))
+
+    async def delete(self, namespace, key):
+        await self.execute("HDEL", self._key(namespace), key)
+
+    async def items(self, namespace):
+        flat = await self.execute("HGETALL", self._key(namespace)) or []
+        return {flat[i]: json.loads(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    async def acquire_lease(self, name, owner, ttl_seconds):
+        key = self._key(f"lease:{name}")
+        ttl_ms = int(ttl_seconds * 1000)
+        if await self.execute("SET", key, owner, "NX", "PX", ttl_ms) == "OK":
+            return True
+        return await self.execute("EVAL", self.RENEW_SCRIPT, 1, key, owner, ttl_ms) == 1
+
+    async def release_lease(self, name, owner):
+        await self.execute("EVAL", self.RELEASE_SCRIPT, 1, self._key(f"lease:{name}"), owner)
+
+    async def close(self):
+        self._disconnect()
+
+
+def create_state_backend(url):
+    """Create a backend from a URL: memory://, sqlite:///path/to/file.db or redis://[:password@]host:port/db"""
+    parsed = urlparse(url or "memory://")
+    if parsed.scheme == "memory":
+        return MemoryStateBackend()
+    if parsed.scheme == "sqlite":
+        # sqlite:///relative.db -> "relative.db", sqlite:////abs/path.db -> "/abs/path.db"
+        path = parsed.path[1:] if parsed.path.startswith("/") else parsed.path
+        return SQLiteStateBackend(path or "noxappbot.db")
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisStateBackend(parsed.hostname or "localhost", parsed.port or 6379, db, parsed.password)
+    raise ValueError(f"Unsupported state backend URL: {url}")
+
+
+def default_instance_id():
+    """Identify this process for lease ownership"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaderLease:
+    """Lease-based leader election: the holder renews the lease every ttl/3 seconds.
+
+    If the holder dies, the lease expires and another process takes over on
+    its next attempt.
+    """
+
+    def __init__(self, backend, name, owner, ttl_seconds=30):
+        self.backend = backend
+        self.name = name
+        self.owner = owner
+        self.ttl_seconds = ttl_seconds
+        self.is_leader = False
+
+    async def try_acquire(self):
+        try:
+            held = await self.backend.acquire_lease(self.name, self.owner, self.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Error renewing lease {self.name}: {e}")
+            held = False
+        if held != self.is_leader:
+            logger.info(f"{'Acquired' if held else 'Lost'} leadership of {self.name} ({self.owner})")
+        self.is_leader = held
+        return held
+
+    async def run(self):
+        try:
+            while True:
+                await self.try_acquire()
+                await asyncio.sleep(self.ttl_seconds / 3)
+        finally:
+            if self.is_leader:
+                self.is_leader = False
+                try:
+                    await self.backend.release_lease(self.name, self.owner)
+                except Exception as e:
+                    logger.error(f"Error releasing lease {self.name}: {e}")
@@ -0,0 +1,167 @@
+"""
+Warcraft Logs character summaries for links found in application answers.
+
+Links are parsed locally when an application is submitted; summaries are
+fetched afterwards from the Warcraft Logs v2 API (OAuth client credentials)
+through one pooled HTTP session. Results, including "not found", are cached
+per character and realm, and concurrent lookups of the same character share
+a single request.
+"""
+import asyncio
+import base64
+import logging
+import re
+import time
+from urllib.parse import unquote
+
+import aiohttp
+
+from lookup_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+LINK_PATTERN = re.compile(
+    r"https?://(?:(?P<flavor>[a-z]+)\.)?warcraftlogs\.com/character/"
+    r"(?P<region>[a-z]{2,3})/(?P<realm>[^\s/?#]+)/(?P<name>[^\s/?#)>\]]+)",
+    re.IGNORECASE,
+)
+
+CHARACTER_QUERY = """
+query($name: String, $server: String, $region: String) {
+  characterData {
+    character(name: $name, serverSlug: $server, serverRegion: $region) {
+      name
+      zoneRankings
+    }
+  }
+}
+"""
+
+
+class WarcraftLogsError(Exception):
+    """The Warcraft Logs API returned an error"""
+
+
+def parse_wcl_links(text, limit=3):
+    """Character links in `text`, deduplicated, as dicts with url/flavor/region/realm/name"""
+    links = {}
+    for match in LINK_PATTERN.finditer(text or ""):
+        link = {
+            "url": match.group(0),
+            "flavor": (match.group("flavor") or "www").lower(),
+            "region": match.group("region").lower(),
+            "realm": unquote(match.group("realm")).lower(),
+            "name": unquote(match.group("name")),
+        }
+        links.setdefault(character_key(link), link)
+        if len(links) >= limit:
+            break
+    return list(links.values())
+
+
+def character_key(link):
+    return (link["flavor"], link["region"], link["realm"], link["name"].lower())
+
+
+def format_summary(link, summary):
+    """One embed line for a character"""
+    label = f"[{link['name']} ({link['realm'].title()}-{link['region'].upper()})]({link['url']})"
+    if summary is None:
+        return f"{label}: lookup failed"
+    if not summary["found"]:
+        return f"{label}: not found"
+    if summary["best"] is None:
+        return f"{label}: no ranked logs"
+    return f"{label}: best avg **{summary['best']:.1f}**, median avg **{summary['median']:.1f}** ({summary['ranked']} bosses)"
+
+
+class WarcraftLogsClient:
+    def __init__(self, client_id, client_secret, cache_size=500, cache_ttl=3600, timeout=10,
+                 base_url=None, max_connections=10):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        # Tests point every flavor (www, classic, fresh, ...) at one local server
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.cache = TTLCache(cache_size, cache_ttl)
+        self._session = None
+        self._token = None
+        self._token_expires = 0
+        self._token_lock = asyncio.Lock()
+        self._in_flight = {}
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    def _url(self, flavor, path):
+        return f"{self.base_url or f'https://{flavor}.warcraftlogs.com'}{path}"
+
+    async def _access_token(self):
+        async with self._token_lock:
+            if self._token and time.monotonic() < self._token_expires:
+                return self._token
+            credentials = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+            async with self._get_session().post(
+                self._url("www", "/oauth/token"),
+                data={"grant_type": "client_credentials"},
+                headers={"Authorization": f"Basic {credentials}"},
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
+            self._token = data["access_token"]
+            # Renew a minute early
+            self._token_expires = time.monotonic() + data.get("expires_in", 3600) - 60
+            return self._token
+
+    async def _fetch(self, link):
+        token = await self._access_token()
+        async with self._get_session().post(
+            self._url(link["flavor"], "/api/v2/client"),
+            json={
+                "query": CHARACTER_QUERY,
+                "variables": {"name": link["name"], "server": link["realm"], "region": link["region"]},
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        ) as response:
+            response.raise_for_status()
+            data = await response.json()
+        if data.get("errors"):
+            raise WarcraftLogsError(data["errors"][0].get("message", "unknown error"))
+        character = (data.get("data") or {}).get("characterData", {}).get("character")
+        if character is None:
+            return {"found": False}
+        rankings = character.get("zoneRankings") or {}
+        return {
+            "found": True,
+            "best": rankings.get("bestPerformanceAverage"),
+            "median": rankings.get("medianPerformanceAverage"),
+            "ranked": sum(1 for ranking in rankings.get("rankings", []) if ranking.get("totalKills")),
+        }
+
+    async def character_summary(self, link):
+        """Cached summary of one character, or None when the lookup failed"""
+        key = character_key(link)
+        summary = self.cache.get(key)
+        if summary is not None:
+            return summary
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(self._fetch(link))
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        try:
+            summary = await asyncio.shield(task)
+        except (aiohttp.ClientError, asyncio.TimeoutError, WarcraftLogsError, KeyError) as e:
+            logger.warning(f"Warcraft Logs lookup failed for {link['name']}-{link['realm']}: {e}")
+            return None
+        self.cache.put(key, summary)
+        return summary
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
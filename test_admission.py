@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for admission control on application starts
+"""
+from admission import ADMITTED, AdmissionController, TokenBucket
+from conftest import FakeClock
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+    for _ in range(2):
+        assert bucket.available()
+        bucket.take()
+    assert not bucket.available()
+    clock.now = 1.0
+    assert bucket.available()
+
+
+def test_unlimited_by_default():
+    admission = AdmissionController()
+    assert all(admission.request(user_id, 1) == ADMITTED for user_id in range(100))
+
+
+def test_active_cap_queues_and_drains_in_order():
+    admission = AdmissionController(max_active=2)
+    assert admission.request(1, 10) == ADMITTED
+    assert admission.request(2, 10) == ADMITTED
+    assert admission.request(3, 10) == 1
+    assert admission.request(4, 10) == 2
+    # Clicking again reports the same place in line
+    assert admission.request(3, 10) == 1
+    assert admission.drain() == []
+
+    admission.release(1)
+    assert admission.drain() == [(3, 10)]
+    assert admission.position(4) == 1
+
+
+def test_global_rate_limit():
+    clock = FakeClock()
+    admission = AdmissionController(rate=0.5, burst=1, clock=clock)
+    assert admission.request(1, 10) == ADMITTED
+    assert admission.request(2, 10) == 1
+    clock.now = 2.0
+    # Newcomers don't jump ahead of applicants already waiting
+    assert admission.request(3, 20) == 2
+    assert admission.drain() == [(2, 10)]
+
+
+def test_rate_limited_guild_does_not_block_other_guilds():
+    clock = FakeClock()
+    admission = AdmissionController(guild_rate=0.1, guild_burst=1, clock=clock)
+    assert admission.request(1, 10) == ADMITTED
+    assert admission.request(2, 10) == 1
+    assert admission.request(3, 20) == ADMITTED
+    assert admission.request(4, 10) == 2
+    clock.now = 10.0
+    assert admission.drain() == [(2, 10)]
+
+
+def test_full_queue_rejects():
+    admission = AdmissionController(max_active=1, max_waiting=1)
+    assert admission.request(1, 10) == ADMITTED
+    assert admission.request(2, 10) == 1
+    assert admission.request(3, 10) is None
+
+
+def test_idle_sessions_stop_counting():
+    clock = FakeClock()
+    admission = AdmissionController(max_active=1, idle_timeout=60, clock=clock)
+    assert admission.request(1, 10) == ADMITTED
+    assert admission.request(2, 10) == 1
+    clock.now = 50.0
+    admission.touch(1)
+    clock.now = 100.0
+    assert admission.drain() == []
+    clock.now = 111.0
+    assert admission.drain() == [(2, 10)]
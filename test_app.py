@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for settings, the application factory and the start-up benchmark
+"""
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import create_app
+from benchmark_startup import SRC_DIR, measure
+from settings import SettingsError, load_settings
+
+ENV = {"DISCORD_BOT_TOKEN": "test", "INTERVIEW_CATEGORY_ID": "1", "STATE_BACKEND_URL": "memory://"}
+
+
+def test_imports_have_no_side_effects():
+    # A fresh interpreter with no bot settings at all
+    env = {name: value for name, value in os.environ.items() if name not in ENV}
+    env["PYTHONPATH"] = SRC_DIR
+    code = "\n".join([
+        "import sys",
+        "import app",
+        "assert 'discord' not in sys.modules",
+        "import bot",
+        "assert bot.bot is None and bot.settings is None",
+    ])
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=SRC_DIR, check=True)
+
+
+def test_settings_defaults_and_validation():
+    settings = load_settings(ENV)
+    assert settings.TOKEN == "test"
+    assert settings.APPLICATION_MODE == "channel"
+    assert settings.APPLY_BURST == 10
+    assert settings.REAPPLY_COOLDOWN_REJECTED_HOURS == 0
+    assert settings.INSTANCE_ID
+
+    with pytest.raises(SettingsError, match="must be set"):
+        load_settings({})
+    with pytest.raises(SettingsError, match="INTERVIEW_CATEGORY_ID must be numeric"):
+        load_settings({**ENV, "INTERVIEW_CATEGORY_ID": "abc"})
+    with pytest.raises(SettingsError, match="REVIEW_CHANNEL_ID must be set"):
+        load_settings({**ENV, "APPLICATION_MODE": "thread"})
+    with pytest.raises(SettingsError, match="APPLY_BURST must be a number"):
+        load_settings({**ENV, "APPLY_BURST": "lots"})
+
+
+def test_create_app_builds_the_bot_and_subsystems():
+    import bot as handlers
+
+    app = create_app(environ={**ENV, "APPLY_BURST": "3", "OFFICER_ROLE_ID": "55"})
+    assert app is handlers.bot
+    assert {command.name for command in app.tree.get_commands()} == {
+        "noxpost", "noxsync", "noxprofile", "noxreject", "noxapprove",
+    }
+    assert handlers.admission is not None and handlers.notification_digest.store is handlers.state
+    assert handlers.get_guild_config(None).officer_role_id == 55
+
+    # A second app replaces the first and starts from scratch
+    handlers.ongoing_applications[1] = object()
+    second = create_app(environ=ENV)
+    assert second is not app and handlers.bot is second
+    assert handlers.ongoing_applications == {}
+
+    # ...but not while the current one is running
+    handlers.running = True
+    with pytest.raises(RuntimeError, match="one app"):
+        create_app(environ=ENV)
+    asyncio.run(second.close())
+    assert create_app(environ=ENV) is not second
+
+
+def test_closing_the_bot_releases_the_subsystems(monkeypatch, tmp_path):
+    import bot as handlers
+
+    app = create_app(environ={
+        **ENV, "EVENT_LOG": str(tmp_path / "events.jsonl"), "WCL_CLIENT_ID": "id", "WCL_CLIENT_SECRET": "secret",
+    })
+    closed = []
+    for name in ("wcl_client", "attachment_relay", "state"):
+        subsystem = getattr(handlers, name)
+
+        async def close(name=name, original=subsystem.close):
+            closed.append(name)
+            await original()
+
+        monkeypatch.setattr(subsystem, "close", close)
+
+    async def run():
+        handlers.start_background_task(handlers.leader_lease.run())
+        await asyncio.sleep(0)
+        assert handlers.leader_lease.is_leader
+        await app.close()
+        # Closing twice (e.g. Ctrl+C, then discord.py's own cleanup) shuts down once
+        await app.close()
+
+    asyncio.run(run())
+    assert closed == ["wcl_client", "attachment_relay", "state"]
+    # The lease was given up before the state backend closed
+    assert handlers.state._leases == {}
+    assert handlers.background_tasks == set()
+    assert handlers.event_recorder._file.closed
+
+
+def test_benchmark_times_a_fresh_process():
+    result = measure(runs=1)
+    assert set(result["median"]) == {"import_app_ms", "import_bot_ms", "create_app_ms", "process_ms"}
+    assert result["discord_deferred"]
+    assert result["median"]["process_ms"] >= result["median"]["import_bot_ms"]
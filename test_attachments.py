@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests for relaying applicant attachments against a local HTTP server
+"""
+import asyncio
+import io
+from types import SimpleNamespace
+
+import discord
+import pytest
+from aiohttp import web
+
+from attachments import AttachmentRelay, AttachmentTooLarge, describe_attachments
+from fake_discord import FakeAttachment, FakeDiscord, FakeMessage
+from replay import load_bot_module
+
+FILES = {
+    "/small.png": b"p" * 1000,
+    "/medium.png": b"m" * 5000,
+    "/large.png": b"l" * 20000,
+}
+
+
+async def serve():
+    async def handler(request):
+        body = FILES.get(request.path)
+        if body is None:
+            raise web.HTTPNotFound()
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for i in range(0, len(body), 1024):
+            await response.write(body[i:i + 1024])
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def record(base, name, question, size=None):
+    return {
+        "url": f"{base}/{name}",
+        "filename": name,
+        "size": len(FILES.get(f"/{name}", b"")) if size is None else size,
+        "content_type": "image/png",
+        "question": question,
+    }
+
+
+def run_relay(records_for, budget, file_limit, used=0, refuse_uploads=False):
+    async def run():
+        runner, base = await serve()
+        relay = AttachmentRelay(budget_bytes=budget, chunk_size=512, spool_bytes=2048)
+        sent, relayed = [], []
+
+        async def send(content, files):
+            if files and refuse_uploads:
+                raise discord.HTTPException(SimpleNamespace(status=413, reason="Payload Too Large"), "Request entity too large")
+            # What the bot hands to Discord
+            sent.append((content, [(name, discord.File(fp, filename=name).fp.read()) for name, fp in files]))
+
+        async def question_sent(question, used):
+            relayed.append((question, used))
+
+        try:
+            result = await relay.relay(records_for(base), send, file_limit, question_sent, used=used)
+        finally:
+            await relay.close()
+            await runner.cleanup()
+        return result, sent, relayed
+
+    return asyncio.run(run())
+
+
+def test_files_are_streamed_and_grouped_by_question():
+    (uploaded, linked), sent, relayed = run_relay(
+        lambda base: [record(base, "small.png", 0), record(base, "medium.png", 0), record(base, "small.png", 3)],
+        budget=100000,
+        file_limit=100000,
+    )
+    assert (uploaded, linked) == (3, 0)
+    assert [content for content, _ in sent] == ["📎 Attachments for question 1", "📎 Attachments for question 4"]
+    assert sent[0][1] == [("small.png", FILES["/small.png"]), ("medium.png", FILES["/medium.png"])]
+    assert relayed == [(0, 6000), (3, 7000)]
+
+
+def test_budget_and_upload_limit_fall_back_to_links():
+    (uploaded, linked), sent, _ = run_relay(
+        lambda base: [record(base, "medium.png", 0), record(base, "large.png", 0), record(base, "medium.png", 1)],
+        budget=8000,
+        file_limit=10000,
+    )
+    assert (uploaded, linked) == (1, 2)
+    assert "large.png" in sent[0][0]
+    assert sent[1][1] == []
+    assert "medium.png" in sent[1][0]
+
+
+def test_resumed_relay_keeps_the_bytes_already_used():
+    # A retried submission that already uploaded 5000 bytes only has 3000 left
+    (uploaded, linked), sent, relayed = run_relay(
+        lambda base: [record(base, "medium.png", 1), record(base, "small.png", 1)],
+        budget=8000,
+        file_limit=10000,
+        used=5000,
+    )
+    assert (uploaded, linked) == (1, 1)
+    assert sent[0][1] == [("small.png", FILES["/small.png"])]
+    assert relayed == [(1, 6000)]
+
+
+def test_refused_uploads_are_posted_as_links():
+    (uploaded, linked), sent, relayed = run_relay(
+        lambda base: [record(base, "small.png", 0), record(base, "medium.png", 1)],
+        budget=100000,
+        file_limit=100000,
+        refuse_uploads=True,
+    )
+    assert (uploaded, linked) == (0, 2)
+    assert [files for _, files in sent] == [[], []]
+    assert "[small.png](" in sent[0][0] and "[medium.png](" in sent[1][0]
+    # Nothing was uploaded, so nothing counts against the budget
+    assert relayed == [(0, 0), (1, 0)]
+
+
+def test_understated_size_and_missing_files_become_links():
+    (uploaded, linked), sent, _ = run_relay(
+        lambda base: [record(base, "large.png", 0, size=10), record(base, "gone.png", 0, size=10)],
+        budget=100000,
+        file_limit=10000,
+    )
+    assert (uploaded, linked) == (0, 2)
+
+
+def test_download_stops_at_the_limit():
+    async def run():
+        runner, base = await serve()
+        relay = AttachmentRelay(chunk_size=512)
+        try:
+            with pytest.raises(AttachmentTooLarge):
+                await relay.download(f"{base}/large.png", 4096)
+            fp, size = await relay.download(f"{base}/small.png", 4096)
+            assert size == 1000 and fp.read() == FILES["/small.png"]
+            fp.close()
+            # Small files stay in memory, larger ones go to disk; both are file objects discord.File accepts
+            for name, spool_bytes in (("small.png", 4096), ("large.png", 4096)):
+                relay.spool_bytes = spool_bytes
+                fp, size = await relay.download(f"{base}/{name}", 100000)
+                # discord.File takes anything else for a path (SpooledTemporaryFile before Python 3.11)
+                assert isinstance(fp, io.IOBase)
+                file = discord.File(fp, filename=name)
+                assert file.fp.read() == FILES[f"/{name}"]
+                file.close()
+        finally:
+            await relay.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_attachment_only_answers_list_the_files():
+    assert describe_attachments([{"filename": "gear.png"}, {"filename": "logs.txt"}]) == "📎 gear.png, logs.txt"
+
+
+def test_files_are_kept_only_with_accepted_answers():
+    app = load_bot_module()
+    fake = FakeDiscord()
+    user = fake.user(42, "tester")
+    handler = app.ApplicationHandler(user, fake.guild(7), app.get_guild_config(7))
+    gear = FakeAttachment("https://cdn.example/gear.png", "gear.png", 1000)
+    logs = FakeAttachment("https://cdn.example/logs.txt", "logs.txt", 10)
+
+    async def answer(content, *attachments):
+        await handler.process_answer(FakeMessage(user, None, content, attachments=attachments))
+
+    async def run():
+        # Rejected as spam: the file is dropped with the answer
+        await answer("!!!!!!!!!!!!!!!!!!!!", gear)
+        assert handler.attachments == [] and handler.answers == []
+        # Too long: the file waits with the answer until it is truncated
+        await answer("I have raided since vanilla. " * 40, logs)
+        assert handler.attachments == []
+        restored = app.ApplicationHandler.from_snapshot(handler.snapshot(), user, handler.guild)
+        assert restored.pending_attachments[0]["filename"] == "logs.txt"
+        await answer("proceed")
+        assert [(a["filename"], a["question"]) for a in handler.attachments] == [("logs.txt", 0)]
+        await answer("", gear)
+        assert [(a["filename"], a["question"]) for a in handler.attachments] == [("logs.txt", 0), ("gear.png", 1)]
+
+    asyncio.run(run())
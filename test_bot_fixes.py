@@ -12,77 +12,19 @@ class MockGuild:
     def __init__(self):
         self.name = "TestGuild"
 
-class ApplicationHandler:
-    """Simplified version of ApplicationHandler for testing"""
-    def __init__(self, user, guild):
-        self.user = user
-        self.guild = guild
-        self.answers = []
-        self.current_question = 0
-    
-    def validate_and_truncate_answer(self, content):
-        """Validate and truncate answer to prevent Discord limits"""
-        # Maximum characters per answer (leaving room for embed formatting and truncation message)
-        MAX_ANSWER_LENGTH = 800
-        TRUNCATION_MESSAGE = "... [Answer truncated due to length - {} characters total]"
-        
-        # Remove excessive whitespace
-        content = ' '.join(content.split())
-        
-        # Truncate if too long
-        if len(content) > MAX_ANSWER_LENGTH:
-            # Calculate how much space we need for the truncation message
-            truncation_msg = TRUNCATION_MESSAGE.format(len(content))
-            available_space = MAX_ANSWER_LENGTH - len(truncation_msg)
-            
-            # Ensure we have enough space for meaningful content
-            if available_space < 50:
-                available_space = 50
-                truncation_msg = "... [Truncated]"
-            
-            truncated_content = content[:available_space].rstrip()
-            
-            # Try to truncate at a word boundary
-            last_space = truncated_content.rfind(' ')
-            if last_space > available_space * 0.8:  # Only if we don't lose too much
-                truncated_content = truncated_content[:last_space]
-            
-            return f"{truncated_content}{truncation_msg}"
-        
-        return content
-    
-    def is_spam_answer(self, content):
-        """Check if answer appears to be spam (repeated characters/stickers)"""
-        if len(content) < 10:
-            return False
-        
-        # Check for excessive repeated characters (more than 80% of the content)
-        char_counts = {}
-        for char in content:
-            char_counts[char] = char_counts.get(char, 0) + 1
-        
-        # If any single character makes up more than 80% of the content, it's likely spam
-        max_char_ratio = max(char_counts.values()) / len(content)
-        if max_char_ratio > 0.8:
-            return True
-        
-        # Check for repeated patterns (like sticker spam)
-        # Look for sequences of the same 2-3 character pattern repeated
-        for pattern_length in [2, 3, 4]:
-            if len(content) >= pattern_length * 10:  # Only check if content is long enough
-                pattern = content[:pattern_length]
-                pattern_count = content.count(pattern)
-                if pattern_count > len(content) / (pattern_length * 2):  # Pattern appears too frequently
-                    return True
-        
-        return False
+def new_handler():
+    """The bot's real ApplicationHandler; importing bot.py has no side effects"""
+    from bot import ApplicationHandler
+    from config import BotConfig
+
+    return ApplicationHandler(MockUser(), MockGuild(), BotConfig("test", ["Any additional comments/questions?"]))
 
 def test_spam_detection():
     """Test the spam detection functionality"""
     print("Testing spam detection...")
     
     # Create a mock application handler
-    handler = ApplicationHandler(MockUser(), MockGuild())
+    handler = new_handler()
     
     # Test cases
     test_cases = [
@@ -114,13 +56,14 @@ def test_spam_detection():
         print(f"{status} Text length {len(text)}: {'SPAM' if result else 'OK'} (expected {'SPAM' if expected_spam else 'OK'})")
         if result != expected_spam:
             print(f"   Text preview: {text[:50]}...")
+        assert result == expected_spam
 
 def test_truncation():
     """Test the answer truncation functionality"""
     print("\nTesting answer truncation...")
     
     # Create a mock application handler
-    handler = ApplicationHandler(MockUser(), MockGuild())
+    handler = new_handler()
     
     # Test cases
     test_cases = [
@@ -145,12 +88,13 @@ def test_truncation():
             print(f"❌ Result still too long: {len(result)} characters")
         else:
             print(f"✅ Result within limits")
+        assert len(result) <= 800
 
 def test_edge_cases():
     """Test edge cases"""
     print("\nTesting edge cases...")
     
-    handler = ApplicationHandler(MockUser(), MockGuild())
+    handler = new_handler()
     
     # Empty string
     result = handler.validate_and_truncate_answer("")
@@ -167,6 +111,8 @@ def test_edge_cases():
     print(f"Unicode spam: detected={spam_result}, truncated_length={len(truncate_result)}")
 
 if __name__ == "__main__":
+    # pytest gets src/ on the path from conftest.py
+    import conftest  # noqa: F401
     print("Testing bot fixes for excessive stickers/characters\n")
     test_spam_detection()
     test_truncation()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for validating and hot-reloading the configuration file
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from config import BotConfig, ConfigError, ConfigWatcher, compile_config
+
+DEFAULTS = BotConfig("env", ["Default question?"], officer_role_id="111", interview_category_id="500")
+
+
+def test_compile_config_overrides_defaults():
+    config = compile_config({"version": 2, "questions": ["A?", "B?"], "admin_role_id": "222"}, DEFAULTS)
+    assert config.version == "2"
+    assert config.questions == ("A?", "B?")
+    assert [question.title for question in config.questionnaire] == ["Q1: A?", "Q2: B?"]
+    assert config.officer_role_id == 111
+    assert config.admin_role_id == 222
+    assert config.channel_prefix == "application"
+
+
+def test_long_question_titles_are_truncated_at_compile_time():
+    config = compile_config({"version": 1, "questions": ["x" * 300]}, DEFAULTS)
+    assert len(config.questionnaire[0].title) == 256
+
+
+@pytest.mark.parametrize("data", [
+    {"questions": ["A?"]},
+    {"version": 1, "questions": []},
+    {"version": 1, "questions": ["  "]},
+    {"version": 1, "officer_role_id": "abc"},
+    {"version": 1, "application_channel_prefix": "Bad Prefix"},
+])
+def test_invalid_configs_are_rejected(data):
+    with pytest.raises(ConfigError):
+        compile_config(data, DEFAULTS)
+
+
+def test_guild_overrides_are_built_lazily_and_cached():
+    config = compile_config({
+        "version": 3,
+        "guilds": {
+            "42": {"questions": ["Guild question?"], "interview_category_id": "900", "max_answer_length": 300},
+            "43": {"application_mode": "thread", "review_channel_id": "901", "reviewers": "7@18-23"},
+        },
+    }, DEFAULTS)
+    assert config._guild_configs == {}
+    guild = config.for_guild(42)
+    assert guild.questions == ("Guild question?",)
+    assert guild.interview_category_id == 900
+    assert guild.max_answer_length == 300
+    assert guild.officer_role_id == 111  # inherited from the top level
+    assert config.for_guild(42) is guild
+    assert config.for_guild(43).reviewers == {7: (18, 23)}
+    assert config.for_guild(44) is config
+    assert config.for_guild(43).with_questions("2", ["Old?"]).review_channel_id == 901
+
+
+@pytest.mark.parametrize("guilds", [
+    {"abc": {}},
+    {"42": {"application_mode": "thread"}},
+    {"42": {"max_answer_length": 5000}},
+    {"42": {"unknown": 1}},
+])
+def test_invalid_guild_sections_are_rejected(guilds):
+    with pytest.raises(ConfigError):
+        compile_config({"version": 1, "guilds": guilds}, DEFAULTS)
+
+
+def test_config_is_read_only():
+    with pytest.raises(AttributeError):
+        DEFAULTS.questions = ()
+
+
+def test_watcher_swaps_valid_versions_only(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"version": 1, "questions": ["One?"]}))
+    loaded = []
+    watcher = ConfigWatcher(str(path), DEFAULTS, loaded.append)
+    assert watcher.load_initial().version == "1"
+
+    async def run():
+        assert await watcher.check() is None  # unchanged
+        path.write_text("{not json")
+        os.utime(path, ns=(1, 1))
+        assert await watcher.check() is None  # rejected
+        path.write_text(json.dumps({"version": 2, "questions": ["One?", "Two?"]}))
+        os.utime(path, ns=(2, 2))
+        return await watcher.check()
+
+    config = asyncio.run(run())
+    assert config.questions == ("One?", "Two?")
+    assert [c.version for c in loaded] == ["2"]
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Tests for the re-application cooldown index
+"""
+from conftest import FakeClock
+from cooldowns import CooldownIndex
+
+
+def test_rejection_starts_a_cooldown_per_guild():
+    clock = FakeClock(1000.0)
+    index = CooldownIndex({"rejected": 100, "approved": 0}, clock)
+    assert index.record(1, 42, "rejected") == {"decision": "rejected", "until": 1100.0}
+    assert index.check(1, 42) == ("rejected", 1100.0)
+    assert index.check(2, 42) is None
+    clock.now = 1100.0
+    assert index.check(1, 42) is None
+    assert len(index) == 0
+
+
+def test_decision_without_cooldown_clears_the_entry():
+    index = CooldownIndex({"rejected": 100, "approved": 0}, FakeClock(1000.0))
+    index.record(1, 42, "rejected")
+    assert index.record(1, 42, "approved") is None
+    assert index.check(1, 42) is None
+
+
+def test_load_and_compact_state_entries():
+    clock = FakeClock(1000.0)
+    index = CooldownIndex({"rejected": 100}, clock)
+    items = {
+        CooldownIndex.key(1, 42): {"decision": "rejected", "until": 1050.0},
+        CooldownIndex.key(1, 43): {"decision": "approved", "until": 999.0},
+    }
+    index.load(items)
+    assert index.check(1, 42) == ("rejected", 1050.0)
+    assert index.check(1, 43) is None
+
+    clock.now = 2000.0
+    assert sorted(index.compact(items)) == ["1:42", "1:43"]
+    assert len(index) == 0
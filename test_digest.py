@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched officer notification digest
+"""
+import asyncio
+
+from conftest import FakeClock
+from digest import NotificationDigest
+from state import MemoryStateBackend
+
+
+def test_flushes_when_batch_is_full():
+    sent = []
+
+    async def send(items):
+        sent.append(items)
+
+    async def run():
+        digest = NotificationDigest(send, interval=60, max_items=3)
+        for i in range(7):
+            await digest.add(i)
+        return digest
+
+    digest = asyncio.run(run())
+    assert sent == [[0, 1, 2], [3, 4, 5]]
+    assert digest.items == [6]
+
+
+def test_flushes_after_interval():
+    sent = []
+
+    async def send(items):
+        sent.append(items)
+
+    async def run():
+        digest = NotificationDigest(send, interval=0.05, max_items=10)
+        await digest.add("a")
+        await digest.add("b")
+        assert sent == []
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert sent == [["a", "b"]]
+
+
+def test_failed_flush_keeps_items():
+    attempts = []
+
+    async def send(items):
+        attempts.append(list(items))
+        if len(attempts) == 1:
+            raise RuntimeError("Discord unavailable")
+
+    async def run():
+        digest = NotificationDigest(send, interval=0.05, max_items=2)
+        await digest.add("a")
+        await digest.add("b")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert attempts == [["a", "b"], ["a", "b"]]
+
+
+def test_notices_are_kept_in_the_store_until_sent():
+    store = MemoryStateBackend()
+    sent = []
+
+    async def send(items):
+        sent.append(items)
+        # The second guild's notice could not be delivered
+        return [item for item in items if item["guild"] == 2]
+
+    async def run():
+        digest = NotificationDigest(send, interval=60, max_items=2, store=store, key=lambda item: item["channel"])
+        await digest.add({"guild": 1, "channel": 10})
+        assert set(await store.items("digest")) == {"10"}
+        await digest.add({"guild": 2, "channel": 20})
+        digest._timer.cancel()
+        return digest, await store.items("digest")
+
+    digest, stored = asyncio.run(run())
+    assert len(sent) == 1
+    assert digest.items == [{"guild": 2, "channel": 20}]
+    assert set(stored) == {"20"}
+
+
+def test_recovers_notices_left_by_a_stopped_process():
+    store = MemoryStateBackend()
+    clock = FakeClock(1000.0)
+    sent = []
+
+    async def send(items):
+        sent.extend(items)
+
+    async def run():
+        stopped = NotificationDigest(send, interval=60, store=store, key=lambda item: item, clock=clock)
+        await stopped.add("a")
+        stopped._timer.cancel()
+        leader = NotificationDigest(send, interval=60, store=store, key=lambda item: item, clock=clock)
+        await leader.add("b")
+        leader._timer.cancel()
+        # Too recent: the process that buffered it may still flush it
+        assert await leader.recover(older_than=120) == 0
+        clock.now += 121
+        # Only the notice this process isn't holding is adopted, and the flush sends both
+        assert await leader.recover(older_than=120) == 1
+        return await store.items("digest")
+
+    assert asyncio.run(run()) == {}
+    assert sorted(sent) == ["a", "b"]
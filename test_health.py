@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests for the event-loop lag watchdog and the health endpoint
+"""
+import asyncio
+import json
+import logging
+import time
+
+from health import HealthServer, LoopLagWatchdog
+
+
+def test_watchdog_detects_blocking_call(caplog):
+    async def run():
+        watchdog = LoopLagWatchdog(interval=0.05, threshold=0.1, dump_cooldown=0)
+        task = asyncio.create_task(watchdog.run())
+        await asyncio.sleep(0.1)
+        time.sleep(0.4)  # block the loop
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return watchdog
+
+    with caplog.at_level(logging.WARNING, logger="health"):
+        watchdog = asyncio.run(run())
+    assert watchdog.max_lag >= 0.3
+    assert "blocking thread stack" in caplog.text
+    assert "time.sleep(0.4)" in caplog.text
+    assert "Asyncio task stacks" in caplog.text
+
+
+def test_healthz_endpoint():
+    state = {"healthy": True}
+
+    async def fetch(port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        head, body = response.split(b"\r\n\r\n", 1)
+        return head.split(b"\r\n")[0].decode(), body
+
+    async def run():
+        server = HealthServer(lambda: (state["healthy"], {"loop_lag_ms": 1.0}), "127.0.0.1", 0)
+        await server.start()
+        ok_status, ok_body = await fetch(server.port, "/healthz")
+        state["healthy"] = False
+        bad_status, _ = await fetch(server.port, "/healthz")
+        missing_status, _ = await fetch(server.port, "/other")
+        await server.stop()
+        return ok_status, ok_body, bad_status, missing_status
+
+    ok_status, ok_body, bad_status, missing_status = asyncio.run(run())
+    assert ok_status.endswith("200 OK")
+    assert json.loads(ok_body) == {"loop_lag_ms": 1.0}
+    assert "503" in bad_status
+    assert "404" in missing_status
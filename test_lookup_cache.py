@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTL-bounded LRU applicant cache
+"""
+from conftest import FakeClock
+from lookup_cache import TTLCache
+
+
+def test_hit_miss_and_expiry():
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl_seconds=60, clock=clock)
+    assert cache.get(1) is None
+    cache.put(1, "user")
+    assert cache.get(1) == "user"
+    clock.now = 61
+    assert cache.get(1) is None
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction_respects_recent_use():
+    cache = TTLCache(max_size=2, ttl_seconds=60)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    cache.get(1)  # 2 is now least recently used
+    cache.put(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+
+
+def test_zero_size_disables_cache():
+    cache = TTLCache(max_size=0)
+    cache.put(1, "a")
+    assert cache.get(1) is None
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for the opt-in handler profiler
+"""
+import asyncio
+import json
+import os
+
+from profiling import Profiler
+
+
+async def slow_lookup():
+    await asyncio.sleep(0.05)
+
+
+def test_profiler_records_timing_and_folded_stacks(tmp_path):
+    profiler = Profiler(str(tmp_path), sample_interval=0.005)
+
+    @profiler.profiled("handler")
+    async def handler():
+        await slow_lookup()
+        return "done"
+
+    async def run():
+        assert await handler() == "done"  # disabled: not recorded
+        profiler.start()
+        assert await handler() == "done"
+        return await profiler.stop()
+
+    run_dir = asyncio.run(run())
+    summary = json.load(open(os.path.join(run_dir, "summary.json")))
+    assert summary["handler"]["calls"] == 1
+    assert summary["handler"]["wall_total_ms"] >= 50
+
+    lines = open(os.path.join(run_dir, "handler.folded")).read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    frames = [frame.split(" ")[0] for frame in stack.split(";")]
+    assert frames[-3:] == ["test_profiler_records_timing_and_folded_stacks.<locals>.handler", "slow_lookup", "sleep"]
+    assert not any("wrapper" in frame for frame in frames)
+
+
+def test_profiler_counts_errors():
+    profiler = Profiler()
+
+    @profiler.profiled("failing")
+    async def failing():
+        raise ValueError("boom")
+
+    async def run():
+        profiler.start()
+        try:
+            await failing()
+        except ValueError:
+            pass
+        profiler.enabled = False
+        profiler._sampler.cancel()
+
+    asyncio.run(run())
+    assert profiler.summary()["failing"]["errors"] == 1
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for compiling and walking branching questionnaires
+"""
+import asyncio
+import re
+
+import pytest
+
+from config import BotConfig
+from fake_discord import FakeDiscord, FakeInteraction
+from questionnaire import END, QuestionnaireError, compile_questionnaire
+from replay import load_bot_module
+
+BRANCHING = [
+    {
+        "id": "team",
+        "text": "Which team?",
+        "choices": ["Weekend", "TBC Team"],
+        "next": {"TBC Team": "tbc", "default": "schedule"},
+    },
+    {"id": "tbc", "text": "Which TBC raids have you cleared?", "next": "about"},
+    {"id": "schedule", "text": "Have you read the schedule?"},
+    {"id": "about", "text": "Tell us about yourself"},
+]
+
+
+def walk(questionnaire, answers):
+    index = questionnaire.start
+    asked = []
+    for answer in answers:
+        asked.append(questionnaire[index].id)
+        index = questionnaire.next_index(index, answer)
+        if index is END:
+            break
+    return asked, index
+
+
+def test_plain_strings_are_asked_in_order():
+    questionnaire = compile_questionnaire(["A?", "B?", "C?"])
+    assert walk(questionnaire, ["a", "b", "c"]) == (["q1", "q2", "q3"], END)
+    assert questionnaire.remaining == (3, 2, 1)
+
+
+def test_choices_select_the_branch():
+    questionnaire = compile_questionnaire(BRANCHING)
+    assert walk(questionnaire, ["TBC Team", "Kara", "Hi"]) == (["team", "tbc", "about"], END)
+    assert walk(questionnaire, ["Weekend", "Yes", "Hi"]) == (["team", "schedule", "about"], END)
+    # Branch keys are matched case-insensitively
+    assert walk(questionnaire, ["tbc team"])[1] == 1
+
+
+def test_remaining_is_the_longest_path():
+    questionnaire = compile_questionnaire(BRANCHING)
+    assert questionnaire.remaining == (3, 2, 2, 1)
+
+
+def test_null_next_ends_the_application():
+    questionnaire = compile_questionnaire([{"text": "Done?", "next": None}, "Never asked"])
+    assert questionnaire.next_index(0, "yes") is END
+
+
+def test_match_choice_accepts_labels_and_numbers():
+    question = compile_questionnaire(BRANCHING)[0]
+    assert question.match_choice(" weekend ") == "Weekend"
+    assert question.match_choice("2") == "TBC Team"
+    assert question.match_choice("3") is None
+    assert question.match_choice("Sunday") is None
+
+
+@pytest.mark.parametrize("definitions", [
+    [],
+    [42],
+    [{"text": "A?", "colour": "red"}],
+    [{"id": "a", "text": "A?"}, {"id": "a", "text": "B?"}],
+    [{"text": "A?", "next": "missing"}],
+    [{"text": "A?", "next": {"Yes": "q1"}}],
+    [{"text": "A?", "choices": ["Yes", "No"], "next": {"Maybe": None}}],
+    [{"text": "A?", "choices": ["Yes", "yes"]}],
+    [{"text": "A?", "choices": [str(i) for i in range(26)]}],
+    [{"id": "a", "text": "A?"}, {"id": "b", "text": "B?", "next": "a"}],
+])
+def test_invalid_questionnaires_are_rejected(definitions):
+    with pytest.raises(QuestionnaireError):
+        compile_questionnaire(definitions)
+
+
+def test_choice_menus_keep_working_after_a_restart():
+    app = load_bot_module()
+    fake = FakeDiscord()
+    user = fake.user(42, "tester")
+    config = BotConfig("test", BRANCHING)
+    handler = app.ApplicationHandler(user, None, config)
+    view = app.ChoiceView(config.questionnaire[handler.current_question])
+    # Not tied to this process: no timeout, and the menu is rebuilt from its custom_id
+    assert view.timeout is None and view.is_persistent()
+
+    async def run():
+        await handler.save_session()
+        app.ongoing_applications.clear()
+        select = view.children[0]
+        interaction = FakeInteraction(user, data={"custom_id": select.custom_id, "values": ["TBC Team"]})
+        item = await app.ChoiceSelect.from_custom_id(interaction, select.item, re.fullmatch(r"choice:(?P<index>[0-9]+)", select.custom_id))
+        # What discord.py does before calling a dynamic item
+        item._refresh_state(interaction, interaction.data)
+        await item.callback(interaction)
+
+    asyncio.run(run())
+    resumed = app.ongoing_applications[42]
+    assert resumed.answers == ["TBC Team"]
+    assert config.questionnaire[resumed.current_question].id == "tbc"
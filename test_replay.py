@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for recording events and replaying them through the real handlers
+"""
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import discord
+
+from conftest import FakeClock, apply_click, dm
+from recorder import EventRecorder, read_events
+from replay import Replayer, load_bot_module, summarize
+
+GUILD_ID = 7
+APPLICANT_ID = 42
+OFFICER_ID = 5
+
+
+def recording(app):
+    events = [{"type": "start", "time": 0, "t": 0}, apply_click(APPLICANT_ID, "tester", GUILD_ID, 0.01)]
+    answers = ["Weekend", "Yes", "A friend", "Healer", "No logs yet", "No", "I raid a lot", "Thanks"]
+    events += [dm(APPLICANT_ID, "tester", answer, 0.02 + i / 100) for i, answer in enumerate(answers[:len(app.questions)])]
+    events.append({
+        "type": "interaction", "kind": discord.InteractionType.application_command.value, "t": 0.2,
+        "user_id": OFFICER_ID, "user_name": "officer", "guild_id": GUILD_ID,
+        "channel_id": 123, "channel_name": "application-tester",
+        "data": {"name": "noxreject", "options": [{"name": "reason", "value": "Roster is full"}]},
+    })
+    events.append(apply_click(APPLICANT_ID, "tester", GUILD_ID, 0.3))
+    return events
+
+
+def test_recorder_writes_replayable_events(tmp_path):
+    path = tmp_path / "events.jsonl"
+    recorder = EventRecorder(str(path))
+    author = SimpleNamespace(id=APPLICANT_ID, name="tester")
+    recorder.record_message(SimpleNamespace(author=author, content="Healer", attachments=[]))
+    recorder.record_interaction(SimpleNamespace(
+        type=discord.InteractionType.component, user=author, guild_id=GUILD_ID, channel_id=70,
+        channel=SimpleNamespace(name="apply-here"), data={"custom_id": "apply_button"},
+    ))
+    recorder.close()
+
+    events = list(read_events(str(path)))
+    assert [event["type"] for event in events] == ["start", "message", "interaction"]
+    assert events[1]["content"] == "Healer"
+    assert events[2]["data"] == {"custom_id": "apply_button"}
+    assert all(isinstance(event["t"], float) or event["t"] == 0 for event in events)
+    json.dumps(events)
+
+
+def test_replay_drives_the_real_handlers():
+    app = load_bot_module({**os.environ, "REAPPLY_COOLDOWN_REJECTED_HOURS": "168"})
+    replayer = Replayer(app)
+    timings = asyncio.run(replayer.replay(recording(app), speed=0))
+
+    guild = replayer.fake.guilds[GUILD_ID]
+    channel = next(c for c in guild.channels if getattr(c, "topic", None) and "Application reference" in c.topic)
+    assert channel.name == "application-tester"
+    application = channel.messages[0].embeds[0]
+    assert application.title == "New Application from tester"
+    assert application.fields[0].value == "Weekend"
+
+    applicant = replayer.fake.users[APPLICANT_ID]
+    assert any(e.title == "Application Update" for m in applicant.messages for e in m.embeds)
+    # The second click hits the re-application cooldown written by /noxreject
+    assert "apply again" in replayer.fake.sent[-1].content
+
+    summary = summarize(timings)
+    assert summary["apply_button"]["count"] == 2
+    assert summary["/noxreject"]["count"] == 1
+
+
+def test_dms_are_dispatched_through_on_message(monkeypatch, caplog):
+    app = load_bot_module()
+    replayer = Replayer(app)
+    seen = []
+    on_message = app.on_message
+
+    async def spy(message):
+        seen.append(isinstance(message.channel, discord.DMChannel))
+        await on_message(message)
+
+    monkeypatch.setattr(app, "on_message", spy)
+    # A DM from someone without an application falls through to the command processing
+    events = [
+        dm(APPLICANT_ID, "tester", "hello?"),
+        apply_click(APPLICANT_ID, "tester", GUILD_ID, 0.01),
+        dm(APPLICANT_ID, "tester", "Weekend", 0.02),
+    ]
+    asyncio.run(replayer.replay(events, speed=0))
+    assert seen == [True, True]
+    assert "Error replaying" not in caplog.text
+    applicant = replayer.fake.users[APPLICANT_ID]
+    assert len(app.ongoing_applications[APPLICANT_ID].answers) == 1
+    # Replies sent to the DM channel reach the applicant
+    assert applicant.dm_channel.recipient is applicant
+
+
+def test_replay_keeps_the_order_of_a_log_with_several_runs(tmp_path, monkeypatch):
+    path = str(tmp_path / "events.jsonl")
+    for contents in (["first", "second"], ["third", "fourth"]):
+        clock = FakeClock()
+        recorder = EventRecorder(path, clock=clock)
+        author = SimpleNamespace(id=APPLICANT_ID, name="tester")
+        for content in contents:
+            clock.now += 0.05
+            recorder.record_message(SimpleNamespace(author=author, content=content, attachments=[]))
+        recorder.close()
+
+    replayer = Replayer(load_bot_module())
+    dispatched = []
+
+    async def dispatch(event):
+        dispatched.append((event["content"], asyncio.get_running_loop().time()))
+
+    monkeypatch.setattr(replayer, "dispatch", dispatch)
+    asyncio.run(replayer.replay(list(read_events(path)), speed=1))
+    assert [content for content, _ in dispatched] == ["first", "second", "third", "fourth"]
+    # The second run's times continue from the first run's last event, so every gap stays 0.05 s
+    gaps = [later - earlier for (_, earlier), (_, later) in zip(dispatched, dispatched[1:])]
+    assert all(0.03 < gap < 0.1 for gap in gaps), gaps
+
+
+def test_queued_applicant_rejected_while_waiting_is_not_started(monkeypatch):
+    app = load_bot_module({**os.environ, "MAX_ACTIVE_APPLICATIONS": "1", "REAPPLY_COOLDOWN_REJECTED_HOURS": "168"})
+    replayer = Replayer(app)
+    monkeypatch.setattr(app.bot, "get_guild", replayer.fake.guilds.get)
+
+    async def scenario():
+        await replayer.replay([apply_click(43, "first", GUILD_ID), apply_click(APPLICANT_ID, "tester", GUILD_ID, 0.01)], speed=0)
+        assert "in line" in replayer.fake.sent[-1].content
+        await app.record_decision(GUILD_ID, APPLICANT_ID, "rejected")
+        await app.forget_application(43)
+        for user_id, guild_id in app.admission.drain():
+            await app.start_queued_application(user_id, guild_id)
+
+    asyncio.run(scenario())
+    assert APPLICANT_ID not in app.ongoing_applications
+    assert not app.admission.active
+    applicant = replayer.fake.users[APPLICANT_ID]
+    assert "apply again" in applicant.messages[-1].content
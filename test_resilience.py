@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for submission retry backoff and the circuit breaker
+"""
+import asyncio
+
+import resilience
+from conftest import FakeClock
+from resilience import CircuitBreaker, backoff_delay, retry_async
+
+
+class Transient(Exception):
+    pass
+
+
+def test_backoff_is_jittered_and_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base_delay=1, max_delay=5) <= 5
+
+
+def test_retry_resumes_until_success(monkeypatch):
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", no_sleep)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise Transient()
+        return "ok"
+
+    assert asyncio.run(retry_async(flaky, lambda e: isinstance(e, Transient), attempts=4)) == "ok"
+    assert len(calls) == 3
+
+
+def test_retry_does_not_retry_permanent_errors():
+    calls = []
+
+    async def broken():
+        calls.append(1)
+        raise ValueError("permanent")
+
+    try:
+        asyncio.run(retry_async(broken, lambda e: isinstance(e, Transient)))
+    except ValueError:
+        pass
+    assert len(calls) == 1
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=clock)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now = 61
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()  # single probe
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 122
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for least-loaded reviewer assignment
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+from fake_discord import FakeDiscord
+from replay import load_bot_module
+from reviewers import ReviewerScheduler, is_available, parse_reviewers
+from state import REVIEWS
+
+EVENING = datetime(2026, 1, 1, 20, tzinfo=timezone.utc)
+MORNING = datetime(2026, 1, 1, 8, tzinfo=timezone.utc)
+
+
+def test_parse_reviewers():
+    assert parse_reviewers("1@18-23, 2 ,3@22-2") == {1: (18, 23), 2: None, 3: (22, 2)}
+    assert parse_reviewers("") == {}
+
+
+def test_availability_windows_wrap_midnight():
+    assert is_available((22, 2), datetime(2026, 1, 1, 23, tzinfo=timezone.utc))
+    assert is_available((22, 2), datetime(2026, 1, 1, 1, tzinfo=timezone.utc))
+    assert not is_available((22, 2), EVENING)
+    assert is_available(None, EVENING)
+
+
+def test_assigns_least_loaded_and_rebalances_on_completion():
+    scheduler = ReviewerScheduler({1: None, 2: None, 3: None})
+    assigned = [scheduler.assign(channel, EVENING) for channel in (10, 11, 12)]
+    assert sorted(assigned) == [1, 2, 3]
+    scheduler.complete(11)
+    assert scheduler.assign(13, EVENING) == assigned[1]
+    assert sorted(scheduler.loads.values()) == [1, 1, 1]
+
+
+def test_skips_unavailable_reviewers():
+    scheduler = ReviewerScheduler({1: (18, 23), 2: None})
+    assert scheduler.assign(10, MORNING) == 2
+    assert scheduler.assign(11, MORNING) == 2  # 1 is off duty despite lower load
+    assert scheduler.assign(12, EVENING) == 1
+    assert ReviewerScheduler({1: (18, 23)}).assign(10, MORNING) is None
+
+
+def test_stale_reviews_are_reassigned():
+    scheduler = ReviewerScheduler({1: None, 2: None}, stale_after=60)
+    scheduler.load({"10": {"reviewer_id": 1, "assigned_at": time.time() - 120}})
+    assert scheduler.loads == {1: 1, 2: 0}
+    assert scheduler.stale_reviews() == [10]
+    assert scheduler.reassign(10, EVENING) == 2
+    assert scheduler.loads == {1: 0, 2: 1}
+    assert scheduler.stale_reviews() == []
+
+
+def test_open_reviews_are_loaded_at_startup(monkeypatch):
+    app = load_bot_module({**os.environ, "REVIEWERS": "1,2"})
+    guild = FakeDiscord().guild(7)
+    channel = guild.add_text_channel("application-legacy")
+    monkeypatch.setattr(app.bot, "get_channel", guild.get_channel)
+    assigned_at = time.time() - 3600
+
+    async def run():
+        await app.state.set(REVIEWS, 10, {"guild_id": 7, "reviewer_id": 1, "assigned_at": assigned_at})
+        # Saved before reviews recorded their guild
+        await app.state.set(REVIEWS, channel.id, {"reviewer_id": 2, "assigned_at": assigned_at})
+        await app.state.set(REVIEWS, 999, {"reviewer_id": 2, "assigned_at": assigned_at})
+        assert await app.load_open_reviews() == {7}
+        return await app.state.items(REVIEWS)
+
+    reviews = asyncio.run(run())
+    assert app.reviewer_schedulers[7].open_reviews == {10: (1, assigned_at), channel.id: (2, assigned_at)}
+    assert reviews[str(channel.id)]["guild_id"] == 7
+    # A legacy review whose channel can't be found is kept for a later start-up
+    assert "guild_id" not in reviews["999"]
+
+
+def test_loads_include_reviews_assigned_by_other_processes():
+    app = load_bot_module({**os.environ, "REVIEWERS": "1,2"})
+
+    async def run():
+        await app.get_reviewer_scheduler(7)
+        # Another bot process assigns a review to reviewer 1 through the shared state
+        await app.state.set(REVIEWS, 10, {"guild_id": 7, "reviewer_id": 1, "assigned_at": time.time()})
+        first = await app.assign_reviewer(7, 11)
+        # ...and later closes it
+        await app.state.delete(REVIEWS, 10)
+        second = await app.assign_reviewer(7, 12)
+        return first, second
+
+    assert asyncio.run(run()) == (2, 1)
+    assert app.reviewer_schedulers[7].loads == {1: 1, 2: 1}
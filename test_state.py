@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared state backends and lease-based leader election
+"""
+import asyncio
+import time
+
+from state import SESSIONS, LeaderLease, MemoryStateBackend, RedisStateBackend, SQLiteStateBackend, create_state_backend
+
+
+class FakeRedisServer:
+    """Minimal local stand-in speaking enough of the Redis protocol for the backend"""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}  # key -> (value, expires_at)
+        self.commands = []
+        self.delays = {}  # command -> seconds to wait before replying
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _live(self, key):
+        entry = self.strings.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self.strings[key]
+            return None
+        return entry
+
+    def dispatch(self, args):
+        command, args = args[0].upper(), args[1:]
+        if command == "EVAL":
+            # Only the backend's lease scripts; each runs atomically like in Redis
+            script, key, owner = args[0], args[2], args[3]
+            if self.dispatch(["GET", key]) != owner:
+                return 0
+            if script == RedisStateBackend.RENEW_SCRIPT:
+                return self.dispatch(["PEXPIRE", key, args[4]])
+            if script == RedisStateBackend.RELEASE_SCRIPT:
+                return self.dispatch(["DEL", key])
+            raise ValueError(script)
+        if command == "HSET":
+            self.hashes.setdefault(args[0], {})[args[1]] = args[2]
+            return 1
+        if command == "HGET":
+            return self.hashes.get(args[0], {}).get(args[1])
+        if command == "HDEL":
+            return 1 if self.hashes.get(args[0], {}).pop(args[1], None) is not None else 0
+        if command == "HGETALL":
+            return [item for pair in self.hashes.get(args[0], {}).items() for item in pair]
+        if command == "SET":
+            options = [a.upper() for a in args[2:]]
+            if "NX" in options and self._live(args[0]):
+                return None
+            expires = time.time() + int(args[3 + options.index("PX")]) / 1000 if "PX" in options else None
+            self.strings[args[0]] = (args[1], expires)
+            return "OK"
+        if command == "GET":
+            entry = self._live(args[0])
+            return entry[0] if entry else None
+        if command == "PEXPIRE":
+            entry = self._live(args[0])
+            if not entry:
+                return 0
+            self.strings[args[0]] = (entry[0], time.time() + int(args[1]) / 1000)
+            return 1
+        if command == "DEL":
+            return 1 if self.strings.pop(args[0], None) else 0
+        raise ValueError(command)
+
+    @staticmethod
+    def encode(value):
+        if value is None:
+            return b"$-1\r\n"
+        if value == "OK":
+            return b"+OK\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(FakeRedisServer.encode(v) for v in value)
+        data = value.encode()
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                self.commands.append(args[0].upper())
+                await asyncio.sleep(self.delays.get(args[0].upper(), 0))
+                writer.write(self.encode(self.dispatch(args)))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+async def exercise_backend(backend):
+    await backend.set("sessions", 42, {"answers": ["a"], "current_question": 1})
+    assert await backend.get("sessions", 42) == {"answers": ["a"], "current_question": 1}
+    assert await backend.get("sessions", "missing") is None
+    await backend.set("applicants", 1, 42)
+    await backend.set("applicants", 2, 43)
+    assert await backend.items("applicants") == {"1": 42, "2": 43}
+    await backend.delete("applicants", 1)
+    assert await backend.items("applicants") == {"2": 43}
+
+    assert await backend.acquire_lease("sweeper", "a", 30)
+    assert await backend.acquire_lease("sweeper", "a", 30)  # renewal
+    assert not await backend.acquire_lease("sweeper", "b", 30)
+    await backend.release_lease("sweeper", "a")
+    assert await backend.acquire_lease("sweeper", "b", 0.05)
+    await asyncio.sleep(0.1)
+    assert await backend.acquire_lease("sweeper", "a", 30)  # expired lease is taken over
+
+
+def test_memory_backend():
+    asyncio.run(exercise_backend(MemoryStateBackend()))
+
+
+def test_sqlite_backend(tmp_path):
+    path = str(tmp_path / "state.db")
+
+    async def run():
+        backend = SQLiteStateBackend(path)
+        await exercise_backend(backend)
+        # A second process opening the same file sees the same state
+        other = SQLiteStateBackend(path)
+        assert await other.get("applicants", 2) == 43
+        assert not await other.acquire_lease("sweeper", "b", 30)
+        await other.close()
+        await backend.close()
+
+    asyncio.run(run())
+
+
+def test_redis_backend_against_stand_in():
+    async def run():
+        server = FakeRedisServer()
+        port = await server.start()
+        backend = create_state_backend(f"redis://127.0.0.1:{port}/0")
+        assert isinstance(backend, RedisStateBackend)
+        await exercise_backend(backend)
+
+        # Renewal is one atomic compare-and-extend, and never extends someone else's lease
+        server.commands.clear()
+        assert await backend.acquire_lease("sweeper", "a", 30)
+        assert server.commands == ["SET", "EVAL"]
+        assert await backend.acquire_lease("other", "b", 0.05)
+        await asyncio.sleep(0.1)
+        assert await backend.acquire_lease("other", "c", 30)
+        expires = server.strings[backend._key("lease:other")][1]
+        assert not await backend.acquire_lease("other", "b", 60)
+        await backend.release_lease("other", "b")
+        assert server.strings[backend._key("lease:other")] == ("c", expires)
+
+        # A command abandoned before its reply arrives must not hand that reply to the next command
+        server.delays["HGETALL"] = 0.2
+        try:
+            await asyncio.wait_for(backend.items("applicants"), 0.05)
+        except asyncio.TimeoutError:
+            pass
+        else:
+            raise AssertionError("the slow command should have timed out")
+        assert await backend.get("sessions", 42) == {"answers": ["a"], "current_question": 1}
+        assert await backend.acquire_lease("sweeper", "a", 30)
+        await backend.close()
+        await server.stop()
+
+    asyncio.run(run())
+
+
+def test_create_state_backend_urls():
+    assert isinstance(create_state_backend("memory://"), MemoryStateBackend)
+    assert isinstance(create_state_backend(None), MemoryStateBackend)
+    backend = create_state_backend("redis://:secret@cache:6380/2")
+    assert (backend.host, backend.port, backend.db, backend.password) == ("cache", 6380, 2, "secret")
+
+
+def test_leader_election_single_leader():
+    async def run():
+        backend = MemoryStateBackend()
+        first = LeaderLease(backend, "sweeper", "a", ttl_seconds=30)
+        second = LeaderLease(backend, "sweeper", "b", ttl_seconds=30)
+        assert await first.try_acquire()
+        assert not await second.try_acquire()
+        assert first.is_leader and not second.is_leader
+
+        # Stopping the leader releases the lease for the standby
+        task = asyncio.create_task(first.run())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert await second.try_acquire()
+
+    asyncio.run(run())
+
+
+def test_standby_process_ignores_events(tmp_path):
+    from app import create_app
+    from fake_discord import FakeDiscord, FakeMessage
+    import bot as handlers
+
+    app = create_app(environ={
+        "DISCORD_BOT_TOKEN": "test", "INTERVIEW_CATEGORY_ID": "1",
+        "STATE_BACKEND_URL": f"sqlite:///{tmp_path / 'state.db'}",
+    })
+    user = FakeDiscord().user(42, "tester")
+
+    async def run():
+        await handlers.state.set(SESSIONS, user.id, {"user_id": user.id, "guild_id": None, "answers": []})
+        # Not the leader: DMs, clicks and commands are left to the active process
+        await handlers.on_message(FakeMessage(user, user.dm_channel, "Weekend"))
+        assert handlers.ongoing_applications == {}
+        assert not await handlers.ApplicationView().interaction_check(None)
+        assert not await app.tree.interaction_check(None)
+        assert await handlers.leader_lease.try_acquire()
+        assert await handlers.ApplicationView().interaction_check(None)
+        await handlers.on_message(FakeMessage(user, user.dm_channel, "Weekend"))
+        assert user.id in handlers.ongoing_applications
+        await app.close()
+
+    asyncio.run(run())
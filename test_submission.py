@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Tests for the resumable submission steps against the fake Discord
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from types import SimpleNamespace
+
+import discord
+
+from fake_discord import FakeDiscord, FakeTextChannel
+from replay import load_bot_module
+from state import DIGEST
+
+GUILD_ID = 7
+APPLICANT_ID = 42
+
+
+def new_submission(app, user, answers=("Weekend", "Yes")):
+    """A submission like the one complete_application() builds"""
+    config = app.get_guild_config(GUILD_ID)
+    return {
+        "token": uuid.uuid4().hex,
+        "user_id": user.id,
+        "guild_id": GUILD_ID,
+        "answers": list(answers),
+        "asked": list(range(len(answers))),
+        "attachments": [],
+        "relayed_questions": [],
+        "relayed_bytes": 0,
+        "wcl_links": [],
+        "config_version": config.version,
+        "questions": list(config.questions),
+        "status": "pending",
+        "channel_id": None,
+        "message_id": None,
+        "post_attempted": False,
+        "notified": False,
+        "updated_at": time.time(),
+    }
+
+
+def lose_response_once(method, applies=lambda kwargs: True):
+    """Wrap an async fake method so Discord carries out the first call but its response is lost"""
+    lost = []
+
+    async def wrapper(*args, **kwargs):
+        result = await method(*args, **kwargs)
+        if not lost and applies(kwargs):
+            lost.append(result)
+            raise ConnectionError("response lost")
+        return result
+
+    return wrapper
+
+
+def test_retried_submission_resumes_without_duplicates(monkeypatch):
+    app = load_bot_module()
+    fake = FakeDiscord()
+    config = app.get_guild_config(GUILD_ID)
+    guild = fake.guild(GUILD_ID, [config.interview_category_id])
+    user = fake.user(APPLICANT_ID, "tester")
+    guild.create_text_channel = lose_response_once(guild.create_text_channel)
+    monkeypatch.setattr(FakeTextChannel, "send", lose_response_once(FakeTextChannel.send, lambda kwargs: "embed" in kwargs))
+    submission = new_submission(app, user)
+
+    async def run():
+        failures = 0
+        # What retry_async does, without the backoff delays
+        while True:
+            try:
+                await app.run_submission_steps(submission, guild, user)
+                return failures
+            except ConnectionError:
+                failures += 1
+
+    assert asyncio.run(run()) == 2
+    channels = [c for c in guild.channels if getattr(c, "topic", None) and submission["token"] in c.topic]
+    assert len(channels) == 1
+    embeds = [m for m in channels[0].messages if m.embeds]
+    assert len(embeds) == 1
+    assert submission["message_id"] == embeds[0].id
+    assert submission["notified"]
+    assert [e.title for m in user.messages for e in m.embeds] == ["✅ Application Submitted Successfully!"]
+
+
+def posted_content(environ):
+    app = load_bot_module({**os.environ, **environ})
+    fake = FakeDiscord()
+    config = app.get_guild_config(GUILD_ID)
+    guild = fake.guild(GUILD_ID, [config.interview_category_id])
+    user = fake.user(APPLICANT_ID, "tester")
+    asyncio.run(app.run_submission_steps(new_submission(app, user), guild, user))
+    channel = next(c for c in guild.channels if getattr(c, "topic", None))
+    return next(m for m in channel.messages if m.embeds).content
+
+
+def test_unassigned_applications_ping_the_configured_roles():
+    assert posted_content({"OFFICER_ROLE_ID": "77", "ADMIN_ROLE_ID": "88"}) == "<@42> <@&77> <@&88>"
+    # Without any configured role only the applicant is mentioned
+    assert posted_content({"OFFICER_ROLE_ID": "", "ADMIN_ROLE_ID": ""}) == "<@42>"
+
+
+def test_digest_goes_to_each_guilds_channel_with_the_configured_roles(monkeypatch, tmp_path):
+    config_file = tmp_path / "config.json"
+    config_file.write_text(json.dumps({
+        "version": 1,
+        "questions": ["Weekend?", "Yes?"],
+        "guilds": {"8": {"digest_channel_id": "81", "officer_role_id": "82"}},
+    }))
+    app = load_bot_module({**os.environ, "CONFIG_FILE": str(config_file), "DIGEST_CHANNEL_ID": "71", "OFFICER_ROLE_ID": "77", "ADMIN_ROLE_ID": ""})
+    fake = FakeDiscord()
+    guilds = {}
+    for guild_id, digest_channel_id in ((GUILD_ID, 71), (8, 81)):
+        guild = guilds[guild_id] = fake.guild(guild_id, [app.get_guild_config(guild_id).interview_category_id])
+        guild.add_text_channel("digest", id=digest_channel_id)
+    monkeypatch.setattr(app.bot, "get_channel", lambda channel_id: guilds[GUILD_ID].get_channel(channel_id) or guilds[8].get_channel(channel_id))
+    user = fake.user(APPLICANT_ID, "tester")
+
+    async def run():
+        for guild_id in guilds:
+            submission = {**new_submission(app, user), "guild_id": guild_id}
+            await app.run_submission_steps(submission, guilds[guild_id], user)
+        assert len(await app.state.items(DIGEST)) == 2
+        await app.notification_digest.flush()
+        return await app.state.items(DIGEST)
+
+    assert asyncio.run(run()) == {}
+    for guild_id, digest_channel_id, role_id in ((GUILD_ID, 71, 77), (8, 81, 82)):
+        guild = guilds[guild_id]
+        application_channel = next(c for c in guild.channels if getattr(c, "topic", None))
+        # Only the applicant is mentioned on the application itself
+        assert next(m for m in application_channel.messages if m.embeds).content == "<@42>"
+        [summary] = guild.get_channel(digest_channel_id).messages
+        assert summary.content == f"<@&{role_id}>"
+        assert f"<#{application_channel.id}>" in summary.embeds[0].description
+
+
+def test_attachments_that_cannot_be_posted_do_not_fail_the_submission(monkeypatch):
+    app = load_bot_module()
+    fake = FakeDiscord()
+    guild = fake.guild(GUILD_ID, [app.get_guild_config(GUILD_ID).interview_category_id])
+    user = fake.user(APPLICANT_ID, "tester")
+    submission = new_submission(app, user)
+    submission["attachments"] = [{"url": "https://cdn.example/gear.png", "filename": "gear.png", "size": 10, "content_type": None, "question": 0}]
+
+    async def refuse(*args, **kwargs):
+        raise discord.Forbidden(SimpleNamespace(status=403, reason="Forbidden"), "Missing Permissions")
+
+    monkeypatch.setattr(app.attachment_relay, "relay", refuse)
+    asyncio.run(app.run_submission_steps(submission, guild, user))
+    assert submission["notified"]
+    assert [e.title for m in user.messages for e in m.embeds] == ["✅ Application Submitted Successfully!"]
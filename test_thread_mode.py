@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for private-thread mode against the fake Discord
+"""
+import asyncio
+import os
+import time
+
+import discord
+
+from conftest import apply_click, dm
+from replay import Replayer, load_bot_module
+from state import DELETIONS
+
+GUILD_ID = 7
+REVIEW_CHANNEL_ID = 99
+OFFICER_ROLE_ID = 77
+ANSWERS = ["Weekend", "Yes", "A friend", "Healer", "No logs yet", "No", "I raid a lot", "Thanks"]
+
+
+def command(thread, name, **options):
+    return {
+        "type": "interaction", "kind": discord.InteractionType.application_command.value, "t": 0,
+        "user_id": 5, "user_name": "officer", "guild_id": GUILD_ID,
+        "channel_id": thread.id, "channel_name": thread.name,
+        "data": {"name": name, "options": [{"name": key, "value": value} for key, value in options.items()]},
+    }
+
+
+def application(user_id, name):
+    return [apply_click(user_id, name, GUILD_ID)] + [dm(user_id, name, answer) for answer in ANSWERS]
+
+
+def thread_mode_app():
+    return load_bot_module({
+        **os.environ,
+        "APPLICATION_MODE": "thread",
+        "REVIEW_CHANNEL_ID": str(REVIEW_CHANNEL_ID),
+        "OFFICER_ROLE_ID": str(OFFICER_ROLE_ID),
+    })
+
+
+def test_thread_mode_application_lifecycle(monkeypatch):
+    app = thread_mode_app()
+    replayer = Replayer(app)
+    fake = replayer.fake
+    asyncio.run(replayer.replay(application(42, "tester") + application(43, "other"), speed=0))
+
+    guild = fake.guilds[GUILD_ID]
+    review_channel = guild.get_channel(REVIEW_CHANNEL_ID)
+    first, second = review_channel.threads
+    assert (first.name, second.name) == ("application-tester", "application-other")
+    # No new channels: applications live in private threads of the review channel
+    assert [c.id for c in guild.channels if getattr(c, "topic", None)] == []
+    assert fake.users[42] in first.members
+
+    # The roles are pinged once, when the thread is opened; the application embed only mentions the applicant
+    assert first.messages[0].content == f"<@&{OFFICER_ROLE_ID}> a new application is ready for review."
+    assert first.messages[1].content == "<@42>"
+    assert first.messages[1].embeds[0].title == "New Application from tester"
+
+    async def decide_and_reapply():
+        await replayer.replay([apply_click(42, "tester", GUILD_ID)], speed=0)
+        duplicate = fake.sent[-1].content
+        await replayer.replay([
+            command(first, "noxapprove", delete_time="10m"),
+            command(second, "noxreject", reason="Roster is full", delete_time="1h"),
+        ], speed=0)
+        return duplicate
+
+    duplicate = asyncio.run(decide_and_reapply())
+    assert duplicate == f"You already have an application channel: {first.mention}"
+    approval = next(e for m in first.messages for e in m.embeds if e.title == "✅ Application Approved")
+    rejection = next(e for m in second.messages for e in m.embeds if e.title == "❌ Application Rejected")
+    assert "will be automatically archived" in approval.fields[-1].value
+    assert "will be automatically archived" in rejection.fields[-1].value
+    updates = [e for m in fake.users[43].messages for e in m.embeds if e.title == "Application Update"]
+    assert updates and updates[0].fields[0].value == "❌ Rejected"
+
+    # The sweeper archives and locks due threads instead of deleting them
+    monkeypatch.setattr(app.bot, "get_channel", guild.get_channel_or_thread)
+
+    async def sweep():
+        deletions = await app.state.items(DELETIONS)
+        assert set(deletions) == {str(first.id), str(second.id)}
+        for channel_id, entry in deletions.items():
+            await app.delete_scheduled_channel(channel_id, {**entry, "due": time.time()})
+        return await app.state.items(DELETIONS)
+
+    assert asyncio.run(sweep()) == {}
+    assert all(thread.archived and thread.locked for thread in (first, second))
+    assert guild.threads == [first, second]
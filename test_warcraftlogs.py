@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for Warcraft Logs link parsing and lookups against a local HTTP stand-in
+"""
+import asyncio
+
+from aiohttp import web
+
+from warcraftlogs import WarcraftLogsClient, format_summary, parse_wcl_links
+
+RANKINGS = {
+    "Tester": {
+        "bestPerformanceAverage": 91.25,
+        "medianPerformanceAverage": 74.5,
+        "rankings": [{"totalKills": 3}, {"totalKills": 0}, {"totalKills": 1}],
+    },
+}
+
+
+def test_parse_links():
+    text = (
+        "Main: https://classic.warcraftlogs.com/character/us/faerlina/Tester "
+        "alt https://www.warcraftlogs.com/character/EU/twisting-nether/Alt?zone=1001 "
+        "and again https://classic.warcraftlogs.com/character/us/faerlina/tester"
+    )
+    links = parse_wcl_links(text)
+    assert [(link["flavor"], link["region"], link["realm"], link["name"]) for link in links] == [
+        ("classic", "us", "faerlina", "Tester"),
+        ("www", "eu", "twisting-nether", "Alt"),
+    ]
+    assert parse_wcl_links("no logs yet") == []
+    assert len(parse_wcl_links(text, limit=1)) == 1
+
+
+async def serve(calls):
+    async def token(request):
+        calls["token"] += 1
+        return web.json_response({"access_token": "abc", "expires_in": 3600})
+
+    async def api(request):
+        calls["api"] += 1
+        assert request.headers["Authorization"] == "Bearer abc"
+        body = await request.json()
+        await asyncio.sleep(0.05)
+        rankings = RANKINGS.get(body["variables"]["name"])
+        character = {"name": body["variables"]["name"], "zoneRankings": rankings} if rankings else None
+        return web.json_response({"data": {"characterData": {"character": character}}})
+
+    app = web.Application()
+    app.router.add_post("/oauth/token", token)
+    app.router.add_post("/api/v2/client", api)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def test_summaries_are_cached_and_deduplicated():
+    async def run():
+        calls = {"token": 0, "api": 0}
+        runner, base = await serve(calls)
+        client = WarcraftLogsClient("id", "secret", base_url=base)
+        tester, missing = parse_wcl_links(
+            "https://classic.warcraftlogs.com/character/us/faerlina/Tester "
+            "https://classic.warcraftlogs.com/character/us/faerlina/Nobody"
+        )
+        try:
+            first = await asyncio.gather(*(client.character_summary(tester) for _ in range(3)))
+            again = await client.character_summary(tester)
+            not_found = await client.character_summary(missing)
+            await client.character_summary(missing)
+        finally:
+            await client.close()
+            await runner.cleanup()
+        return calls, first, again, not_found, tester
+
+    calls, first, again, not_found, tester = asyncio.run(run())
+    assert first[0] == {"found": True, "best": 91.25, "median": 74.5, "ranked": 2}
+    assert first == [first[0]] * 3 and again == first[0]
+    assert not_found == {"found": False}
+    # One token, one request per character despite concurrent and repeated lookups
+    assert calls == {"token": 1, "api": 2}
+    assert "best avg **91.2**" in format_summary(tester, first[0])
+
+
+def test_failed_lookups_return_none():
+    async def run():
+        client = WarcraftLogsClient("id", "secret", base_url="http://127.0.0.1:9", timeout=2)
+        link = parse_wcl_links("https://www.warcraftlogs.com/character/us/stormrage/Tester")[0]
+        try:
+            return link, await client.character_summary(link)
+        finally:
+            await client.close()
+
+    link, summary = asyncio.run(run())
+    assert summary is None
+    assert format_summary(link, summary).endswith("lookup failed")